@@ -1,110 +1,409 @@
 """
 PDF Parser Application
-Execute: python app.py [attendance|allowance] [optional_pdf_path]
+Execute: python app.py [attendance|allowance] [optional_pdf_path] [--workers N]
+Targeted: python app.py [attendance|allowance] [--pages 3,5-7] [--employee 160013]
+Batch: python app.py [attendance|allowance] [directory|glob] [--workers N] [--output DIR]
+Parquet: python app.py [attendance|allowance] [...] --parquet DIR --month YYYY-MM [--office NAME]
+Incremental: python app.py [attendance|allowance] [optional_pdf_path] --incremental
 Test: python app.py [attendance|allowance] --test
+Daemon: python -m src.daemon --workers N (see src/daemon.py)
 """
 
+import argparse
+import logging
+import os
 import sys
-import json
+import time
 from pathlib import Path
 
+from src import profiling
+from src.log import LOG_LEVELS, LOGGER_NAME, configure_logging, log_file_summary
 
-def main():
-    if len(sys.argv) < 2:
-        print("\nUsage: python app.py [attendance|allowance] [optional_pdf_path|--test]")
-        print("\nExamples:")
-        print("  python app.py attendance")
-        print("  python app.py allowance")
-        print("  python app.py attendance --test")
-        print("  python app.py allowance --test")
-        print("  python app.py attendance /path/to/custom.pdf")
-        print("  python app.py allowance /path/to/custom.pdf")
-        sys.exit(1)
+logger = logging.getLogger(f'{LOGGER_NAME}.app')
+
+USAGE_EXAMPLES = """
+Examples:
+  python app.py attendance
+  python app.py allowance
+  python app.py attendance --test
+  python app.py allowance --test
+  python app.py attendance /path/to/custom.pdf
+  python app.py allowance /path/to/custom.pdf
+  python app.py attendance --workers 16
+  python app.py attendance --pages 3-4
+  python app.py attendance --employee 160013
+  python app.py allowance --engine text
+  python app.py attendance --ndjson --no-print
+  python app.py attendance --quiet
+  python app.py attendance --timings --profile attendance.prof
+  python app.py attendance inbox/attendance/ --workers 8
+  python app.py allowance "inbox/**/*.pdf" --output output/nightly
+  python app.py attendance /mnt/share/books/ --async --stage-inputs --max-in-flight 8
+  python app.py attendance --parquet archive/attendance --month 2025-09 --office Tokyo
+  python app.py allowance "inbox/*/*.pdf" --parquet archive/allowance --month 2025-09
+  python app.py attendance reissued/attendance.pdf --incremental
+  python app.py attendance big_scan.pdf --workers 4 --max-memory 2048
+"""
+
+
+def build_arg_parser():
+    """Build the command line parser"""
+    arg_parser = argparse.ArgumentParser(
+        usage="python app.py [attendance|allowance] [optional_pdf_path|--test]",
+        epilog=USAGE_EXAMPLES,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    arg_parser.add_argument('parser_type', type=str.lower, help="attendance or allowance")
+    arg_parser.add_argument('pdf_path', nargs='?',
+                            help="PDF, directory or glob to extract (default: sample in materials/)")
+    arg_parser.add_argument('--test', action='store_true', help="compare last output against correct.json")
+    arg_parser.add_argument('--workers', type=int, default=None,
+                            help="worker processes: page chunks for one attendance PDF (default 1), "
+                                 "files in batch mode (default all cores); 0 = all cores")
+    arg_parser.add_argument('--no-cache', action='store_true',
+                            help="ignore and do not fill the extraction cache (.cache/tables)")
+    arg_parser.add_argument('--no-raster-cache', action='store_true',
+                            help="let Camelot render lattice pages itself instead of using the page "
+                                 "image cache (.cache/rasters)")
+    arg_parser.add_argument('--no-template', action='store_true',
+                            help="always run lattice line detection instead of replaying the learned "
+                                 "layout template (.cache/templates)")
+    arg_parser.add_argument('--ndjson', action='store_true',
+                            help="write records as JSON Lines (.jsonl) instead of a JSON array")
+    arg_parser.add_argument('--no-print', action='store_true',
+                            help="skip dumping the JSON output to stdout")
+    arg_parser.add_argument('--pages', default='all',
+                            help="pages to extract, e.g. 3 or 1,4-6 or 5-end (default: all)")
+    arg_parser.add_argument('--employee', default=None, metavar='ID',
+                            help="only re-extract the pages whose text mentions this 6-digit employee ID")
+    arg_parser.add_argument('--no-prefilter', action='store_true',
+                            help="run attendance lattice extraction on every page, even pages "
+                                 "whose text has no employee table")
+    arg_parser.add_argument('--engine', choices=['camelot', 'text'], default='camelot',
+                            help="allowance engine: camelot stream tables, or text-layer column "
+                                 "binning (faster, no Camelot)")
+    arg_parser.add_argument('--output', default=None,
+                            help="batch mode output folder (default: output/<parser>/batch)")
+    arg_parser.add_argument('--async', dest='async_batch', action='store_true',
+                            help="batch mode: overlap reading, parsing and writing with asyncio "
+                                 "(also writes CSV and Markdown per file)")
+    arg_parser.add_argument('--max-in-flight', type=int, default=None, metavar='N',
+                            help="with --async: files staged, parsing or writing at once (default: 2x workers)")
+    arg_parser.add_argument('--stage-inputs', action='store_true',
+                            help="with --async: copy each PDF to local temp storage before parsing "
+                                 "(for slow network shares)")
+    arg_parser.add_argument('--parquet', default=None, metavar='DIR',
+                            help="also write typed Parquet into a dataset partitioned as "
+                                 "DIR/month=YYYY-MM/office=NAME/ (needs pyarrow)")
+    arg_parser.add_argument('--month', default=None, metavar='YYYY-MM',
+                            help="with --parquet: payroll month partition (required)")
+    arg_parser.add_argument('--office', default=None, metavar='NAME',
+                            help="with --parquet: office partition (default: the PDF's folder name)")
+    arg_parser.add_argument('--max-memory', type=int, default=None, metavar='MB',
+                            help="memory ceiling for the extraction (all worker processes together); "
+                                 "fewer pages and workers are kept in flight to stay under it")
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help="only re-extract pages whose content changed since the last run of this book "
+                                 "(.cache/manifests) and write <output>_changes.json")
+    arg_parser.add_argument('--book', default=None, metavar='ID',
+                            help="with --incremental: book the manifest belongs to (default: the PDF file name "
+                                 "without extension); give a re-issue saved under another name the same ID")
+    log_options = arg_parser.add_mutually_exclusive_group()
+    log_options.add_argument('--log-level', choices=LOG_LEVELS, default=None,
+                             help="log verbosity (default: info, warning in batch mode)")
+    log_options.add_argument('--quiet', action='store_true',
+                             help="warnings and per-file summary lines only; implies --no-print")
+    log_options.add_argument('--verbose', action='store_true',
+                             help="also log per-table detail (same as --log-level debug)")
+    arg_parser.add_argument('--timings', action='store_true',
+                            help="print per-stage wall time, call counts and latency histograms")
+    arg_parser.add_argument('--timings-json', default=None, metavar='PATH',
+                            help="write the per-stage timings to a JSON file")
+    arg_parser.add_argument('--profile', default=None, metavar='PATH',
+                            help="profile the run: cProfile stats, or pyinstrument for a .html path")
+    return arg_parser
+
+
+def output_basename(basename, pages, employee_id):
+    """
+    Name targeted outputs after their selection so full-book files are not overwritten.
     
-    parser_type = sys.argv[1].lower()
-    test_mode = len(sys.argv) > 2 and sys.argv[2] == '--test'
-    custom_path = sys.argv[2] if len(sys.argv) > 2 and sys.argv[2] != '--test' else None
+    Args:
+        basename: Default output file name without extension
+        pages: Pages string from --pages
+        employee_id: ID from --employee, or None
     
-    # Test mode
-    if test_mode:
-        if parser_type == "attendance":
-            from src.attendance.test import test
-            success = test()
-        elif parser_type == "allowance":
-            from src.allowance.test import test
-            success = test()
-        else:
-            print(f"Unknown parser type: {parser_type}")
-            sys.exit(1)
-        
-        sys.exit(0 if success else 1)
+    Returns:
+        File name without extension, e.g. 'attendance_records_160013'
+    """
+    if employee_id:
+        basename += f'_{employee_id}'
+    if pages.strip().lower() != 'all':
+        basename += '_p' + pages.replace(',', '_').replace(' ', '')
+    return basename
+
+
+def parquet_options(args):
+    """Options for src.columnar from --parquet/--month/--office, or None"""
+    if not args.parquet:
+        return None
+    return {'root': args.parquet, 'month': args.month, 'office': args.office}
+
+
+def parquet_writers(args, parser_type, pdf_path):
+    """
+    Extra writers for stream_outputs: a ParquetWriter when --parquet is given.
     
-    # Normal extraction mode
+    Returns:
+        List of open writers (empty without --parquet)
+    """
+    options = parquet_options(args)
+    if options is None:
+        return []
+    
+    from src.columnar import ParquetWriter, dataset_path
+    
+    parquet_path = dataset_path(options, pdf_path, output_basename(Path(pdf_path).stem, args.pages, args.employee))
+    logger.info(f"Parquet: {parquet_path}")
+    return [ParquetWriter(parquet_path, parser_type)]
+
+
+def incremental_records(parser_type, pdf_path, output_folder, basename, book_id=None, **extract_options):
+    """
+    Extract through the page manifest and write <basename>_changes.json.
+    
+    Args:
+        book_id: Manifest name (default: PDF file stem, see src.manifest)
+    
+    Returns:
+        List of records in page order
+    """
+    import json
+    from src.manifest import extract_incremental
+    
+    records, changes = extract_incremental(parser_type, pdf_path, book_id=book_id, **extract_options)
+    changes_path = os.path.join(output_folder, f'{basename}_changes.json')
+    os.makedirs(output_folder, exist_ok=True)
+    with open(changes_path, 'w', encoding='utf-8') as f:
+        json.dump({'pdf': str(pdf_path), **changes}, f, ensure_ascii=False, indent=2)
+    
+    logger.info(f"✓ Reused {changes['reused_pages']}/{changes['pages']} pages, "
+                f"re-extracted {changes['extracted_pages']}")
+    logger.info(f"  Employees: {len(changes['added'])} added, {len(changes['changed'])} changed, "
+                f"{len(changes['removed'])} removed, {changes['unchanged']} unchanged → {changes_path}")
+    return records
+
+
+def run_extraction(args, parser_type, custom_path):
+    """
+    Extract one PDF (the default sample if custom_path is None) and write its outputs.
+    
+    Returns:
+        Tuple of (pdf_path, record_count)
+    """
     if parser_type == "attendance":
-        print("\n" + "=" * 70)
-        print("Running Attendance Parser...")
-        print("=" * 70 + "\n")
+        logger.info("\n" + "=" * 70)
+        logger.info("Running Attendance Parser...")
+        logger.info("=" * 70 + "\n")
         
-        from src.attendance.parser import parse_pdf
-        from src.common import save_json, save_csv, save_markdown
+        from src.attendance.parser import iter_records
+        from src.common import stream_outputs, print_file
         
         pdf_path = custom_path or 'materials/出勤簿 - shukkinbo - attendance book.pdf'
         output_folder = 'output/attendance'
         
-        print(f"PDF: {pdf_path}")
-        print("=" * 70)
-        records = parse_pdf(pdf_path)
+        logger.info(f"PDF: {pdf_path}")
+        logger.info("=" * 70)
+        if args.incremental:
+            records = incremental_records(
+                parser_type, pdf_path, output_folder, 'attendance_records', book_id=args.book,
+                workers=1 if args.workers is None else args.workers, prefilter=not args.no_prefilter,
+            )
+        else:
+            records = iter_records(
+                pdf_path, workers=1 if args.workers is None else args.workers,
+                pages=args.pages, employee_id=args.employee, prefilter=not args.no_prefilter,
+            )
         
-        Path(output_folder).mkdir(parents=True, exist_ok=True)
-        save_json(records, f'{output_folder}/attendance_records.json')
-        save_csv(records, f'{output_folder}/attendance_records.csv')
-        save_markdown(records, f'{output_folder}/attendance_records.md', 'Attendance Records')
+        record_count, json_path = stream_outputs(
+            records, output_folder, output_basename('attendance_records', args.pages, args.employee),
+            'Attendance Records', ndjson=args.ndjson,
+            extra_writers=parquet_writers(args, parser_type, pdf_path),
+        )
         
-        print("\n" + "=" * 70)
-        print(f"Extracted {len(records)} employee records")
-        print("=" * 70)
+        logger.info("\n" + "=" * 70)
+        logger.info(f"Extracted {record_count} employee records")
+        logger.info("=" * 70)
         
-        print("\n" + "=" * 70)
-        print("JSON Output:")
-        print("=" * 70)
-        print(json.dumps(records, ensure_ascii=False, indent=2))
+        if not args.no_print:
+            print("\n" + "=" * 70)
+            print("JSON Output:")
+            print("=" * 70)
+            print_file(json_path)
     
     elif parser_type == "allowance":
-        print("\n" + "=" * 70)
-        print("Running Allowance Parser...")
-        print("=" * 70 + "\n")
+        logger.info("\n" + "=" * 70)
+        logger.info("Running Allowance Parser...")
+        logger.info("=" * 70 + "\n")
         
-        from src.allowance.parser import parse_pdf
-        from src.common import save_json, save_csv, save_markdown
+        from src.allowance.config import RECORD_FIELDS
+        from src.allowance.parser import iter_records
+        from src.common import stream_outputs, print_file
         
         pdf_path = custom_path or "materials/運転手手当一覧表 - Untenshu teate ichiran hyō - Driver Allowance List.pdf"
         output_folder = 'output/allowance'
         
-        print(f"PDF: {pdf_path}")
-        print("=" * 70)
-        employees = parse_pdf(pdf_path)
+        logger.info(f"PDF: {pdf_path}")
+        logger.info("=" * 70)
+        if args.incremental:
+            employees = incremental_records(parser_type, pdf_path, output_folder, 'driver_allowance',
+                                            book_id=args.book, engine=args.engine)
+        else:
+            employees = iter_records(pdf_path, pages=args.pages, employee_id=args.employee, engine=args.engine)
         
-        if employees:
-            Path(output_folder).mkdir(parents=True, exist_ok=True)
-            save_json(employees, f'{output_folder}/driver_allowance.json')
-            save_csv(employees, f'{output_folder}/driver_allowance.csv')
-            save_markdown(employees, f'{output_folder}/driver_allowance.md', 'Driver Allowance List')
-            
-            print("\n" + "=" * 70)
-            print(f"✓ Complete! {len(employees)} records → {output_folder}/")
-            print("=" * 70)
+        record_count, json_path = stream_outputs(
+            employees, output_folder, output_basename('driver_allowance', args.pages, args.employee),
+            'Driver Allowance List',
+            fieldnames=RECORD_FIELDS, ndjson=args.ndjson,
+            extra_writers=parquet_writers(args, parser_type, pdf_path),
+            # As before streaming: an empty run keeps the previous outputs
+            skip_empty=True,
+        )
+        
+        if record_count:
+            logger.info("\n" + "=" * 70)
+            logger.info(f"✓ Complete! {record_count} records → {output_folder}/")
+            logger.info("=" * 70)
             
-            print("\n" + "=" * 70)
-            print("JSON Output:")
-            print("=" * 70)
-            print(json.dumps(employees, ensure_ascii=False, indent=2))
+            if not args.no_print:
+                print("\n" + "=" * 70)
+                print("JSON Output:")
+                print("=" * 70)
+                print_file(json_path)
         else:
-            print("\n✗ No data found")
+            logger.warning("No data found")
     
     else:
         print(f"\n❌ Invalid parser type: '{parser_type}'")
         print("Valid options: attendance, allowance")
         sys.exit(1)
+    
+    return pdf_path, record_count
+
+
+def main():
+    arg_parser = build_arg_parser()
+    if len(sys.argv) < 2:
+        arg_parser.print_help()
+        sys.exit(1)
+    
+    args = arg_parser.parse_args()
+    parser_type = args.parser_type
+    test_mode = args.test
+    custom_path = args.pdf_path
+    
+    if args.no_cache:
+        # Read by src.tables in this process and inherited by worker processes
+        os.environ['PDF_EXTRACT_CACHE'] = '0'
+    if args.no_template:
+        os.environ['PDF_EXTRACT_TEMPLATES'] = '0'
+    if args.no_raster_cache:
+        os.environ['PDF_EXTRACT_RASTER_CACHE'] = '0'
+    if args.max_memory:
+        # Read by src.memory when sizing windows, chunks and worker pools
+        os.environ['PDF_EXTRACT_MEMORY_MB'] = str(args.max_memory)
+    
+    if args.parquet:
+        from src.columnar import MONTH_PATTERN
+        if not args.month or not MONTH_PATTERN.match(args.month):
+            arg_parser.error("--parquet needs --month YYYY-MM")
+    
+    if args.incremental and (args.pages.strip().lower() != 'all' or args.employee):
+        arg_parser.error("--incremental re-extracts the whole book; it cannot be combined with --pages or --employee")
+    if args.book and not args.incremental:
+        arg_parser.error("--book names the manifest of --incremental")
+    
+    log_level = args.log_level or ('warning' if args.quiet else 'debug' if args.verbose else None)
+    if args.quiet:
+        args.no_print = True
+    
+    # Test mode
+    if test_mode:
+        if parser_type == "attendance":
+            from src.attendance.test import test
+            success = test()
+        elif parser_type == "allowance":
+            from src.allowance.test import test
+            success = test()
+        else:
+            print(f"Unknown parser type: {parser_type}")
+            sys.exit(1)
+        
+        sys.exit(0 if success else 1)
+    
+    # Batch mode: directory or glob of PDFs
+    if custom_path:
+        from src.batch import PARSER_MODULES, is_batch_source, parser_options, run_batch
+        
+        if is_batch_source(custom_path):
+            if args.pages.strip().lower() != 'all' or args.employee:
+                print("\n❌ --pages and --employee apply to a single PDF, not a batch")
+                sys.exit(1)
+            if args.incremental:
+                print("\n❌ --incremental applies to a single PDF, not a batch")
+                sys.exit(1)
+            if parser_type not in PARSER_MODULES:
+                print(f"\n❌ Invalid parser type: '{parser_type}'")
+                print("Valid options: attendance, allowance")
+                sys.exit(1)
+            
+            # Per-record lines from many workers only interleave: quiet by default
+            configure_logging(log_level or 'warning')
+            output_folder = args.output or f'output/{parser_type}/batch'
+            options = parser_options(parser_type, engine=args.engine, prefilter=not args.no_prefilter)
+            if args.async_batch:
+                from src.orchestrator import run_batch_async
+                batch_summary = run_batch_async(
+                    parser_type, custom_path, output_folder, workers=args.workers,
+                    max_in_flight=args.max_in_flight, stage_inputs=args.stage_inputs,
+                    parquet=parquet_options(args), options=options, ndjson=args.ndjson,
+                )
+            else:
+                batch_summary = run_batch(parser_type, custom_path, output_folder, workers=args.workers,
+                                          parquet=parquet_options(args), options=options, ndjson=args.ndjson)
+            
+            print("\n" + "=" * 70)
+            print(f"Batch complete: {batch_summary['succeeded']}/{batch_summary['files']} files, "
+                  f"{batch_summary['records']} records in {batch_summary['seconds']}s → {output_folder}/")
+            print("=" * 70)
+            sys.exit(0 if batch_summary['failed'] == 0 else 1)
+    
+    # Normal extraction mode
+    configure_logging(log_level or 'info')
+    if args.timings or args.timings_json:
+        profiling.enable()
+    
+    started_at = time.perf_counter()
+    if args.profile:
+        with profiling.profile_to(args.profile):
+            pdf_path, record_count = run_extraction(args, parser_type, custom_path)
+        print(f"\n✓ Profile → {args.profile}")
+    else:
+        pdf_path, record_count = run_extraction(args, parser_type, custom_path)
+    
+    log_file_summary({
+        'parser': parser_type, 'pdf': pdf_path, 'status': 'ok' if record_count else 'empty',
+        'records': record_count, 'seconds': round(time.perf_counter() - started_at, 3),
+    })
+    
+    if args.timings:
+        print("\n" + "=" * 70)
+        print("Stage timings:")
+        print("=" * 70)
+        profiling.print_report()
+    if args.timings_json:
+        profiling.export_json(args.timings_json)
+        print(f"\n✓ Timings → {args.timings_json}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+"""Extraction benchmarks (python -m benchmarks.run)"""
@@ -0,0 +1,182 @@
+"""
+Per-cell cost of the text helpers, before and after src/patterns.py
+
+Run from the repository root:
+    python -m benchmarks.patterns                 # 7 repeats per case
+    python -m benchmarks.patterns --repeats 15
+
+Cells come from the sample PDFs' tables (read through the extraction
+cache), and the line cases from those cells split on newlines. Each case
+times the old inline re.* call against its registry replacement on the
+same inputs and checks that both give the same answers. Results are
+written to benchmarks/results/patterns_<timestamp>_<commit>.json.
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src import patterns
+from .run import RESULTS_DIR, SAMPLE_PDFS, _git_commit
+
+# name -> (input set, inline call as the extractors used to make it, registry call)
+PATTERN_CASES = {
+    'attendance employee ID in cell': (
+        'attendance_cells',
+        lambda cell: re.search(r'\b(\d{6})\b', str(cell)) is not None,
+        lambda cell: patterns.find_employee_id(cell) is not None,
+    ),
+    'extract_all_numbers': (
+        'attendance_cells',
+        lambda cell: [int(n) for n in re.findall(r'\d+', str(cell))],
+        patterns.find_integers,
+    ),
+    'name line (_extract_name_from_line)': (
+        'attendance_lines',
+        lambda line: re.search(r'([一-龯ぁ-んァ-ヶー]+\s+[一-龯ぁ-んァ-ヶー]+)', line) is not None,
+        lambda line: patterns.SPACED_NAME.search(line) is not None,
+    ),
+    'marker line (_is_valid_name_line)': (
+        'attendance_lines',
+        lambda line: re.match(r'^[A-Z0-9ｱ-ﾝァ-ヶー]+$', line) is not None,
+        lambda line: patterns.MARKER_LINE.match(line) is not None,
+    ),
+    'numeric line (_is_numeric_line)': (
+        'attendance_lines',
+        lambda line: bool(line) and re.match(r'^\d+$', line) is not None,
+        lambda line: bool(line) and patterns.is_digits(line),
+    ),
+    'working hours': (
+        'attendance_cells',
+        lambda cell: re.search(r'(\d+:\d+)', cell) is not None,
+        lambda cell: patterns.find_working_hours(cell) is not None,
+    ),
+    'allowance exact employee ID': (
+        'allowance_cells',
+        lambda cell: re.match(r'^\d{6}$', cell) is not None,
+        patterns.is_exact_employee_id,
+    ),
+    'allowance name row': (
+        'allowance_cells',
+        lambda cell: re.search(r'[\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff]{2,}', cell) is not None,
+        lambda cell: patterns.JAPANESE_NAME.search(cell) is not None,
+    ),
+    'allowance clean_number search': (
+        'allowance_cells',
+        lambda cell: re.search(r'[\d\.]+', cell) is not None,
+        lambda cell: patterns.DECIMAL_NUMBER.search(cell) is not None,
+    ),
+}
+
+
+def load_inputs():
+    """
+    Collect benchmark inputs from the sample PDFs.
+    
+    Returns:
+        Dictionary of input set name -> list of strings
+    """
+    from src.tables import read_tables
+    
+    attendance_cells = [
+        str(cell).strip()
+        for table in read_tables(SAMPLE_PDFS['attendance'], pages='all', flavor='lattice')
+        for cell in table.df.to_numpy().ravel()
+    ]
+    allowance_cells = [
+        str(cell).strip()
+        for table in read_tables(SAMPLE_PDFS['allowance'], pages='all', flavor='stream')
+        for cell in table.df.to_numpy().ravel()
+    ]
+    attendance_lines = [line.strip() for cell in attendance_cells for line in cell.split('\n')]
+    return {
+        'attendance_cells': attendance_cells,
+        'attendance_lines': attendance_lines,
+        'allowance_cells': allowance_cells,
+    }
+
+
+def time_per_call(function, inputs, repeats):
+    """Best-of-repeats nanoseconds per input"""
+    best = float('inf')
+    for _ in range(repeats):
+        started_at = time.perf_counter()
+        for value in inputs:
+            function(value)
+        best = min(best, time.perf_counter() - started_at)
+    return best / len(inputs) * 1e9
+
+
+def run_pattern_cases(inputs, repeats):
+    """
+    Time every case and check both versions agree.
+    
+    Args:
+        inputs: Input sets from load_inputs()
+        repeats: Timing repeats per case (the best is kept)
+    
+    Returns:
+        List of result dictionaries
+    
+    Raises:
+        AssertionError: If a registry helper answers differently from the inline call
+    """
+    results = []
+    for case_name, (input_name, inline_call, registry_call) in PATTERN_CASES.items():
+        case_inputs = inputs[input_name]
+        assert [inline_call(value) for value in case_inputs] == [registry_call(value) for value in case_inputs], \
+            f"{case_name}: registry helper disagrees with the inline pattern"
+        
+        before_ns = time_per_call(inline_call, case_inputs, repeats)
+        after_ns = time_per_call(registry_call, case_inputs, repeats)
+        results.append({
+            'case': case_name,
+            'inputs': input_name,
+            'count': len(case_inputs),
+            'before_ns': round(before_ns, 1),
+            'after_ns': round(after_ns, 1),
+            'speedup': round(before_ns / after_ns, 2),
+        })
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark per-cell cost of the shared text patterns")
+    arg_parser.add_argument('--repeats', type=int, default=7, help="timing repeats per case (best is kept)")
+    arg_parser.add_argument('--output', default=None, help="results file (default: benchmarks/results/...)")
+    args = arg_parser.parse_args()
+    
+    inputs = load_inputs()
+    results = run_pattern_cases(inputs, args.repeats)
+    
+    print(f"{'case':<38} {'inputs':>7} {'before ns':>10} {'after ns':>9} {'speedup':>8}")
+    for result in results:
+        print(f"{result['case']:<38} {result['count']:>7} {result['before_ns']:>10} "
+              f"{result['after_ns']:>9} {result['speedup']:>7}x")
+    
+    commit, dirty = _git_commit()
+    patterns_run = {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'repeats': args.repeats,
+        'results': results,
+    }
+    output_path = Path(args.output) if args.output else \
+        RESULTS_DIR / f"patterns_{datetime.now():%Y%m%d_%H%M%S}_{commit or 'nogit'}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(patterns_run, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ Results → {output_path}")
+
+
+if __name__ == '__main__':
+    main()
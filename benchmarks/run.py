@@ -0,0 +1,216 @@
+"""
+Extraction benchmarks on synthetic multi-page PDFs
+
+Run from the repository root:
+    python -m benchmarks.run                          # 10, 100 and 1000 pages, both parsers
+    python -m benchmarks.run --pages 10,100 --parsers attendance
+    python -m benchmarks.run --compare old.json new.json
+
+Each case (parser x page count) runs in a fresh process so peak RSS is its
+own. Results are written to benchmarks/results/<timestamp>_<commit>.json.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .synth import get_synthetic_pdf
+
+SAMPLE_PDFS = {
+    'attendance': 'materials/出勤簿 - shukkinbo - attendance book.pdf',
+    'allowance': 'materials/運転手手当一覧表 - Untenshu teate ichiran hyō - Driver Allowance List.pdf',
+}
+
+DEFAULT_PAGE_COUNTS = '10,100,1000'
+RESULTS_DIR = Path(__file__).parent / 'results'
+
+
+def run_case(parser_type, page_count, engine='camelot', seed=0):
+    """
+    Benchmark one parser on one synthetic PDF, in this process.
+    
+    Records come from the parser's own iter_records(), so the benchmark
+    measures exactly what app.py runs; stage timings are its profiling spans.
+    
+    Args:
+        parser_type: 'attendance' or 'allowance'
+        page_count: Pages in the synthetic PDF
+        engine: Allowance engine ('camelot' or 'text')
+        seed: Synthetic PDF shuffle seed
+    
+    Returns:
+        Result dictionary with stage timings, throughput and peak RSS
+    """
+    from src import profiling
+    from src.common import stream_outputs
+    from src.log import configure_logging
+    
+    pdf_path = str(get_synthetic_pdf(parser_type, SAMPLE_PDFS[parser_type], page_count, seed))
+    
+    # Per-record log lines would dominate the timings of small stages
+    configure_logging('warning')
+    profiling.enable()
+    started_at = time.perf_counter()
+    if parser_type == 'attendance':
+        from src.attendance.parser import iter_records
+        records = list(iter_records(pdf_path))
+        fieldnames = None
+    else:
+        from src.allowance.config import RECORD_FIELDS
+        from src.allowance.parser import iter_records
+        records = list(iter_records(pdf_path, engine=engine))
+        fieldnames = RECORD_FIELDS
+    
+    with tempfile.TemporaryDirectory() as output_folder, profiling.span('output_write'):
+        stream_outputs(records, output_folder, 'benchmark', 'Benchmark', fieldnames=fieldnames)
+    
+    total_seconds = time.perf_counter() - started_at
+    peak_rss_kb = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    
+    return {
+        'parser': parser_type,
+        'engine': engine if parser_type == 'allowance' else 'lattice',
+        'pages': page_count,
+        'records': len(records),
+        'seconds': round(total_seconds, 3),
+        'pages_per_second': round(page_count / total_seconds, 3),
+        'records_per_second': round(len(records) / total_seconds, 3),
+        'peak_rss_mb': round(peak_rss_kb / 1024, 1),
+        'stages': {stage_report['stage']: stage_report['total_seconds'] for stage_report in profiling.report()},
+    }
+
+
+def _run_case_subprocess(parser_type, page_count, engine, seed, environment):
+    """Run one case in a fresh interpreter so its peak RSS is isolated"""
+    command = [
+        sys.executable, '-m', 'benchmarks.run', '--single',
+        '--parsers', parser_type, '--pages', str(page_count), '--engine', engine, '--seed', str(seed),
+    ]
+    completed = subprocess.run(command, capture_output=True, text=True, env=environment, check=False)
+    if completed.returncode != 0:
+        return {'parser': parser_type, 'pages': page_count, 'error': completed.stderr.strip().splitlines()[-1:]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _git_commit():
+    """Return (short commit hash, dirty flag), or (None, None) outside git"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                                capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+    return commit.stdout.strip(), bool(status.stdout.strip())
+
+
+def compare_results(old_path, new_path):
+    """Print per-case seconds and speedup between two results files"""
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old_results = json.load(f)
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new_results = json.load(f)
+    
+    def case_key(result):
+        return result['parser'], result.get('engine'), result['pages']
+    
+    old_by_case = {case_key(result): result for result in old_results['results'] if 'error' not in result}
+    print(f"{'case':<32} {old_results.get('commit')!s:>10} {new_results.get('commit')!s:>10} {'speedup':>8} {'rss MB':>14}")
+    for new_result in new_results['results']:
+        old_result = old_by_case.get(case_key(new_result))
+        if old_result is None or 'error' in new_result:
+            continue
+        case_name = f"{new_result['parser']}/{new_result['engine']}/{new_result['pages']}p"
+        speedup = old_result['seconds'] / new_result['seconds'] if new_result['seconds'] else float('inf')
+        print(f"{case_name:<32} {old_result['seconds']:>9.2f}s {new_result['seconds']:>9.2f}s {speedup:>7.2f}x "
+              f"{old_result['peak_rss_mb']:>6} → {new_result['peak_rss_mb']:<6}")
+
+
+def build_arg_parser():
+    """Build the command line parser"""
+    arg_parser = argparse.ArgumentParser(description="Benchmark extraction on synthetic PDFs")
+    arg_parser.add_argument('--pages', default=DEFAULT_PAGE_COUNTS, help="comma-separated page counts")
+    arg_parser.add_argument('--parsers', default='attendance,allowance', help="comma-separated parser types")
+    arg_parser.add_argument('--engine', choices=['camelot', 'text'], default='camelot', help="allowance engine")
+    arg_parser.add_argument('--seed', type=int, default=0, help="synthetic PDF shuffle seed")
+    arg_parser.add_argument('--cache', action='store_true',
+                            help="use the extraction and page image caches (default: off)")
+    arg_parser.add_argument('--no-template', action='store_true', help="disable attendance layout templates")
+    arg_parser.add_argument('--output', default=None, help="results file (default: benchmarks/results/...)")
+    arg_parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="compare two results files")
+    arg_parser.add_argument('--single', action='store_true', help=argparse.SUPPRESS)
+    return arg_parser
+
+
+def main():
+    args = build_arg_parser().parse_args()
+    
+    if args.compare:
+        compare_results(*args.compare)
+        return
+    
+    parser_types = [parser_type.strip() for parser_type in args.parsers.split(',') if parser_type.strip()]
+    page_counts = [int(page_count) for page_count in args.pages.split(',') if page_count.strip()]
+    
+    # Internal: one case in this process, result as the last stdout line
+    if args.single:
+        print(json.dumps(run_case(parser_types[0], page_counts[0], args.engine, args.seed)))
+        return
+    
+    with tempfile.TemporaryDirectory() as template_dir:
+        environment = dict(os.environ)
+        environment['PDF_EXTRACT_CACHE'] = '1' if args.cache else '0'
+        environment['PDF_EXTRACT_TEMPLATES'] = '0' if args.no_template else '1'
+        # Every run learns its own template, so results do not depend on earlier runs
+        environment['PDF_EXTRACT_TEMPLATE_DIR'] = template_dir
+        
+        results = []
+        for parser_type in parser_types:
+            for page_count in page_counts:
+                print(f"{parser_type} x {page_count} pages...", end=' ', flush=True)
+                with tempfile.TemporaryDirectory() as raster_dir:
+                    case_environment = dict(environment)
+                    if not args.cache:
+                        # Page images from earlier runs or cases (smaller books share their
+                        # first pages) would skip rasterisation: each case renders its own
+                        case_environment['PDF_EXTRACT_RASTER_DIR'] = raster_dir
+                    result = _run_case_subprocess(parser_type, page_count, args.engine, args.seed, case_environment)
+                results.append(result)
+                if 'error' in result:
+                    print(f"✗ {result['error']}")
+                else:
+                    print(f"{result['seconds']}s, {result['pages_per_second']} pages/s, "
+                          f"{result['records_per_second']} records/s, {result['peak_rss_mb']} MB")
+    
+    commit, dirty = _git_commit()
+    benchmark_run = {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'settings': {'cache': args.cache, 'templates': not args.no_template, 'seed': args.seed},
+        'results': results,
+    }
+    
+    output_path = Path(args.output) if args.output else \
+        RESULTS_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{commit or 'nogit'}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(benchmark_run, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ Results → {output_path}")
+
+
+if __name__ == '__main__':
+    main()
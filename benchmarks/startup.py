@@ -0,0 +1,134 @@
+"""
+CLI startup benchmark
+
+Run from the repository root:
+    python -m benchmarks.startup                  # 10 runs per case
+    python -m benchmarks.startup --runs 20 --budget-ms 300
+
+Each case starts a fresh interpreter, so timings include Python start-up
+and every import the command triggers. Import cases also report which
+heavy libraries were loaded; none should be for a parser import.
+Results are written to benchmarks/results/startup_<timestamp>_<commit>.json.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from .run import RESULTS_DIR, _git_commit
+
+HEAVY_MODULES = ('camelot', 'cv2', 'pdfminer', 'pandas', 'numpy', 'pypdfium2')
+
+_IMPORT_PROBE = (
+    "import sys, json, {module}; "
+    f"print(json.dumps([name for name in {HEAVY_MODULES!r} if name in sys.modules]))"
+)
+
+# name -> (command, reference); reference cases show the cost being avoided
+STARTUP_CASES = {
+    'app.py --help': ([sys.executable, 'app.py', '--help'], False),
+    'app.py attendance --test': ([sys.executable, 'app.py', 'attendance', '--test'], False),
+    'app.py allowance --test': ([sys.executable, 'app.py', 'allowance', '--test'], False),
+    'import src.attendance.parser': ([sys.executable, '-c', _IMPORT_PROBE.format(module='src.attendance.parser')], False),
+    'import src.allowance.parser': ([sys.executable, '-c', _IMPORT_PROBE.format(module='src.allowance.parser')], False),
+    'import camelot (reference)': ([sys.executable, '-W', 'ignore', '-c', _IMPORT_PROBE.format(module='camelot')], True),
+}
+
+
+def time_command(command, runs):
+    """
+    Run a command repeatedly and time each run.
+    
+    Args:
+        command: Argument list
+        runs: Number of runs
+    
+    Returns:
+        Tuple of (list of milliseconds, stdout of the last run)
+    """
+    timings = []
+    stdout = ''
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        completed = subprocess.run(command, capture_output=True, text=True, check=False)
+        timings.append((time.perf_counter() - started_at) * 1000)
+        stdout = completed.stdout
+    return timings, stdout
+
+
+def run_startup_cases(runs):
+    """
+    Time every startup case.
+    
+    Args:
+        runs: Runs per case
+    
+    Returns:
+        List of result dictionaries (median/min/max ms, heavy modules loaded)
+    """
+    results = []
+    for case_name, (command, reference) in STARTUP_CASES.items():
+        timings, stdout = time_command(command, runs)
+        result = {
+            'case': case_name,
+            'reference': reference,
+            'median_ms': round(statistics.median(timings), 1),
+            'min_ms': round(min(timings), 1),
+            'max_ms': round(max(timings), 1),
+        }
+        if command[-2] == '-c':
+            result['heavy_modules'] = json.loads(stdout.strip().splitlines()[-1])
+        results.append(result)
+    return results
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark CLI and parser import start-up time")
+    arg_parser.add_argument('--runs', type=int, default=10, help="runs per case")
+    arg_parser.add_argument('--budget-ms', type=float, default=None,
+                            help="exit 1 if a non-reference case's median exceeds this")
+    arg_parser.add_argument('--output', default=None, help="results file (default: benchmarks/results/...)")
+    args = arg_parser.parse_args()
+    
+    results = run_startup_cases(args.runs)
+    
+    over_budget = []
+    print(f"{'case':<32} {'median ms':>10} {'min ms':>8}  heavy modules")
+    for result in results:
+        heavy_modules = ', '.join(result.get('heavy_modules', [])) or '-'
+        print(f"{result['case']:<32} {result['median_ms']:>10} {result['min_ms']:>8}  {heavy_modules}")
+        if args.budget_ms and not result['reference'] and result['median_ms'] > args.budget_ms:
+            over_budget.append(result['case'])
+    
+    commit, dirty = _git_commit()
+    startup_run = {
+        'commit': commit,
+        'dirty': dirty,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'runs': args.runs,
+        'results': results,
+    }
+    output_path = Path(args.output) if args.output else \
+        RESULTS_DIR / f"startup_{datetime.now():%Y%m%d_%H%M%S}_{commit or 'nogit'}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(startup_run, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ Results → {output_path}")
+    
+    if over_budget:
+        print(f"✗ Over {args.budget_ms} ms: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Synthetic benchmark PDFs built by replicating and shuffling sample pages"""
+
+import random
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent / '.data'
+
+
+def build_synthetic_pdf(source_pdf, page_count, output_path, seed=0):
+    """
+    Build a PDF of page_count pages drawn from source_pdf.
+    
+    Source pages are repeated in whole shuffled rounds, so every page of the
+    sample appears equally often but not in the original order. Each copy
+    gets a content stream of its own holding only a '% synthetic page <n>'
+    comment: it draws nothing, so copies render and extract like their
+    source page, but no two pages share a content hash, and the raster and
+    manifest caches cannot hand one copy's work to the next.
+    
+    Args:
+        source_pdf: Sample PDF to replicate
+        page_count: Number of pages in the result
+        output_path: Where to write the PDF
+        seed: Shuffle seed, so runs on different commits read the same file
+    
+    Returns:
+        output_path
+    """
+    from pypdf import PdfReader, PdfWriter
+    from pypdf.generic import ArrayObject, DecodedStreamObject, NameObject
+    
+    source_pages = PdfReader(source_pdf).pages
+    shuffler = random.Random(seed)
+    source_indices = []
+    while len(source_indices) < page_count:
+        page_round = list(range(len(source_pages)))
+        shuffler.shuffle(page_round)
+        source_indices.extend(page_round)
+    
+    writer = PdfWriter()
+    for page_serial, source_index in enumerate(source_indices[:page_count], start=1):
+        page = writer.add_page(source_pages[source_index])
+        serial_stream = DecodedStreamObject()
+        serial_stream.set_data(f'\n% synthetic page {page_serial}\n'.encode())
+        contents = page['/Contents'].get_object()
+        content_streams = list(contents) if isinstance(contents, ArrayObject) else [page['/Contents']]
+        page[NameObject('/Contents')] = ArrayObject(content_streams + [writer._add_object(serial_stream)])
+    
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+    return output_path
+
+
+def get_synthetic_pdf(parser_type, source_pdf, page_count, seed=0):
+    """
+    Return a cached synthetic PDF, building it on first use.
+    
+    Args:
+        parser_type: 'attendance' or 'allowance' (used in the file name)
+        source_pdf: Sample PDF to replicate
+        page_count: Number of pages
+        seed: Shuffle seed
+    
+    Returns:
+        Path to the synthetic PDF
+    """
+    output_path = DATA_DIR / f"{parser_type}_{page_count}p_seed{seed}_serial.pdf"
+    if not output_path.exists():
+        build_synthetic_pdf(source_pdf, page_count, output_path, seed)
+    return output_path
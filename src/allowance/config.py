@@ -25,6 +25,10 @@ COLUMNS_44 = [
     'lorry_b', 'lorry_ba', 'lorry_ba', 'lorry_bb', 'gokei'
 ]
 
+# Every key an employee record can carry, for fixed CSV/Markdown columns
+# (column 0 holds the ID/name and is stored as shain_id/shimei)
+RECORD_FIELDS = ['shain_id', 'shimei'] + list(dict.fromkeys(COLUMNS_37[1:] + COLUMNS_44[1:]))
+
 
 def get_columns(num_cols):
     """Get column mapping for table width"""
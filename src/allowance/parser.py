@@ -1,127 +1,222 @@
 """Allowance parser - working logic preserved, just refactored into src/allowance/"""
 
-import camelot
-import pandas as pd
-import re
+import logging
 
+from ..patterns import DECIMAL_NUMBER, JAPANESE_NAME, is_exact_employee_id
+from ..memory import iter_page_windows
+from ..pdf import format_pages, select_pages
+from ..profiling import timed
+from ..tables import read_tables
+from .config import get_columns
+from .records import AllowanceRecord
+from .textlayer import iter_text_page_records, iter_text_records
 
-def clean_text(text):
-    """Clean text"""
-    if pd.isna(text) or text == '':
-        return ''
-    return str(text).strip()
+logger = logging.getLogger(__name__)
 
+# Bump when extraction rules change; part of every extraction cache key
+PARSER_VERSION = '1'
 
-def clean_number(text):
-    """Extract number"""
-    if pd.isna(text) or text == '':
-        return ''
-    text = str(text).replace(',', '').replace(' ', '').strip()
-    match = re.search(r'[\d\.]+', text)
-    return match.group(0) if match else ''
+# Pages read per Camelot call, so records stream out window by window
+# (fewer under a memory ceiling, see src/memory.py)
+STREAM_WINDOW_PAGES = 4
 
+# 'camelot': stream tables (lattice fallback); 'text': text-layer column binning
+ENGINES = ('camelot', 'text')
 
-def parse_pdf(pdf_path):
-    """Parse allowance PDF - WORKING LOGIC PRESERVED"""
-    print(f"Extracting from: {pdf_path}")
-    
+# Rows tested per vectorized header search step
+HEADER_SEARCH_ROWS = 64
+
+# Cells holding no value
+PLACEHOLDER_VALUES = ['', '-', '―', '－']
+
+
+@timed('read_tables')
+def _read_tables_window(pdf_path, pages):
+    """Read a page window with stream flavor, falling back to lattice"""
     try:
-        tables = camelot.read_pdf(pdf_path, pages='all', flavor='stream')
-        print(f"✓ Used stream method - Found {len(tables)} table(s)")
-    except:
-        tables = camelot.read_pdf(pdf_path, pages='all', flavor='lattice')
-        print(f"✓ Used lattice method - Found {len(tables)} table(s)")
-    
-    # Column mappings
-    cols_37 = ['untenshu', 'sagawa_a', 'sagawa_b', 'sagawa_ba', 'sagawa_bb', 'sagawa_bba', 'sagawa_bbb', 'sagawa_bbba',
-               'rinji_teate', 'chokyori_teate', 'joshu', 'ippan_a', 'ippan_b', 'ippan_ba', 'ippan_bb', 'ippan_bba',
-               'ippan_bbb', 'yontonsha_a', 'yontonsha_b', 'yontonsha_ba', 'yontonsha_bb', 'yontonsha_bba',
-               'yontonsha_bbb', 'yontonsha_bbba', 'sagawa_ippan_b', 'sagawa_ippan_ba', 'sagawa_ippan_bb',
-               'sagawa_ippan_bba', 'juyon_yonhei_b', 'juyon_yonhei_ba', 'juyon_yonhei_bb', 'juronton_yontonhei_bba',
-               'lorry_a', 'lorry_b', 'lorry_ba', 'lorry_bb', 'gokei']
-    
-    cols_44 = ['untenshu', 'sagawa_a', 'sagawa_b', 'sagawa_ba', 'sagawa_bb', 'sagawa_bba', 'sagawa_bbb', 'sagawa_bbba',
-               'rinji_teate', 'chokyori_teate', 'joshu', 'ippan_a', 'ippan_b', 'ippan_b', 'ippan_ba', 'ippan_ba',
-               'ippan_bb', 'ippan_bb', 'ippan_bba', 'ippan_bbb', 'yontonsha_a', 'yontonsha_b', 'yontonsha_b',
-               'yontonsha_ba', 'yontonsha_ba', 'yontonsha_bb', 'yontonsha_bba', 'yontonsha_bbb', 'yontonsha_bbba',
-               'sagawa_ippan_b', 'sagawa_ippan_ba', 'sagawa_ippan_bb', 'sagawa_ippan_bba', 'juyon_yonhei_b',
-               'juyon_yonhei_ba', 'juyon_yonhei_bb', 'juronton_yontonhei_bba', 'lorry_a', 'lorry_b', 'lorry_b',
-               'lorry_ba', 'lorry_ba', 'lorry_bb', 'gokei']
-    
-    all_employees = []
+        tables = read_tables(pdf_path, pages=pages, flavor='stream', parser_version=PARSER_VERSION)
+        logger.debug(f"✓ Used stream method - Found {len(tables)} table(s)")
+    except Exception as exception:
+        logger.warning(f"Stream read of pages {pages} failed ({type(exception).__name__}: {exception}); "
+                       f"retrying with lattice")
+        tables = read_tables(pdf_path, pages=pages, flavor='lattice', parser_version=PARSER_VERSION)
+        logger.debug(f"✓ Used lattice method - Found {len(tables)} table(s)")
+    return tables
+
+
+def _clean_cells(df):
+    """
+    Clean every cell of a table in one pass.
     
-    for tidx, table in enumerate(tables):
-        print(f"\nProcessing table {tidx + 1} from page {table.page}...")
-        df = table.df
-        print(f"Table shape: {df.shape}")
+    Each cell is stripped; its value is the first number in it (commas and
+    spaces removed), or the stripped text when it has no digits, or None
+    for empty and placeholder cells. Same result as utils.clean_text and
+    utils.clean_number applied cell by cell.
+    
+    Args:
+        df: Table DataFrame
+    
+    Returns:
+        Tuple of (cell_text, cell_values): a 2D NumPy string array and a
+        list of row value lists, both shaped like df
+    """
+    import numpy as np
+    import pandas as pd
+    
+    cell_text = np.char.strip(df.to_numpy().astype(str))
+    flat_text = cell_text.ravel()
+    cell_values = np.full(flat_text.shape, None, dtype=object)
+    
+    # Most cells are blank; only the rest go through the number extraction
+    has_value = ~np.isin(flat_text, PLACEHOLDER_VALUES)
+    value_text = flat_text[has_value]
+    squeezed = np.char.replace(np.char.replace(value_text, ',', ''), ' ', '')
+    numbers = pd.Series(squeezed, dtype=object).str.extract(DECIMAL_NUMBER, expand=False)
+    cell_values[has_value] = np.where(numbers.notna().to_numpy(), numbers.to_numpy(dtype=object),
+                                      value_text.astype(object))
+    return cell_text, cell_values.reshape(df.shape).tolist()
+
+
+def _find_header_row(cell_text):
+    """Index of the first row mentioning columns A and B and BA or 手当 (None if absent)"""
+    import numpy as np
+    
+    # The header sits near the top: test a block of rows at a time
+    for block_start in range(0, len(cell_text), HEADER_SEARCH_ROWS):
+        block = cell_text[block_start:block_start + HEADER_SEARCH_ROWS]
         
-        # Get columns
-        num_cols = len(df.columns)
-        cols = cols_37 if num_cols == 37 else (cols_44 if num_cols == 44 else cols_37[:num_cols] if num_cols <= 37 else cols_44[:num_cols])
-        print(f"Using {len(cols)}-column mapping")
+        def any_cell_contains(substring):
+            return (np.char.find(block, substring) >= 0).any(axis=1)
         
-        # Find header
-        header_idx = None
-        for idx, row in df.iterrows():
-            row_text = ' '.join([clean_text(str(cell)) for cell in row if pd.notna(cell)])
-            if 'A' in row_text and 'B' in row_text and ('BA' in row_text or '手当' in row_text):
-                header_idx = idx
-                print(f"Found header row at index {idx}")
-                break
+        header_rows = any_cell_contains('A') & any_cell_contains('B') & (any_cell_contains('BA') | any_cell_contains('手当'))
+        if header_rows.any():
+            return block_start + int(np.argmax(header_rows))
+    return None
+
+
+def _add_row_values(current, row_values, cols):
+    """Fill fields not yet set from one row's cleaned values"""
+    for field, value in zip(cols[1:], row_values[1:len(cols)]):
+        if value is not None and field not in current:
+            current[field] = value
+
+
+def _iter_table_records(table, tidx):
+    """Parse the employees of one table"""
+    logger.debug(f"\nProcessing table {tidx + 1} from page {table.page}...")
+    df = table.df
+    logger.debug(f"Table shape: {df.shape}")
+    
+    # Get columns
+    num_cols = len(df.columns)
+    cols = get_columns(num_cols)
+    logger.debug(f"Using {len(cols)}-column mapping")
+    
+    cell_text, cell_values = _clean_cells(df)
+    
+    # Find header
+    header_idx = _find_header_row(cell_text)
+    if header_idx is None:
+        logger.info("Could not find header row, skipping table")
+        return
+    logger.debug(f"Found header row at index {header_idx}")
+    
+    # Parse rows: an ID row starts an employee, a name row names them,
+    # and every row until the next ID adds the fields still missing
+    current = None
+    for idx in range(header_idx + 1, len(df)):
+        first_col = cell_text[idx, 0]
         
-        if header_idx is None:
-            print("Could not find header row, skipping table")
+        if is_exact_employee_id(first_col):
+            if current and current.get('shimei'):
+                logger.info(f"  Extracted: {current.get('shimei')} (ID: {current.get('shain_id')})")
+                yield AllowanceRecord.from_dict(current)
+            current = {'shain_id': str(first_col)}
+        elif not current:
             continue
+        elif JAPANESE_NAME.search(first_col):
+            current['shimei'] = str(first_col)
         
-        # Parse rows
-        current = None
-        for idx in range(header_idx + 1, len(df)):
-            row = df.iloc[idx]
-            first_col = clean_text(str(row.iloc[0]))
-            
-            # Employee ID
-            if re.match(r'^\d{6}$', first_col):
-                if current and current.get('shimei'):
-                    all_employees.append(current)
-                    print(f"  Extracted: {current.get('shimei')} (ID: {current.get('shain_id')})")
-                
-                current = {'shain_id': first_col}
-                for col_idx in range(1, min(len(row), len(cols))):
-                    value = clean_text(str(row.iloc[col_idx]))
-                    if value and value not in ['', '-', '―', '－']:
-                        field = cols[col_idx]
-                        if field not in current:
-                            num = clean_number(value)
-                            current[field] = num if num else value
-            
-            # Name
-            elif re.search(r'[\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff]{2,}', first_col):
-                if current:
-                    current['shimei'] = first_col
-                    for col_idx in range(1, min(len(row), len(cols))):
-                        value = clean_text(str(row.iloc[col_idx]))
-                        if value and value not in ['', '-', '―', '－']:
-                            field = cols[col_idx]
-                            if field not in current:
-                                num = clean_number(value)
-                                current[field] = num if num else value
-            
-            # More data
-            elif current:
-                for col_idx in range(1, min(len(row), len(cols))):
-                    value = clean_text(str(row.iloc[col_idx]))
-                    if value and value not in ['', '-', '―', '－']:
-                        field = cols[col_idx]
-                        if field not in current:
-                            num = clean_number(value)
-                            current[field] = num if num else value
-        
-        # Last employee
-        if current and current.get('shimei'):
-            all_employees.append(current)
-            print(f"  Extracted: {current.get('shimei')} (ID: {current.get('shain_id')})")
+        _add_row_values(current, cell_values[idx], cols)
     
-    print(f"\n✓ Extracted {len(all_employees)} employee records")
+    # Last employee
+    if current and current.get('shimei'):
+        logger.info(f"  Extracted: {current.get('shimei')} (ID: {current.get('shain_id')})")
+        yield AllowanceRecord.from_dict(current)
+
+
+def _iter_window_records(tables):
+    """Parse the employees of one page window's tables"""
+    for tidx, table in enumerate(tables):
+        yield from _iter_table_records(table, tidx)
+
+
+def _iter_camelot_records(pdf_path, page_numbers):
+    """Parse page windows with Camelot, yielding employees in page order"""
+    for page_window in iter_page_windows(page_numbers, STREAM_WINDOW_PAGES):
+        yield from _iter_window_records(_read_tables_window(pdf_path, format_pages(page_window)))
+
+
+def iter_records(pdf_path, pages='all', employee_id=None, engine='camelot'):
+    """
+    Parse allowance PDF, yielding each employee as soon as their rows end.
+    
+    pages limits extraction to a page selection ('1,3-5'); employee_id first
+    finds the pages mentioning that 6-digit ID in the text layer, then yields
+    only that employee. engine='text' bins text-layer words into the header's
+    column grid instead of running Camelot (see textlayer.py).
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown allowance engine: '{engine}' (expected one of {', '.join(ENGINES)})")
+    
+    logger.info(f"Extracting from: {pdf_path}")
+    
+    page_numbers = select_pages(pdf_path, pages, employee_id)
+    if employee_id is not None:
+        employee_id = str(employee_id).strip()
+    
+    if engine == 'text':
+        employees = iter_text_records(pdf_path, page_numbers)
+    else:
+        employees = _iter_camelot_records(pdf_path, page_numbers)
+    
+    for employee in employees:
+        if employee_id is None or employee.shain_id == employee_id:
+            yield employee
+
+
+def extract_page_records(pdf_path, page_numbers, engine='camelot'):
+    """
+    Extract the employee records of each given page (see src/manifest.py).
+    
+    Args:
+        pdf_path: Path to the allowance PDF file
+        page_numbers: 1-based page numbers to extract
+        engine: 'camelot' or 'text', as in iter_records()
+    
+    Returns:
+        Dictionary of page number -> list of records, one entry per page
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown allowance engine: '{engine}' (expected one of {', '.join(ENGINES)})")
+    
+    page_records = {page_number: [] for page_number in page_numbers}
+    if engine == 'text':
+        for page_number, records in iter_text_page_records(pdf_path, page_numbers):
+            page_records[page_number].extend(records)
+    else:
+        for page_window in iter_page_windows(page_numbers, STREAM_WINDOW_PAGES):
+            tables = _read_tables_window(pdf_path, format_pages(page_window))
+            for tidx, table in enumerate(tables):
+                page_records[int(table.page)].extend(_iter_table_records(table, tidx))
+            tables = table = None
+    return page_records
+
+
+def parse_pdf(pdf_path, pages='all', employee_id=None, engine='camelot'):
+    """Parse allowance PDF - WORKING LOGIC PRESERVED"""
+    all_employees = list(iter_records(pdf_path, pages, employee_id, engine))
+    logger.info(f"\n✓ Extracted {len(all_employees)} employee records")
     return all_employees
 
 
@@ -129,6 +224,9 @@ def main():
     """Main entry point"""
     from pathlib import Path
     from ..common import save_json, save_csv, save_markdown
+    from ..log import configure_logging
+    
+    configure_logging('info')
     
     pdf_path = "materials/運転手手当一覧表 - Untenshu teate ichiran hyō - Driver Allowance List.pdf"
     output_folder = 'output/allowance'
@@ -138,9 +236,10 @@ def main():
     
     if employees:
         Path(output_folder).mkdir(parents=True, exist_ok=True)
-        save_json(employees, f'{output_folder}/driver_allowance.json')
-        save_csv(employees, f'{output_folder}/driver_allowance.csv')
-        save_markdown(employees, f'{output_folder}/driver_allowance.md', 'Driver Allowance List')
+        employee_dicts = [employee.to_dict() for employee in employees]
+        save_json(employee_dicts, f'{output_folder}/driver_allowance.json')
+        save_csv(employee_dicts, f'{output_folder}/driver_allowance.csv')
+        save_markdown(employee_dicts, f'{output_folder}/driver_allowance.md', 'Driver Allowance List')
         print(f"\n✓ Complete! {len(employees)} records → {output_folder}/")
     else:
         print("\n✗ No data found")
@@ -0,0 +1,85 @@
+"""
+Compact allowance record type
+
+Allowance records carry a different subset of RECORD_FIELDS per employee,
+in the order the values were found. AllowanceRecord stores that order as a
+field-name tuple shared by every record with the same layout (a book has a
+few dozen layouts), plus one tuple of values, behind __slots__. to_dict()
+gives back the original dictionary, key order included.
+"""
+
+from .config import RECORD_FIELDS
+
+_KNOWN_FIELDS = frozenset(RECORD_FIELDS)
+
+# field-name tuple -> the shared instance of that tuple
+_layouts = {}
+
+
+def _shared_layout(fields):
+    """Return the shared tuple for a field order, registering it on first use"""
+    layout = _layouts.get(fields)
+    if layout is None:
+        unknown_fields = [field for field in fields if field not in _KNOWN_FIELDS]
+        if unknown_fields:
+            raise ValueError(f"Unknown allowance field(s): {', '.join(unknown_fields)}")
+        layout = _layouts.setdefault(fields, fields)
+    return layout
+
+
+class AllowanceRecord:
+    """
+    One employee's allowance row, fields in extraction order.
+    
+    Args:
+        fields: Tuple of field names (subset of RECORD_FIELDS)
+        values: Tuple of values aligned with fields
+    
+    Raises:
+        ValueError: If a field is not in RECORD_FIELDS or the lengths differ
+    """
+    
+    __slots__ = ('fields', 'values')
+    
+    def __init__(self, fields, values):
+        fields, values = tuple(fields), tuple(values)
+        if len(fields) != len(values):
+            raise ValueError(f"Got {len(values)} values for {len(fields)} allowance fields")
+        self.fields = _shared_layout(fields)
+        self.values = values
+    
+    @classmethod
+    def from_dict(cls, record):
+        """Build a record from a field -> value dictionary (order kept)"""
+        return cls(record.keys(), record.values())
+    
+    @property
+    def shain_id(self):
+        return self.get('shain_id')
+    
+    @property
+    def shimei(self):
+        return self.get('shimei')
+    
+    def get(self, field, default=None):
+        """Value of one field, or default when the row had none"""
+        try:
+            return self.values[self.fields.index(field)]
+        except ValueError:
+            return default
+    
+    def to_dict(self):
+        """Return the record as a dictionary (keys in extraction order)"""
+        return dict(zip(self.fields, self.values))
+    
+    def __reduce__(self):
+        # Rebuild through __init__ so records from worker processes share layouts again
+        return (AllowanceRecord, (self.fields, self.values))
+    
+    def __eq__(self, other):
+        if not isinstance(other, AllowanceRecord):
+            return NotImplemented
+        return self.fields == other.fields and self.values == other.values
+    
+    def __repr__(self):
+        return f"AllowanceRecord(shain_id={self.shain_id!r}, shimei={self.shimei!r}, fields={len(self.fields)})"
@@ -0,0 +1,190 @@
+"""
+Text-layer engine for the allowance list
+
+The allowance list is a born-digital PDF on a fixed column grid, so instead
+of running Camelot's stream analysis this engine reads positioned words
+straight from the text layer (pypdfium2) and bins them into columns:
+
+1. Employee IDs are the 6-digit words in the leftmost column
+2. The header is the band of words just above the first ID; overlapping
+   header words (e.g. '佐川' over 'BA') form one column each
+3. Column boundaries are the midpoints between neighbouring header columns,
+   and every word is assigned to the column its centre falls in
+
+The header always yields one column per field of COLUMNS_37, so the
+37-vs-44 column guess in get_columns() is not needed here.
+"""
+
+import logging
+from bisect import bisect_right
+
+from ..patterns import JAPANESE_CHARACTER
+from ..pdf import iter_page_words
+from ..profiling import span
+from .config import COLUMNS_37
+from .records import AllowanceRecord
+from .utils import clean_number, is_employee_id, is_empty
+
+logger = logging.getLogger(__name__)
+
+# Header lines sit within this many points above the first employee ID
+HEADER_BAND_POINTS = 20
+
+# Names can be split into one-character words ('小林', '智'), so a single
+# kana/kanji is enough here
+NAME_WORD_PATTERN = JAPANESE_CHARACTER
+
+
+def _word_center_x(word):
+    return (word.x0 + word.x1) / 2
+
+
+def _word_center_y(word):
+    return (word.y0 + word.y1) / 2
+
+
+def learn_column_boundaries(header_words):
+    """
+    Derive column boundaries from the header row.
+    
+    Header words that overlap horizontally (a group label over its sub-label)
+    belong to the same column.
+    
+    Args:
+        header_words: PageWord list from the header band
+    
+    Returns:
+        Sorted list of x boundaries between neighbouring columns
+        (one fewer than the number of columns)
+    
+    Raises:
+        ValueError: If the header does not have one column per field
+    """
+    column_spans = []
+    for word in sorted(header_words, key=lambda word: word.x0):
+        if column_spans and word.x0 <= column_spans[-1][1]:
+            column_spans[-1][1] = max(column_spans[-1][1], word.x1)
+        else:
+            column_spans.append([word.x0, word.x1])
+    
+    if len(column_spans) != len(COLUMNS_37):
+        raise ValueError(f"Header has {len(column_spans)} columns, expected {len(COLUMNS_37)}")
+    
+    column_centers = [(x0 + x1) / 2 for x0, x1 in column_spans]
+    return [(left + right) / 2 for left, right in zip(column_centers, column_centers[1:])]
+
+
+def _find_employee_id_words(words, first_boundary=float('inf')):
+    """Return the 6-digit words left of first_boundary, top of the page first"""
+    id_words = [
+        word for word in words
+        if is_employee_id(word.text) and _word_center_x(word) < first_boundary
+    ]
+    return sorted(id_words, key=lambda word: -word.y1)
+
+
+def _find_header_words(words, first_id_word):
+    """Return the words in the band just above the first employee ID"""
+    return [
+        word for word in words
+        if word.y0 > first_id_word.y1 and word.y1 <= first_id_word.y1 + HEADER_BAND_POINTS
+    ]
+
+
+def _build_employee_record(id_word, block_words, boundaries):
+    """
+    Build one employee record from the words of their row block.
+    
+    Args:
+        id_word: PageWord holding the employee ID
+        block_words: Words between this ID and the next one
+        boundaries: Column boundaries from learn_column_boundaries()
+    
+    Returns:
+        AllowanceRecord (shain_id, fields in column order, shimei)
+    """
+    name_words = []
+    column_values = {}
+    
+    # Top-to-bottom, left-to-right, so the first value of a cell wins
+    for word in sorted(block_words, key=lambda word: (-word.y1, word.x0)):
+        column_index = bisect_right(boundaries, _word_center_x(word))
+        if column_index == 0:
+            if NAME_WORD_PATTERN.search(word.text):
+                name_words.append(word)
+        elif not is_empty(word.text) and column_index not in column_values:
+            number = clean_number(word.text)
+            column_values[column_index] = number if number else word.text
+    
+    record = {'shain_id': id_word.text}
+    for column_index in sorted(column_values):
+        field = COLUMNS_37[column_index]
+        if field not in record:
+            record[field] = column_values[column_index]
+    record['shimei'] = ' '.join(word.text for word in sorted(name_words, key=lambda word: word.x0))
+    return AllowanceRecord.from_dict(record)
+
+
+def parse_page_words(words):
+    """
+    Parse the employees on one page from its positioned words.
+    
+    Args:
+        words: PageWord list for the page
+    
+    Yields:
+        AllowanceRecord per employee, top of the page first
+    """
+    # The first employee's ID line is the topmost 6-digit word on the page;
+    # the learned boundaries then keep only IDs in the leftmost column
+    candidate_id_words = _find_employee_id_words(words)
+    if not candidate_id_words:
+        return
+    
+    boundaries = learn_column_boundaries(_find_header_words(words, candidate_id_words[0]))
+    id_words = _find_employee_id_words(words, boundaries[0])
+    
+    for id_index, id_word in enumerate(id_words):
+        lower_y = id_words[id_index + 1].y1 if id_index + 1 < len(id_words) else float('-inf')
+        block_words = [
+            word for word in words
+            if word is not id_word and lower_y < _word_center_y(word) <= id_word.y1
+        ]
+        record = _build_employee_record(id_word, block_words, boundaries)
+        if record.shimei:
+            yield record
+
+
+def iter_text_records(pdf_path, page_numbers):
+    """
+    Parse allowance records from the PDF text layer.
+    
+    Args:
+        pdf_path: Path to the allowance PDF file
+        page_numbers: 1-based page numbers to read
+    
+    Yields:
+        AllowanceRecord per employee, in page order
+    """
+    for _, page_records in iter_text_page_records(pdf_path, page_numbers):
+        yield from page_records
+
+
+def iter_text_page_records(pdf_path, page_numbers):
+    """
+    Parse allowance records from the PDF text layer, page by page.
+    
+    Args:
+        pdf_path: Path to the allowance PDF file
+        page_numbers: 1-based page numbers to read
+    
+    Yields:
+        Tuple of (page_number, list of AllowanceRecord), in page order
+    """
+    for page_number, words in iter_page_words(pdf_path, page_numbers):
+        logger.debug(f"\nReading text layer of page {page_number}...")
+        with span('text_parse_page'):
+            page_records = list(parse_page_words(words))
+        for record in page_records:
+            logger.info(f"  Extracted: {record.shimei} (ID: {record.shain_id})")
+        yield page_number, page_records
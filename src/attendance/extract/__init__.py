@@ -12,11 +12,16 @@ from .salary import (
     extract_salary_field,
     extract_column6_salary_data,
     extract_all_salary_field_components,
+    index_field_rows,
     FIELD_LABELS,
+    FIELD_LABEL_PATTERN,
 )
 from .employee import (
+    locate_employee_rows,
     find_employee_rows_in_table,
     extract_employee_id_and_name,
+    extract_employee_name,
+    EmployeeMatch,
     parse_attendance_counts_from_salary_data,
     extract_working_hours_from_salary_rows,
     ATTENDANCE_KEYWORDS_TO_SKIP,
@@ -30,9 +35,14 @@ __all__ = [
     'extract_salary_field',
     'extract_column6_salary_data',
     'extract_all_salary_field_components',
+    'index_field_rows',
     'FIELD_LABELS',
+    'FIELD_LABEL_PATTERN',
+    'locate_employee_rows',
     'find_employee_rows_in_table',
     'extract_employee_id_and_name',
+    'extract_employee_name',
+    'EmployeeMatch',
     'parse_attendance_counts_from_salary_data',
     'extract_working_hours_from_salary_rows',
     'ATTENDANCE_KEYWORDS_TO_SKIP',
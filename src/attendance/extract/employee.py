@@ -2,7 +2,11 @@
 Employee extraction for attendance parser
 """
 
-import re
+from typing import NamedTuple
+
+from ...patterns import (
+    CELL_EMPLOYEE_ID, MARKER_LINE, SPACED_NAME, find_employee_id, find_working_hours, is_digits,
+)
 
 
 # Keywords to exclude when extracting employee names
@@ -18,6 +22,16 @@ ATTENDANCE_KEYWORDS_TO_SKIP = [
     '無欠'    # No absence
 ]
 
+# 6-digit employee ID, searched in the first 3 columns of each row
+EMPLOYEE_ID_PATTERN = CELL_EMPLOYEE_ID
+
+
+class EmployeeMatch(NamedTuple):
+    """An employee row located in a table, with the ID and the cell it came from"""
+    row_index: int
+    employee_id: str
+    cell_content: str
+
 
 def _cell_contains_employee_id(cell_content):
     """
@@ -29,25 +43,41 @@ def _cell_contains_employee_id(cell_content):
     Returns:
         True if cell contains employee ID pattern, False otherwise
     """
-    return re.search(r'\b(\d{6})\b', str(cell_content)) is not None
+    return find_employee_id(cell_content) is not None
 
 
-def _scan_row_for_employee_id(table_dataframe, row_index):
+def locate_employee_rows(table_dataframe):
     """
-    Scan first 3 columns of a row to find employee ID.
+    Locate all employee records in a table in one vectorized pass.
+    
+    Runs the employee ID pattern over the first 3 columns with pandas
+    str.extract instead of per-cell iloc access. For each row, the leftmost
+    column holding an ID wins, matching the row-by-row scan.
     
     Args:
-        table_dataframe: DataFrame from the table
-        row_index: Index of the row to scan
+        table_dataframe: DataFrame from a single table in the PDF
     
     Returns:
-        Column index where employee ID was found, or None
+        List of EmployeeMatch(row_index, employee_id, cell_content) in row order
     """
-    for column_index in range(min(3, len(table_dataframe.columns))):
-        current_cell_content = str(table_dataframe.iloc[row_index, column_index])
-        if _cell_contains_employee_id(current_cell_content):
-            return column_index
-    return None
+    id_columns = table_dataframe.iloc[:, :3].astype(str)
+    if id_columns.empty:
+        return []
+    
+    # One extract per column: the ID found in each cell, or NaN
+    extracted_id_frame = id_columns.apply(lambda column: column.str.extract(EMPLOYEE_ID_PATTERN, expand=False))
+    has_employee_id = extracted_id_frame.notna().to_numpy()
+    extracted_ids = extracted_id_frame.to_numpy()
+    cell_contents = id_columns.to_numpy()
+    
+    employee_matches = []
+    for row_index in has_employee_id.any(axis=1).nonzero()[0]:
+        column_index = int(has_employee_id[row_index].argmax())
+        employee_matches.append(EmployeeMatch(
+            int(row_index), extracted_ids[row_index, column_index], cell_contents[row_index, column_index]
+        ))
+    
+    return employee_matches
 
 
 def find_employee_rows_in_table(table_dataframe):
@@ -63,14 +93,7 @@ def find_employee_rows_in_table(table_dataframe):
     Returns:
         List of row indices containing employee records
     """
-    employee_row_indices = []
-    
-    # Scan each row for employee ID
-    for row_index in range(len(table_dataframe)):
-        if _scan_row_for_employee_id(table_dataframe, row_index) is not None:
-            employee_row_indices.append(row_index)
-    
-    return employee_row_indices
+    return [employee_match.row_index for employee_match in locate_employee_rows(table_dataframe)]
 
 
 def _extract_employee_id_from_cell(cell_content):
@@ -83,8 +106,7 @@ def _extract_employee_id_from_cell(cell_content):
     Returns:
         Employee ID string or None if not found
     """
-    employee_id_match = re.search(r'\b(\d{6})\b', str(cell_content))
-    return employee_id_match.group(1) if employee_id_match else None
+    return find_employee_id(cell_content)
 
 
 def _is_valid_name_line(text_line):
@@ -99,7 +121,7 @@ def _is_valid_name_line(text_line):
     """
     if text_line in ATTENDANCE_KEYWORDS_TO_SKIP:
         return False
-    if re.match(r'^[A-Z0-9ｱ-ﾝァ-ヶー]+$', text_line):
+    if MARKER_LINE.match(text_line):
         return False
     return True
 
@@ -114,7 +136,7 @@ def _extract_name_from_line(text_line):
     Returns:
         Name string if found, None otherwise
     """
-    name_match = re.search(r'([一-龯ぁ-んァ-ヶー]+\s+[一-龯ぁ-んァ-ヶー]+)', text_line)
+    name_match = SPACED_NAME.search(text_line)
     return name_match.group(1).strip() if name_match else None
 
 
@@ -166,6 +188,21 @@ def _find_cell_with_employee_id(table_dataframe, employee_row_index):
     return None, None
 
 
+def extract_employee_name(employee_match):
+    """
+    Extract the employee name from a located employee row.
+    
+    The name sits in the same cell as the ID, so no further table scan is needed.
+    
+    Args:
+        employee_match: EmployeeMatch from locate_employee_rows
+    
+    Returns:
+        Name string or None if not found
+    """
+    return _extract_name_from_cell_content(employee_match.cell_content)
+
+
 def extract_employee_id_and_name(table_dataframe, employee_row_index):
     """
     Extract employee ID and name from a row.
@@ -205,7 +242,7 @@ def _is_numeric_line(text_line):
     Returns:
         True if line is numeric, False otherwise
     """
-    return text_line and re.match(r'^\d+$', text_line) is not None
+    return text_line and is_digits(text_line)
 
 
 def _is_in_valid_shukkin_range(current_number):
@@ -331,8 +368,7 @@ def _extract_time_from_cell(cell_content):
     if '稼働時間' not in cell_content:
         return None
     
-    working_hours_match = re.search(r'(\d+:\d+)', cell_content)
-    return working_hours_match.group(1) if working_hours_match else None
+    return find_working_hours(cell_content)
 
 
 def extract_working_hours_from_salary_rows(salary_column_rows):
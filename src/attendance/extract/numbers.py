@@ -2,17 +2,16 @@
 Number extraction utilities for attendance parser
 """
 
-import re
-import pandas as pd
+from ...common import is_missing
+from ...patterns import find_integers
 
 
 def extract_all_numbers(text):
     """Extract all integers from text, removing commas and spaces"""
-    if not text or pd.isna(text):
+    if not text or is_missing(text):
         return []
     text_str = str(text).replace(',', '').replace(' ', '')
-    numbers = re.findall(r'\d+', text_str)
-    return [int(n) for n in numbers]
+    return find_integers(text_str)
 
 
 def is_spaced_digit_garbage(text):
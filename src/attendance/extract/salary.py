@@ -2,19 +2,33 @@
 Salary field extraction for attendance parser
 """
 
+import logging
 import re
+
+from ...patterns import find_working_hours
+from ...profiling import timed
 from .numbers import extract_all_numbers, is_spaced_digit_garbage, extract_count_from_spaced_garbage
 
+logger = logging.getLogger(__name__)
+
 
 FIELD_LABELS = [
     "基 本 給", "基本給", "保障残業", "乗車手当", "佐川割増手当",
     "ダブル手当", "臨時手当", "夜勤手当", "休日手当", "長距離手当",
     "その他", "計", "稼働時間"
 ]
+FIELD_LABEL_SET = frozenset(FIELD_LABELS)
 
 # Fields that require special garbage pattern handling
 FIELDS_WITH_GARBAGE_PATTERNS = ['長距離手当', 'その他', '休日手当']
 
+# One alternation over every label, longest first. No label overlaps another
+# (none is a substring of, or shares a prefix/suffix with, another), so a
+# single findall() pass finds every label in a text.
+FIELD_LABEL_PATTERN = re.compile(
+    '|'.join(re.escape(label) for label in sorted(FIELD_LABELS, key=len, reverse=True))
+)
+
 
 def _is_field_with_special_handling(field_label):
     """Check if field requires special garbage pattern handling."""
@@ -175,7 +189,25 @@ def _find_field_in_rows(rows_data, field_label):
     return None
 
 
-def extract_salary_field_from_rows(rows_data, field_label):
+def index_field_rows(rows_data):
+    """
+    Label every row in a single pass over the column 6 data.
+    
+    Args:
+        rows_data: List of row data strings
+    
+    Returns:
+        Dictionary mapping each field label found to the index of the
+        first row containing it
+    """
+    label_row_indices = {}
+    for row_index, row_data in enumerate(rows_data):
+        for field_label in FIELD_LABEL_PATTERN.findall(row_data):
+            label_row_indices.setdefault(field_label, row_index)
+    return label_row_indices
+
+
+def extract_salary_field_from_rows(rows_data, field_label, label_row_indices=None):
     """
     Extract count and amount for a salary field from a list of row data.
     
@@ -186,12 +218,18 @@ def extract_salary_field_from_rows(rows_data, field_label):
     Args:
         rows_data: List of row data strings
         field_label: Label of the salary field to extract
+        label_row_indices: Optional index from index_field_rows(rows_data);
+            turns the row search into a dictionary lookup
     
     Returns:
         Dictionary with 'count' and 'amount' keys
     """
     # Find the row containing this field
-    row_with_field = _find_field_in_rows(rows_data, field_label)
+    if label_row_indices is not None and field_label in FIELD_LABEL_SET:
+        row_index = label_row_indices.get(field_label)
+        row_with_field = rows_data[row_index] if row_index is not None else None
+    else:
+        row_with_field = _find_field_in_rows(rows_data, field_label)
     if row_with_field is None:
         return {'count': 0, 'amount': 0}
     
@@ -239,10 +277,7 @@ def _is_another_field_label(line_text, current_field_label):
     Returns:
         True if line is a different field label, False otherwise
     """
-    for label in FIELD_LABELS:
-        if label in line_text and label != current_field_label:
-            return True
-    return False
+    return any(label != current_field_label for label in FIELD_LABEL_PATTERN.findall(line_text))
 
 
 def _extract_numbers_after_label(lines, label_index, field_label):
@@ -305,13 +340,14 @@ def extract_salary_field(col6_text, field_label):
         # Extract numbers from lines after label
         numbers = _extract_numbers_after_label(lines, label_index, field_label)
         return _extract_standard_field_result(numbers)
-        
+    
     except Exception as exception:
-        print(f"  Error extracting {field_label}: {exception}")
+        logger.warning(f"Error extracting {field_label}: {exception}")
         return {'count': 0, 'amount': 0}
 
 
-def extract_column6_salary_data(table_dataframe, employee_start_row_index, employee_end_row_index):
+@timed('column6_parse')
+def extract_column6_salary_data(table_columns, employee_start_row_index, employee_end_row_index):
     """
     Extract all salary data from column 6 for an employee.
     
@@ -320,7 +356,8 @@ def extract_column6_salary_data(table_dataframe, employee_start_row_index, emplo
     Also extracts working hours (稼働時間) which appears in this column.
     
     Args:
-        table_dataframe: DataFrame from the table
+        table_columns: Table as a list of column lists of strings, converted
+            once per table and shared by all its employees
         employee_start_row_index: Starting row index for this employee
         employee_end_row_index: Ending row index for this employee
     
@@ -328,80 +365,16 @@ def extract_column6_salary_data(table_dataframe, employee_start_row_index, emplo
         Tuple of (salary_rows_list, working_hours_string)
     """
     extracted_working_hours = ""
-    extracted_salary_rows = []
-    
-    # Scan column 6 from employee start to end row
-    for row_index in range(employee_start_row_index, min(employee_end_row_index, len(table_dataframe))):
-        column6_cell_content = str(table_dataframe.iloc[row_index, 6])
-        extracted_salary_rows.append(column6_cell_content)
-        
-        # Look for working hours (時:分 format)
-        if '稼働時間' in column6_cell_content:
-            working_hours_match = re.search(r'(\d+:\d+)', column6_cell_content)
-            if working_hours_match:
-                extracted_working_hours = working_hours_match.group(1)
-    
-    return extracted_salary_rows, extracted_working_hours
-
-
-def extract_all_salary_field_components(salary_column_rows):
-    """
-    Extract all salary components from column 6 rows.
     
-    Why separate function: Salary fields need row-based extraction to handle
-    different data formats (standard vs. reversed label placement).
+    # Slice column 6 from employee start to end row
+    extracted_salary_rows = table_columns[6][employee_start_row_index:employee_end_row_index]
     
-    Args:
-        salary_column_rows: List of column 6 cell contents
-    
-    Returns:
-        Dictionary with counts and amounts for each salary component
-    """
-    return {
-        'base_salary': extract_salary_field_from_rows(salary_column_rows, '基 本 給') or 
-                      extract_salary_field_from_rows(salary_column_rows, '基本給'),
-        'guaranteed_overtime': extract_salary_field_from_rows(salary_column_rows, '保障残業'),
-        'commute_allowance': extract_salary_field_from_rows(salary_column_rows, '乗車手当'),
-        'sagawa_markup_allowance': extract_salary_field_from_rows(salary_column_rows, '佐川割増手当'),
-        'double_allowance': extract_salary_field_from_rows(salary_column_rows, 'ダブル手当'),
-        'temp_allowance': extract_salary_field_from_rows(salary_column_rows, '臨時手当'),
-        'night_shift_allowance': extract_salary_field_from_rows(salary_column_rows, '夜勤手当'),
-        'holiday_allowance': extract_salary_field_from_rows(salary_column_rows, '休日手当'),
-        'longdist_allowance': extract_salary_field_from_rows(salary_column_rows, '長距離手当'),
-        'other_allowance': extract_salary_field_from_rows(salary_column_rows, 'その他'),
-        'total_amount': extract_salary_field_from_rows(salary_column_rows, '計'),
-    }
-
-
-def extract_column6_salary_data(table_dataframe, employee_start_row_index, employee_end_row_index):
-    """
-    Extract all salary data from column 6 for an employee.
-    
-    Column 6 contains structured salary information across multiple rows.
-    We preserve the row-by-row structure to properly parse different field formats.
-    Also extracts working hours (稼働時間) which appears in this column.
-    
-    Args:
-        table_dataframe: DataFrame from the table
-        employee_start_row_index: Starting row index for this employee
-        employee_end_row_index: Ending row index for this employee
-    
-    Returns:
-        Tuple of (salary_rows_list, working_hours_string)
-    """
-    extracted_working_hours = ""
-    extracted_salary_rows = []
-    
-    # Scan column 6 from employee start to end row
-    for row_index in range(employee_start_row_index, min(employee_end_row_index, len(table_dataframe))):
-        column6_cell_content = str(table_dataframe.iloc[row_index, 6])
-        extracted_salary_rows.append(column6_cell_content)
-        
-        # Look for working hours (時:分 format)
+    # Look for working hours (時:分 format); the last labelled row wins
+    for column6_cell_content in extracted_salary_rows:
         if '稼働時間' in column6_cell_content:
-            working_hours_match = re.search(r'(\d+:\d+)', column6_cell_content)
-            if working_hours_match:
-                extracted_working_hours = working_hours_match.group(1)
+            working_hours = find_working_hours(column6_cell_content)
+            if working_hours:
+                extracted_working_hours = working_hours
     
     return extracted_salary_rows, extracted_working_hours
 
@@ -419,17 +392,20 @@ def extract_all_salary_field_components(salary_column_rows):
     Returns:
         Dictionary with counts and amounts for each salary component
     """
+    # Label all rows once; each field below is then a dictionary lookup
+    label_row_indices = index_field_rows(salary_column_rows)
+    
     return {
-        'base_salary': extract_salary_field_from_rows(salary_column_rows, '基 本 給') or 
-                      extract_salary_field_from_rows(salary_column_rows, '基本給'),
-        'guaranteed_overtime': extract_salary_field_from_rows(salary_column_rows, '保障残業'),
-        'commute_allowance': extract_salary_field_from_rows(salary_column_rows, '乗車手当'),
-        'sagawa_markup_allowance': extract_salary_field_from_rows(salary_column_rows, '佐川割増手当'),
-        'double_allowance': extract_salary_field_from_rows(salary_column_rows, 'ダブル手当'),
-        'temp_allowance': extract_salary_field_from_rows(salary_column_rows, '臨時手当'),
-        'night_shift_allowance': extract_salary_field_from_rows(salary_column_rows, '夜勤手当'),
-        'holiday_allowance': extract_salary_field_from_rows(salary_column_rows, '休日手当'),
-        'longdist_allowance': extract_salary_field_from_rows(salary_column_rows, '長距離手当'),
-        'other_allowance': extract_salary_field_from_rows(salary_column_rows, 'その他'),
-        'total_amount': extract_salary_field_from_rows(salary_column_rows, '計'),
+        'base_salary': extract_salary_field_from_rows(salary_column_rows, '基 本 給', label_row_indices) or 
+                      extract_salary_field_from_rows(salary_column_rows, '基本給', label_row_indices),
+        'guaranteed_overtime': extract_salary_field_from_rows(salary_column_rows, '保障残業', label_row_indices),
+        'commute_allowance': extract_salary_field_from_rows(salary_column_rows, '乗車手当', label_row_indices),
+        'sagawa_markup_allowance': extract_salary_field_from_rows(salary_column_rows, '佐川割増手当', label_row_indices),
+        'double_allowance': extract_salary_field_from_rows(salary_column_rows, 'ダブル手当', label_row_indices),
+        'temp_allowance': extract_salary_field_from_rows(salary_column_rows, '臨時手当', label_row_indices),
+        'night_shift_allowance': extract_salary_field_from_rows(salary_column_rows, '夜勤手当', label_row_indices),
+        'holiday_allowance': extract_salary_field_from_rows(salary_column_rows, '休日手当', label_row_indices),
+        'longdist_allowance': extract_salary_field_from_rows(salary_column_rows, '長距離手当', label_row_indices),
+        'other_allowance': extract_salary_field_from_rows(salary_column_rows, 'その他', label_row_indices),
+        'total_amount': extract_salary_field_from_rows(salary_column_rows, '計', label_row_indices),
     }
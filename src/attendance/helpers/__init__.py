@@ -1,22 +1,29 @@
 """Helper functions for attendance PDF parsing"""
 
-from .validation import validate_pdf_tables
-from .table import process_table
+from .validation import validate_pdf_tables, validate_table_count
+from .table import process_table, describe_table_layout
+from .prefilter import is_employee_table_page, prefilter_pages
 from .employee import (
     process_employee_in_table,
     build_employee_record,
 )
 from .extraction import extract_attendance_and_salary_data
 from .utils import (
+    table_to_columns,
     table_has_salary_column,
     determine_employee_data_range,
 )
 
 __all__ = [
     'validate_pdf_tables',
+    'validate_table_count',
+    'table_to_columns',
     'table_has_salary_column',
     'determine_employee_data_range',
     'process_table',
+    'describe_table_layout',
+    'is_employee_table_page',
+    'prefilter_pages',
     'process_employee_in_table',
     'build_employee_record',
     'extract_attendance_and_salary_data',
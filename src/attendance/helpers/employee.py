@@ -1,14 +1,29 @@
 """Employee record helpers for PDF parsing"""
 
+import logging
+
+from ...profiling import timed
+from ..records import AttendanceRecord
 from ..extract import (
     extract_employee_id_and_name,
+    extract_employee_name,
     extract_column6_salary_data,
 )
-from .utils import table_has_salary_column, determine_employee_data_range
+from .utils import table_to_columns, table_has_salary_column, determine_employee_data_range
 from .extraction import extract_attendance_and_salary_data
 
+logger = logging.getLogger(__name__)
+
+# extract_attendance_and_salary_data keys, aligned with COUNTED_FIELDS[2:] (kihon_kyu ... sonota)
+SALARY_FIELD_KEYS = (
+    'base_salary', 'guaranteed_overtime', 'commute_allowance', 'sagawa_markup_allowance', 'double_allowance',
+    'temp_allowance', 'night_shift_allowance', 'holiday_allowance', 'longdist_allowance', 'other_allowance',
+)
 
-def process_employee_in_table(table_dataframe, employee_sequence_index, employee_row_index, employee_row_indices):
+
+@timed('process_employee')
+def process_employee_in_table(table_dataframe, employee_sequence_index, employee_row_index, employee_row_indices,
+                              employee_match=None, table_columns=None):
     """
     Process a single employee record from a table.
     
@@ -17,17 +32,24 @@ def process_employee_in_table(table_dataframe, employee_sequence_index, employee
         employee_sequence_index: Position in employee list
         employee_row_index: Row index of this employee
         employee_row_indices: All employee row indices
+        employee_match: EmployeeMatch from locate_employee_rows; when given,
+            the ID and name come from it instead of rescanning the row
+        table_columns: Columns from table_to_columns, shared by all employees
+            of the table (converted here when not given)
     
     Returns:
         Employee record dictionary or None if employee should be skipped
     """
     # Extract basic employee info
-    employee_id, employee_name = extract_employee_id_and_name(table_dataframe, employee_row_index)
+    if employee_match is not None:
+        employee_id, employee_name = employee_match.employee_id, extract_employee_name(employee_match)
+    else:
+        employee_id, employee_name = extract_employee_id_and_name(table_dataframe, employee_row_index)
     
     if not employee_id:
         return None
     
-    print(f"    Employee: {employee_id} - {employee_name}")
+    logger.info(f"    Employee: {employee_id} - {employee_name}")
     
     # Ensure table has salary data column
     if not table_has_salary_column(table_dataframe):
@@ -39,8 +61,10 @@ def process_employee_in_table(table_dataframe, employee_sequence_index, employee
     )
     
     # Extract column 6 salary data for this employee
+    if table_columns is None:
+        table_columns = table_to_columns(table_dataframe)
     extracted_salary_rows, extracted_working_hours = extract_column6_salary_data(
-        table_dataframe, employee_data_start_row_index, employee_data_end_row_index
+        table_columns, employee_data_start_row_index, employee_data_end_row_index
     )
     
     # Extract attendance and salary data
@@ -69,25 +93,15 @@ def build_employee_record(employee_id, employee_name, extracted_working_hours, p
         extracted_salary_fields: Dictionary of salary field data
     
     Returns:
-        Dictionary containing complete employee record
+        AttendanceRecord (to_dict() gives the JSON shape)
     """
-    total_salary_amount = extracted_salary_fields['total_amount']['amount']
+    salary_amounts = [extracted_salary_fields[salary_key] for salary_key in SALARY_FIELD_KEYS]
     
-    return {
-        'employee_id': employee_id,
-        'name': employee_name if employee_name else "",
-        'shukkin': {'count': max(parsed_shukkin_count, 0), 'amount': 0},
-        'kokyu': {'count': max(parsed_kokyu_count, 0), 'amount': 0},
-        'kado_jikan': extracted_working_hours,
-        'kihon_kyu': extracted_salary_fields['base_salary'],
-        'hosho_zangyo': extracted_salary_fields['guaranteed_overtime'],
-        'josha_teate': extracted_salary_fields['commute_allowance'],
-        'sagawa_warimashi_teate': extracted_salary_fields['sagawa_markup_allowance'],
-        'double_teate': extracted_salary_fields['double_allowance'],
-        'rinji_teate': extracted_salary_fields['temp_allowance'],
-        'yakin_teate': extracted_salary_fields['night_shift_allowance'],
-        'kyujitsu_teate': extracted_salary_fields['holiday_allowance'],
-        'chokyori_teate': extracted_salary_fields['longdist_allowance'],
-        'sonota': extracted_salary_fields['other_allowance'],
-        'kei': total_salary_amount
-    }
+    return AttendanceRecord(
+        employee_id,
+        employee_name if employee_name else "",
+        extracted_working_hours,
+        extracted_salary_fields['total_amount']['amount'],
+        [max(parsed_shukkin_count, 0), max(parsed_kokyu_count, 0)] + [field['count'] for field in salary_amounts],
+        [0, 0] + [field['amount'] for field in salary_amounts],
+    )
@@ -1,11 +1,13 @@
 """Data extraction helpers for PDF parsing"""
 
+from ...profiling import timed
 from ..extract import (
     parse_attendance_counts_from_salary_data,
     extract_all_salary_field_components,
 )
 
 
+@timed('salary_fields')
 def extract_attendance_and_salary_data(extracted_salary_rows):
     """
     Extract attendance counts and salary field components.
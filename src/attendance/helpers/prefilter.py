@@ -0,0 +1,49 @@
+"""Text-layer page prefilter, run before lattice extraction"""
+
+from ...patterns import PAGE_EMPLOYEE_ID
+from ...pdf import iter_page_texts
+from ..extract.salary import FIELD_LABEL_PATTERN
+
+# A standalone 6-digit number, as employee IDs appear in the text layer
+PAGE_EMPLOYEE_ID_PATTERN = PAGE_EMPLOYEE_ID
+
+
+def is_employee_table_page(page_text):
+    """
+    Check whether a page's text looks like an employee attendance table.
+    
+    Args:
+        page_text: Text layer of the page
+    
+    Returns:
+        True if the page has a 6-digit employee ID and a salary field label
+    """
+    return bool(PAGE_EMPLOYEE_ID_PATTERN.search(page_text) and FIELD_LABEL_PATTERN.search(page_text))
+
+
+def prefilter_pages(pdf_path, page_numbers):
+    """
+    Keep only pages worth running lattice line detection on.
+    
+    Cover sheets, summary pages and blank pages have no employee table, so
+    reading their text layer (cheap) spares the OpenCV pass (expensive).
+    Pages without a text layer (scans) are skipped as well, since Camelot
+    cannot read them either.
+    
+    Args:
+        pdf_path: Path to the attendance PDF file
+        page_numbers: Candidate 1-based page numbers
+    
+    Returns:
+        Tuple of (kept_page_numbers, skipped_page_numbers)
+    """
+    kept_page_numbers = []
+    skipped_page_numbers = []
+    
+    for page_number, page_text in iter_page_texts(pdf_path, page_numbers):
+        if is_employee_table_page(page_text):
+            kept_page_numbers.append(page_number)
+        else:
+            skipped_page_numbers.append(page_number)
+    
+    return kept_page_numbers, skipped_page_numbers
@@ -1,9 +1,16 @@
 """Table-level helpers for PDF parsing"""
 
-from ..extract import find_employee_rows_in_table
+import logging
+
+from ...profiling import span, timed
+from ..extract import locate_employee_rows, FIELD_LABEL_PATTERN
 from .employee import process_employee_in_table
+from .utils import table_to_columns
+
+logger = logging.getLogger(__name__)
 
 
+@timed('process_table')
 def process_table(table_object, table_sequence_index, total_tables):
     """
     Process all employees in a single table.
@@ -11,27 +18,67 @@ def process_table(table_object, table_sequence_index, total_tables):
     Args:
         table_object: Camelot table object
         table_sequence_index: Position in table list
-        total_tables: Total number of tables
+        total_tables: Total number of tables, or None when streaming
     
     Returns:
         List of employee records from this table
     """
     table_dataframe = table_object.df
-    print(f"Processing table {table_sequence_index + 1}/{total_tables}, shape: {table_dataframe.shape}")
+    table_position = f"{table_sequence_index + 1}/{total_tables}" if total_tables else f"{table_sequence_index + 1}"
+    logger.debug(f"Processing table {table_position}, shape: {table_dataframe.shape}")
     
-    # Find all employee records in this table
-    employee_row_indices = find_employee_rows_in_table(table_dataframe)
-    print(f"  Found {len(employee_row_indices)} employees at rows: {employee_row_indices}")
+    # Find all employee records in this table (rows, IDs and ID cells in one pass)
+    with span('row_detection'):
+        employee_matches = locate_employee_rows(table_dataframe)
+    employee_row_indices = [employee_match.row_index for employee_match in employee_matches]
+    logger.debug(f"  Found {len(employee_row_indices)} employees at rows: {employee_row_indices}")
+    
+    # Convert cells once; every employee in the table slices the same columns
+    with span('table_to_columns'):
+        table_columns = table_to_columns(table_dataframe) if employee_matches else []
     
     table_employee_records = []
     
     # Process each employee in the table
-    for employee_sequence_index, employee_row_index in enumerate(employee_row_indices):
+    for employee_sequence_index, employee_match in enumerate(employee_matches):
         employee_record = process_employee_in_table(
-            table_dataframe, employee_sequence_index, employee_row_index, employee_row_indices
+            table_dataframe, employee_sequence_index, employee_match.row_index, employee_row_indices,
+            employee_match, table_columns
         )
         
         if employee_record is not None:
             table_employee_records.append(employee_record)
     
     return table_employee_records
+
+
+def describe_table_layout(table_dataframe):
+    """
+    Summarise where employees and salary labels sit, for layout templates.
+    
+    Two tables from the same form give the same description, so a table read
+    with a replayed template is accepted only if it matches the learned one.
+    
+    Args:
+        table_dataframe: DataFrame from the table
+    
+    Returns:
+        Dictionary with the table shape, employee rows and [column, row, label]
+        positions of salary field labels, or None if the table has no employees
+    """
+    employee_matches = locate_employee_rows(table_dataframe)
+    if not employee_matches:
+        return None
+    
+    field_label_positions = [
+        [column_index, row_index, field_label]
+        for column_index, column in enumerate(table_to_columns(table_dataframe))
+        for row_index, cell in enumerate(column)
+        for field_label in FIELD_LABEL_PATTERN.findall(cell)
+    ]
+    
+    return {
+        'shape': [int(size) for size in table_dataframe.shape],
+        'employee_rows': [int(employee_match.row_index) for employee_match in employee_matches],
+        'field_labels': field_label_positions,
+    }
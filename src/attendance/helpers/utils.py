@@ -1,6 +1,22 @@
 """Utility helpers for table and employee processing"""
 
 
+def table_to_columns(table_dataframe):
+    """
+    Convert a table to a list of column lists of strings, once per table.
+    
+    Extractors slice these plain lists instead of calling DataFrame.iloc
+    per cell, which is one of the slowest pandas access paths.
+    
+    Args:
+        table_dataframe: DataFrame from the table
+    
+    Returns:
+        List of columns, each a list of cell strings (row order)
+    """
+    return [[str(cell) for cell in column] for column in table_dataframe.to_numpy(dtype=object).T]
+
+
 def table_has_salary_column(table_dataframe):
     """
     Check if table has salary data column (column 6).
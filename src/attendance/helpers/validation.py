@@ -13,3 +13,17 @@ def validate_pdf_tables(extracted_pdf_tables):
     """
     if not extracted_pdf_tables or len(extracted_pdf_tables) == 0:
         raise ValueError("No tables found in PDF")
+
+
+def validate_table_count(total_table_count):
+    """
+    Validate that at least one table was extracted across all page chunks.
+    
+    Args:
+        total_table_count: Number of tables found in the whole PDF
+    
+    Raises:
+        ValueError: If no tables found in PDF
+    """
+    if total_table_count == 0:
+        raise ValueError("No tables found in PDF")
@@ -9,17 +9,262 @@ PDF structure:
 - Multiple tables (one per day)
 - Each table has 4 employees at fixed row positions
 - Employee IDs in columns 0-2, salary data in column 6
+
+Execution modes:
+- Sequential: pages read in small windows in this process
+- Parallel: pages split into chunks, each chunk extracted in a worker process
+
+Pages matching the learned layout template (src/templates.py) replay its
+grid instead of running line detection; the others use full lattice.
+
+A text-layer prefilter runs first, so cover sheets, summaries and blank
+pages never reach lattice line detection.
+
+Both modes stream: iter_records() yields records in page order as tables
+complete, and parse_pdf() collects them into a list. Under a memory ceiling
+(src/memory.py) windows, chunks and workers shrink to fit it.
 """
 
-import camelot
+import logging
+import math
+import os
 
+from .. import profiling
+from ..cache import file_sha256
+from ..log import configure_logging
+from ..memory import chunk_size_within, iter_page_windows, limit_processes
+from ..pdf import chunk_pages, format_pages, select_pages
+from ..tables import read_tables, get_default_cache
+from ..templates import LayoutTemplates, templates_enabled
 from .helpers import (
-    validate_pdf_tables,
+    validate_table_count,
     process_table,
+    prefilter_pages,
+    describe_table_layout,
 )
 
+logger = logging.getLogger(__name__)
+
+# Bump when extraction rules change; part of every extraction cache key
+PARSER_VERSION = '1'
+
+# Chunks handed to each worker on average; more than one keeps workers busy
+# when some pages take longer than others
+CHUNKS_PER_WORKER = 4
+
+# Pages read per Camelot call when streaming in a single process
+STREAM_WINDOW_PAGES = 4
+
+
+def get_layout_templates():
+    """Return the attendance layout template store, or None when disabled."""
+    if not templates_enabled():
+        return None
+    return LayoutTemplates('attendance', describe_table_layout)
+
+
+def _extract_page_chunk(pdf_path, page_numbers, pdf_hash=None):
+    """
+    Run lattice extraction and table processing for a chunk of pages.
+    
+    Executed inside worker processes, so it must stay a module-level function.
+    
+    Args:
+        pdf_path: Path to the attendance PDF file
+        page_numbers: List of 1-based page numbers in this chunk
+        pdf_hash: Content hash computed once by the parent process
+    
+    Returns:
+        Tuple of (table_count, table_results, stage_snapshot) for the chunk:
+        table_results holds (page_number, employee_records) per table, and
+        stage_snapshot this chunk's timings, or None when profiling is off
+    """
+    configure_logging()
+    
+    # Workers are reused across chunks: report each chunk's timings only once
+    profiling.reset()
+    
+    with profiling.span('read_tables'):
+        chunk_pdf_tables = read_tables(
+            pdf_path, pages=format_pages(page_numbers), flavor='lattice',
+            parser_version=PARSER_VERSION, pdf_hash=pdf_hash, layout_templates=get_layout_templates(),
+        )
+    
+    table_results = [
+        (int(table_object.page), process_table(table_object, table_sequence_index, len(chunk_pdf_tables)))
+        for table_sequence_index, table_object in enumerate(chunk_pdf_tables)
+    ]
+    
+    stage_snapshot = profiling.snapshot() if profiling.is_enabled() else None
+    return len(chunk_pdf_tables), table_results, stage_snapshot
+
+
+def _iter_chunk_results_parallel(pdf_path, page_chunks, workers, pdf_hash):
+    """
+    Extract page chunks on a process pool, yielding results in page order.
+    
+    Each chunk's records are yielded as soon as that chunk and all chunks
+    before it have finished.
+    
+    Args:
+        pdf_path: Path to the attendance PDF file
+        page_chunks: List of page number lists
+        workers: Number of worker processes
+        pdf_hash: Content hash computed once by the parent process
+    
+    Yields:
+        Tuple of (table_count, table_results) per chunk, in page order
+    """
+    # Imported here: multiprocessing is only needed for parallel runs
+    from concurrent.futures import ProcessPoolExecutor
+    
+    with ProcessPoolExecutor(max_workers=min(workers, len(page_chunks) or 1)) as executor:
+        # map() yields results in submission order, i.e. page order
+        chunk_results = executor.map(
+            _extract_page_chunk, [pdf_path] * len(page_chunks), page_chunks, [pdf_hash] * len(page_chunks)
+        )
+        for table_count, table_results, stage_snapshot in chunk_results:
+            if stage_snapshot:
+                profiling.merge(stage_snapshot)
+            yield table_count, table_results
+
+
+def _iter_records_sequential(pdf_path, page_numbers, window_pages, pdf_hash):
+    """
+    Extract page windows in this process, yielding each table's records.
+    
+    Each window's tables are dropped once its records are out, before the
+    next window is read.
+    
+    Args:
+        pdf_path: Path to the attendance PDF file
+        page_numbers: Ordered list of 1-based page numbers
+        window_pages: Pages per window (fewer under a memory ceiling)
+        pdf_hash: Content hash, to avoid rehashing per window
+    
+    Yields:
+        Tuple of (table_count, table_results) per table, table_results being
+        [(page_number, employee_records)]
+    """
+    table_sequence_index = 0
+    layout_templates = get_layout_templates()
+    
+    for page_chunk in iter_page_windows(page_numbers, window_pages):
+        # Extract tables using lattice flavor for structured data
+        with profiling.span('read_tables'):
+            chunk_pdf_tables = read_tables(
+                pdf_path, pages=format_pages(page_chunk), flavor='lattice',
+                parser_version=PARSER_VERSION, pdf_hash=pdf_hash, layout_templates=layout_templates,
+            )
+        
+        for table_object in chunk_pdf_tables:
+            yield 1, [(int(table_object.page), process_table(table_object, table_sequence_index, None))]
+            table_sequence_index += 1
+        chunk_pdf_tables = table_object = None
+
 
-def parse_pdf(pdf_path):
+def _iter_table_results(pdf_path, page_numbers, workers, chunk_size=None):
+    """
+    Extract pages sequentially or on a process pool.
+    
+    Yields:
+        Tuple of (table_count, table_results), in page order
+    """
+    pdf_hash = file_sha256(pdf_path) if get_default_cache() else None
+    
+    if workers > 1:
+        # Under a memory ceiling: fewer workers and pages per task if needed
+        workers, worker_limit_mb = limit_processes(workers)
+        if chunk_size is None:
+            chunk_size = math.ceil(len(page_numbers) / (workers * CHUNKS_PER_WORKER))
+        page_chunks = chunk_pages(page_numbers, chunk_size_within(chunk_size, worker_limit_mb))
+        return _iter_chunk_results_parallel(pdf_path, page_chunks, workers, pdf_hash)
+    
+    return _iter_records_sequential(pdf_path, page_numbers, chunk_size or STREAM_WINDOW_PAGES, pdf_hash)
+
+
+def iter_records(pdf_path, workers=1, chunk_size=None, pages='all', employee_id=None, prefilter=True):
+    """
+    Parse PDF and yield employee records as soon as their table is processed.
+    
+    Pages are read in small windows, so the first records arrive after the
+    first window instead of after the whole book, and only one window of
+    tables is held in memory at a time.
+    
+    Args:
+        pdf_path: Path to the attendance PDF file
+        workers: Number of worker processes; 1 runs in this process,
+            0 or None uses every CPU core
+        chunk_size: Pages per window/worker task (default: STREAM_WINDOW_PAGES
+            sequentially, automatic in parallel mode)
+        pages: Pages to extract, e.g. '3' or '1,4-6' (default: all)
+        employee_id: Optional 6-digit ID; only pages whose text layer mentions
+            it are extracted, and only that employee's record is yielded
+        prefilter: Skip pages whose text layer has no employee ID and salary
+            label before running lattice extraction
+    
+    Yields:
+        Employee record dictionaries in page order
+    
+    Raises:
+        ValueError: If no tables found in PDF (after all pages are read),
+            the page selection is invalid or the employee ID is not found
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+    
+    page_numbers = select_pages(pdf_path, pages, employee_id)
+    if employee_id is not None:
+        employee_id = str(employee_id).strip()
+    if prefilter:
+        with profiling.span('prefilter'):
+            page_numbers, skipped_page_numbers = prefilter_pages(pdf_path, page_numbers)
+        logger.info(f"Prefilter: skipped {len(skipped_page_numbers)} of "
+                    f"{len(page_numbers) + len(skipped_page_numbers)} page(s) without employee tables")
+    
+    total_table_count = 0
+    for table_count, table_results in _iter_table_results(pdf_path, page_numbers, workers, chunk_size):
+        total_table_count += table_count
+        for _, employee_records in table_results:
+            for employee_record in employee_records:
+                if employee_id is None or employee_record.employee_id == employee_id:
+                    yield employee_record
+    
+    # Validate extraction was successful
+    validate_table_count(total_table_count)
+
+
+def extract_page_records(pdf_path, page_numbers, workers=1, prefilter=True):
+    """
+    Extract the employee records of each given page (see src/manifest.py).
+    
+    Unlike iter_records() this does not fail when no tables are found: a
+    corrected page may legitimately hold none.
+    
+    Args:
+        pdf_path: Path to the attendance PDF file
+        page_numbers: 1-based page numbers to extract
+        workers: Number of worker processes (as in iter_records)
+        prefilter: Skip pages without employee tables
+    
+    Returns:
+        Dictionary of page number -> list of records, one entry per page
+    """
+    if not workers:
+        workers = os.cpu_count() or 1
+    
+    page_records = {page_number: [] for page_number in page_numbers}
+    if prefilter:
+        with profiling.span('prefilter'):
+            page_numbers, _ = prefilter_pages(pdf_path, page_numbers)
+    
+    for _, table_results in _iter_table_results(pdf_path, page_numbers, workers):
+        for page_number, employee_records in table_results:
+            page_records[page_number].extend(employee_records)
+    return page_records
+
+
+def parse_pdf(pdf_path, workers=1, chunk_size=None, pages='all', employee_id=None, prefilter=True):
     """
     Parse PDF and extract all employee attendance and salary records.
     
@@ -30,26 +275,19 @@ def parse_pdf(pdf_path):
     3. Extract salary and attendance data from column 6
     4. Assemble complete employee records
     
+    Thin list wrapper around iter_records().
+    
     Args:
         pdf_path: Path to the attendance PDF file
+        workers: Number of worker processes; 1 runs in this process,
+            0 or None uses every CPU core
+        chunk_size: Pages per window/worker task (default: automatic)
+        pages: Pages to extract, e.g. '3' or '1,4-6' (default: all)
+        employee_id: Optional 6-digit ID to re-extract a single employee
+        prefilter: Skip pages without employee tables before lattice extraction
     
     Returns:
         List of employee records, each containing ID, name, attendance counts,
         and salary components (count and amount for each field)
     """
-    # Extract tables from PDF using lattice flavor for structured data
-    extracted_pdf_tables = camelot.read_pdf(pdf_path, pages='all', flavor='lattice')
-    
-    # Validate extraction was successful
-    validate_pdf_tables(extracted_pdf_tables)
-    
-    all_employee_records = []
-    
-    # Process each table in the PDF
-    for table_sequence_index, table_object in enumerate(extracted_pdf_tables):
-        table_employee_records = process_table(
-            table_object, table_sequence_index, len(extracted_pdf_tables)
-        )
-        all_employee_records.extend(table_employee_records)
-    
-    return all_employee_records
+    return list(iter_records(pdf_path, workers, chunk_size, pages, employee_id, prefilter))
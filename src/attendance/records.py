@@ -0,0 +1,86 @@
+"""
+Compact attendance record type
+
+A record as a plain dict holds 12 nested {'count', 'amount'} dicts, about
+3 KB per employee. AttendanceRecord keeps the counts and amounts in two
+flat tuples behind __slots__ instead; to_dict() rebuilds the exact JSON
+shape (same keys, same order) for writers and comparisons.
+"""
+
+# Fields stored as {'count': ..., 'amount': ...}, in output order
+COUNTED_FIELDS = (
+    'shukkin', 'kokyu', 'kihon_kyu', 'hosho_zangyo', 'josha_teate', 'sagawa_warimashi_teate',
+    'double_teate', 'rinji_teate', 'yakin_teate', 'kyujitsu_teate', 'chokyori_teate', 'sonota',
+)
+
+# kado_jikan sits between kokyu and the salary fields in the JSON output
+_KADO_JIKAN_POSITION = COUNTED_FIELDS.index('kokyu') + 1
+
+_FIELD_INDEX = {field: index for index, field in enumerate(COUNTED_FIELDS)}
+
+
+class AttendanceRecord:
+    """
+    One employee's attendance and salary figures.
+    
+    Args:
+        employee_id: 6-digit employee ID
+        name: Employee name ('' when not found)
+        kado_jikan: Working hours in HH:MM format
+        kei: Total salary amount
+        counts: Tuple of counts aligned with COUNTED_FIELDS
+        amounts: Tuple of amounts aligned with COUNTED_FIELDS
+    """
+    
+    __slots__ = ('employee_id', 'name', 'kado_jikan', 'kei', 'counts', 'amounts')
+    
+    def __init__(self, employee_id, name, kado_jikan, kei, counts, amounts):
+        self.employee_id = employee_id
+        self.name = name
+        self.kado_jikan = kado_jikan
+        self.kei = kei
+        self.counts = tuple(counts)
+        self.amounts = tuple(amounts)
+    
+    @classmethod
+    def from_fields(cls, employee_id, name, kado_jikan, kei, counted_fields):
+        """
+        Build a record from {'count', 'amount'} dictionaries.
+        
+        Args:
+            counted_fields: Dictionary of field name -> {'count': ..., 'amount': ...}
+                for every name in COUNTED_FIELDS
+        """
+        return cls(
+            employee_id, name, kado_jikan, kei,
+            (counted_fields[field]['count'] for field in COUNTED_FIELDS),
+            (counted_fields[field]['amount'] for field in COUNTED_FIELDS),
+        )
+    
+    @classmethod
+    def from_dict(cls, record):
+        """Build a record from its JSON shape (the inverse of to_dict())"""
+        return cls.from_fields(record['employee_id'], record['name'], record['kado_jikan'], record['kei'], record)
+
+    def field(self, field_name):
+        """Return one counted field as {'count': ..., 'amount': ...}."""
+        index = _FIELD_INDEX[field_name]
+        return {'count': self.counts[index], 'amount': self.amounts[index]}
+    
+    def to_dict(self):
+        """Return the record in its JSON shape (key order as in correct.json)."""
+        record = {'employee_id': self.employee_id, 'name': self.name}
+        for index, field in enumerate(COUNTED_FIELDS):
+            if index == _KADO_JIKAN_POSITION:
+                record['kado_jikan'] = self.kado_jikan
+            record[field] = {'count': self.counts[index], 'amount': self.amounts[index]}
+        record['kei'] = self.kei
+        return record
+    
+    def __eq__(self, other):
+        if not isinstance(other, AttendanceRecord):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+    
+    def __repr__(self):
+        return f"AttendanceRecord(employee_id={self.employee_id!r}, name={self.name!r}, kei={self.kei!r})"
@@ -1,14 +1,13 @@
 """Number and text extraction utilities for attendance parsing"""
 
-import re
+from ..patterns import CLOCK_TIME, DIGITS, find_integers
 
 
 def extract_all_numbers(text):
     """Extract ALL numbers from multi-line text"""
     if not text:
         return []
-    numbers = re.findall(r'\d+', str(text))
-    return [int(n) for n in numbers]
+    return find_integers(text)
 
 
 def clean_number(text):
@@ -16,7 +15,7 @@ def clean_number(text):
     if not text:
         return None
     text = str(text).replace(',', '').replace(' ', '').strip()
-    match = re.search(r'\d+', text)
+    match = DIGITS.search(text)
     return int(match.group(0)) if match else None
 
 
@@ -24,7 +23,7 @@ def extract_time_format(text):
     """Extract HH:MM time format"""
     if not text:
         return None
-    match = re.search(r'(\d{1,2}):(\d{2})', str(text))
+    match = CLOCK_TIME.search(str(text))
     return match.group(0) if match else None
 
 
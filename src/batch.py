@@ -0,0 +1,266 @@
+"""Batch extraction: fan many PDFs out over a bounded process pool"""
+
+import contextlib
+import functools
+import glob
+import importlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .common import JsonArrayWriter, JsonLinesWriter, save_json, write_records
+from .log import configure_logging, log_file_summary
+from .memory import limit_processes, set_memory_limit
+
+logger = logging.getLogger(__name__)
+
+PARSER_MODULES = {
+    'attendance': 'src.attendance.parser',
+    'allowance': 'src.allowance.parser',
+}
+
+SUMMARY_FILENAME = 'batch_summary.json'
+
+# Extraction options each parser's iter_records() accepts from the command line
+PARSER_OPTIONS = {
+    'attendance': ('prefilter',),
+    'allowance': ('engine',),
+}
+
+# Set once per worker process by _init_worker, then reused for every file
+_worker_iter_records = None
+_worker_parser_type = None
+
+
+def is_batch_source(source):
+    """
+    Check whether a path argument names a directory or a glob pattern.
+    
+    Args:
+        source: Path or pattern given on the command line
+    
+    Returns:
+        True if the source should be expanded into several PDFs
+    """
+    return Path(source).is_dir() or glob.has_magic(source)
+
+
+def collect_pdf_paths(source):
+    """
+    Expand a directory, glob pattern or single path into a sorted list of PDFs.
+    
+    Args:
+        source: Directory, glob pattern (e.g. 'inbox/**/*.pdf') or file path
+    
+    Returns:
+        Sorted list of PDF path strings
+    """
+    if Path(source).is_dir():
+        candidate_paths = [str(path) for path in Path(source).glob('*.pdf')]
+    elif glob.has_magic(source):
+        candidate_paths = glob.glob(source, recursive=True)
+    else:
+        candidate_paths = [source]
+    
+    return sorted(path for path in candidate_paths if path.lower().endswith('.pdf'))
+
+
+def parser_options(parser_type, **options):
+    """
+    Keep the extraction options the given parser accepts.
+    
+    Args:
+        parser_type: 'attendance' or 'allowance'
+        **options: Command-line options (engine, prefilter)
+    
+    Returns:
+        Keyword arguments for that parser's iter_records()
+    """
+    return {name: value for name, value in options.items() if name in PARSER_OPTIONS.get(parser_type, ())}
+
+
+def _init_worker(parser_type, memory_limit_mb=None, options=None):
+    """
+    Import the parser (and with it Camelot) once per worker process.
+    
+    Args:
+        parser_type: 'attendance' or 'allowance'
+        memory_limit_mb: This worker's share of the memory ceiling, or None
+        options: Keyword arguments for iter_records() (see parser_options)
+    """
+    global _worker_iter_records, _worker_parser_type
+    configure_logging()
+    set_memory_limit(memory_limit_mb)
+    _worker_parser_type = parser_type
+    _worker_iter_records = functools.partial(
+        importlib.import_module(PARSER_MODULES[parser_type]).iter_records, **(options or {})
+    )
+
+
+def _build_output_paths(pdf_paths, output_folder, suffix='.json'):
+    """
+    Build one result path per input: <output_folder>/<pdf stem>.json.
+    
+    Inputs sharing a file name (e.g. one attendance book per branch office
+    folder) are prefixed with their parent folder name to keep them apart,
+    then with more of their folder path while names still collide
+    (a/tokyo/book.pdf and b/tokyo/book.pdf become a_tokyo_book and
+    b_tokyo_book). Names that still collide get a numeric suffix.
+    
+    Args:
+        pdf_paths: List of input PDF paths
+        output_folder: Folder receiving the results
+        suffix: Output extension ('.jsonl' for NDJSON)
+    
+    Returns:
+        List of output JSON paths aligned with pdf_paths, all distinct
+    """
+    folder_parts = [
+        [part for part in Path(pdf_path).parent.parts if part not in (Path(pdf_path).anchor, '.', '..')]
+        for pdf_path in pdf_paths
+    ]
+    prefix_depths = [0] * len(pdf_paths)
+    
+    def output_name(index):
+        prefix_parts = folder_parts[index][len(folder_parts[index]) - prefix_depths[index]:]
+        return '_'.join(prefix_parts + [Path(pdf_paths[index]).stem])
+    
+    while True:
+        output_names = [output_name(index) for index in range(len(pdf_paths))]
+        duplicated_names = {name for name in output_names if output_names.count(name) > 1}
+        deepened = False
+        for index, name in enumerate(output_names):
+            if name in duplicated_names and prefix_depths[index] < len(folder_parts[index]):
+                prefix_depths[index] += 1
+                deepened = True
+        if not deepened:
+            break
+    
+    output_paths = []
+    used_names = set()
+    for name in output_names:
+        unique_name = name
+        copy_number = 2
+        while unique_name in used_names:
+            unique_name = f"{name}_{copy_number}"
+            copy_number += 1
+        used_names.add(unique_name)
+        output_paths.append(str(Path(output_folder) / f"{unique_name}{suffix}"))
+    return output_paths
+
+
+def _build_parquet_paths(pdf_paths, output_paths, parquet):
+    """
+    Parquet dataset path per input (None for every input without --parquet).
+    
+    Files are named after the JSON output, so same-named inputs stay apart.
+    """
+    if not parquet:
+        return [None] * len(pdf_paths)
+    
+    from .columnar import dataset_path
+    return [dataset_path(parquet, pdf_path, Path(output_path).stem)
+            for pdf_path, output_path in zip(pdf_paths, output_paths)]
+
+
+def _process_file(pdf_path, output_path, parquet_path=None):
+    """
+    Parse one PDF inside a worker, streaming its records to JSON.
+    
+    Errors are captured in the returned summary so one bad file does not
+    abort the whole batch.
+    
+    Args:
+        pdf_path: PDF to parse
+        output_path: JSON file receiving this PDF's records (JSON lines
+            if it ends in .jsonl)
+        parquet_path: Also write typed Parquet here (see columnar.py)
+    
+    Returns:
+        Summary dictionary for this file
+    """
+    started_at = time.perf_counter()
+    file_summary = {'pdf': pdf_path, 'worker_pid': os.getpid()}
+    
+    try:
+        with contextlib.ExitStack() as writers:
+            json_writer_class = JsonLinesWriter if output_path.endswith('.jsonl') else JsonArrayWriter
+            record_writers = [writers.enter_context(json_writer_class(output_path))]
+            if parquet_path:
+                from .columnar import ParquetWriter
+                record_writers.append(writers.enter_context(ParquetWriter(parquet_path, _worker_parser_type)))
+            record_count = write_records(_worker_iter_records(pdf_path), record_writers)
+        file_summary.update({'status': 'ok', 'records': record_count, 'output': output_path})
+        if parquet_path:
+            file_summary['parquet'] = parquet_path
+    except Exception as exception:
+        file_summary.update({'status': 'error', 'records': 0, 'error': f"{type(exception).__name__}: {exception}"})
+    
+    file_summary['seconds'] = round(time.perf_counter() - started_at, 3)
+    return file_summary
+
+
+def run_batch(parser_type, source, output_folder, workers=None, parquet=None, options=None, ndjson=False):
+    """
+    Parse every PDF matched by source on a pool of long-lived workers.
+    
+    Writes one JSON file per input PDF plus a combined batch_summary.json.
+    
+    Args:
+        parser_type: 'attendance' or 'allowance'
+        source: Directory, glob pattern or single PDF path
+        output_folder: Folder receiving results and the summary
+        workers: Maximum worker processes (default: all CPU cores)
+        parquet: Also write typed Parquet per file: dictionary with 'root',
+            'month' and optional 'office' (see columnar.dataset_path)
+        options: Keyword arguments for the parser's iter_records() (see parser_options)
+        ndjson: Write <pdf stem>.jsonl instead of a <pdf stem>.json array
+    
+    Returns:
+        Combined summary dictionary
+    
+    Raises:
+        ValueError: If the parser type is unknown or no PDFs match
+    """
+    if parser_type not in PARSER_MODULES:
+        raise ValueError(f"Unknown parser type: {parser_type}")
+    
+    pdf_paths = collect_pdf_paths(source)
+    if not pdf_paths:
+        raise ValueError(f"No PDF files found for: {source}")
+    
+    workers, worker_limit_mb = limit_processes(min(workers or os.cpu_count() or 1, len(pdf_paths)))
+    output_paths = _build_output_paths(pdf_paths, output_folder, '.jsonl' if ndjson else '.json')
+    parquet_paths = _build_parquet_paths(pdf_paths, output_paths, parquet)
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+    
+    logger.info(f"Batch: {len(pdf_paths)} PDF(s), {workers} worker(s)")
+    started_at = time.perf_counter()
+    file_summaries = []
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(parser_type, worker_limit_mb, options)) as executor:
+        for file_summary in executor.map(_process_file, pdf_paths, output_paths, parquet_paths):
+            file_summaries.append(file_summary)
+            if file_summary['status'] == 'ok':
+                logger.info(f"  ✓ {file_summary['pdf']}: {file_summary['records']} records ({file_summary['seconds']}s)")
+            else:
+                logger.warning(f"  ✗ {file_summary['pdf']}: {file_summary['error']}")
+            log_file_summary({'parser': parser_type, **file_summary})
+    
+    batch_summary = {
+        'parser': parser_type,
+        'source': source,
+        'workers': workers,
+        'files': len(file_summaries),
+        'succeeded': sum(1 for summary in file_summaries if summary['status'] == 'ok'),
+        'failed': sum(1 for summary in file_summaries if summary['status'] != 'ok'),
+        'records': sum(summary['records'] for summary in file_summaries),
+        'seconds': round(time.perf_counter() - started_at, 3),
+        'results': file_summaries,
+    }
+    save_json(batch_summary, str(Path(output_folder) / SUMMARY_FILENAME))
+    
+    return batch_summary
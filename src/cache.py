@@ -0,0 +1,127 @@
+"""Persistent on-disk cache with size-bounded LRU eviction"""
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+DEFAULT_CACHE_DIR = os.environ.get('PDF_EXTRACT_CACHE_DIR', '.cache/tables')
+DEFAULT_MAX_BYTES = int(os.environ.get('PDF_EXTRACT_CACHE_MAX_MB', '512')) * 1024 * 1024
+
+
+def file_sha256(file_path, block_size=1024 * 1024):
+    """
+    Hash a file's content so cache entries follow the bytes, not the path.
+    
+    Args:
+        file_path: File to hash
+        block_size: Read size in bytes
+    
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def make_cache_key(*parts):
+    """
+    Build a stable key from JSON-serialisable parts.
+    
+    Args:
+        *parts: Values identifying the entry (hash, page, settings, versions)
+    
+    Returns:
+        Hex SHA-256 digest of the canonical JSON encoding
+    """
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class DiskCache:
+    """
+    JSON entries stored one file per key, evicted least-recently-used first.
+    
+    Access time is tracked through file mtimes, so the cache is shared safely
+    between worker processes and survives restarts.
+    """
+    
+    # File extension of entries; subclasses storing other formats override it
+    ENTRY_SUFFIX = '.json'
+    
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+    
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / f"{key}{self.ENTRY_SUFFIX}"
+    
+    def get(self, key):
+        """
+        Load an entry and mark it as recently used.
+        
+        Args:
+            key: Cache key from make_cache_key
+        
+        Returns:
+            Stored value, or None on a miss
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(entry_path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return value
+    
+    def put(self, key, value):
+        """
+        Store an entry atomically.
+        
+        Call evict() after a group of puts to enforce the size bound.
+        
+        Args:
+            key: Cache key from make_cache_key
+            value: JSON-serialisable value
+        """
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        # Write to a temp file and rename so concurrent readers never see partial JSON
+        file_descriptor, temp_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(temp_path, entry_path)
+    
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits in max_bytes."""
+        entries = []
+        for entry_path in self.cache_dir.glob(f'*/*{self.ENTRY_SUFFIX}'):
+            try:
+                entry_stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((entry_stat.st_mtime, entry_stat.st_size, entry_path))
+        
+        total_bytes = sum(size for _, size, _ in entries)
+        for _, size, entry_path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
+            total_bytes -= size
+    
+    def clear(self):
+        """Remove every entry."""
+        for entry_path in self.cache_dir.glob(f'*/*{self.ENTRY_SUFFIX}'):
+            try:
+                entry_path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,279 @@
+"""
+Typed columnar (Parquet) output for archived records
+
+JSON, CSV and Markdown are text; every reader re-parses every field, and
+allowance values are strings. ParquetWriter flattens records into typed
+columns instead:
+
+- attendance: each {'count', 'amount'} pair becomes <field>_count and
+  <field>_amount int64 columns; kado_jikan is kept as text and also
+  stored as kado_jikan_minutes
+- allowance: shain_id and shimei stay text, every other RECORD_FIELDS
+  column is int64 (null when the employee's row had no value, or a
+  value that is not a whole number, which is logged; JSON/CSV keep it)
+
+Files are laid out in Hive partitions, <root>/month=YYYY-MM/office=<name>/,
+so Arrow, pandas, DuckDB or Spark read a year of data as one dataset and
+only touch the months, offices and columns a query needs.
+
+Needs pyarrow (pinned in requirements.txt); it is imported only when a writer
+is created.
+"""
+
+import logging
+import os
+import re
+from pathlib import Path
+
+from .common import record_to_dict
+
+logger = logging.getLogger(__name__)
+
+# Rows buffered before a row group is written
+DEFAULT_ROW_GROUP_SIZE = 10000
+
+MONTH_PATTERN = re.compile(r'^\d{4}-(0[1-9]|1[0-2])$')
+
+_WORKING_HOURS_PATTERN = re.compile(r'^(\d+):([0-5]\d)$')
+_UNSAFE_PARTITION_CHARS = re.compile(r'[\\/=:*?"<>|\s]+')
+
+
+def _import_pyarrow():
+    """Import pyarrow and pyarrow.parquet, with an install hint if missing"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("pyarrow is required for Parquet output: pip install pyarrow")
+    return pyarrow, pyarrow.parquet
+
+
+def working_hours_to_minutes(working_hours):
+    """
+    Convert an HH:MM working-hours string to minutes.
+    
+    Args:
+        working_hours: String like '396:59'
+    
+    Returns:
+        Minutes as int, or None if the value is not HH:MM
+    """
+    match = _WORKING_HOURS_PATTERN.match(str(working_hours or '').strip())
+    if not match:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+def _to_int(field, value, shain_id=None):
+    """
+    Integer value of an allowance cell.
+    
+    '' and None become null. So does a cell that is not a whole number
+    (e.g. a mark like '有' or '1.5'), with a warning, rather than failing
+    the whole output.
+    """
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not number.is_integer():
+        logger.warning(f"Employee {shain_id}: allowance field '{field}' is not a whole number "
+                       f"({value!r}); stored as null in Parquet")
+        return None
+    return int(number)
+
+
+def _attendance_columns():
+    """Column names and type names for attendance records, in file order"""
+    from .attendance.records import COUNTED_FIELDS
+    
+    columns = [('employee_id', 'string'), ('name', 'string'), ('kado_jikan', 'string'),
+               ('kado_jikan_minutes', 'int64')]
+    for field in COUNTED_FIELDS:
+        columns += [(f'{field}_count', 'int64'), (f'{field}_amount', 'int64')]
+    columns.append(('kei', 'int64'))
+    return columns
+
+
+def _allowance_columns():
+    """Column names and type names for allowance records, in file order"""
+    from .allowance.config import RECORD_FIELDS
+    
+    return [(field, 'string' if field in ('shain_id', 'shimei') else 'int64') for field in RECORD_FIELDS]
+
+
+def _flatten_attendance(record):
+    """Flatten an attendance record dictionary into one row"""
+    from .attendance.records import COUNTED_FIELDS
+    
+    row = {
+        'employee_id': record['employee_id'],
+        'name': record['name'],
+        'kado_jikan': record['kado_jikan'],
+        'kado_jikan_minutes': working_hours_to_minutes(record['kado_jikan']),
+        'kei': record['kei'],
+    }
+    for field in COUNTED_FIELDS:
+        row[f'{field}_count'] = record[field]['count']
+        row[f'{field}_amount'] = record[field]['amount']
+    return row
+
+
+def _flatten_allowance(record):
+    """Flatten an allowance record dictionary into one typed row"""
+    return {
+        field: value if field in ('shain_id', 'shimei') else _to_int(field, value, record.get('shain_id'))
+        for field, value in record.items()
+    }
+
+
+RECORD_LAYOUTS = {
+    'attendance': (_attendance_columns, _flatten_attendance),
+    'allowance': (_allowance_columns, _flatten_allowance),
+}
+
+
+def record_schema(parser_type):
+    """
+    Arrow schema for one record type.
+    
+    Args:
+        parser_type: 'attendance' or 'allowance'
+    
+    Returns:
+        pyarrow.Schema
+    """
+    pyarrow, _ = _import_pyarrow()
+    column_builder, _ = RECORD_LAYOUTS[parser_type]
+    return pyarrow.schema([(name, getattr(pyarrow, type_name)()) for name, type_name in column_builder()])
+
+
+def _partition_value(value):
+    """Make a value safe to use as a partition folder name"""
+    return _UNSAFE_PARTITION_CHARS.sub('_', str(value).strip()) or 'unknown'
+
+
+def partition_path(root, basename, month, office):
+    """
+    Build the Parquet path for one output inside the partitioned dataset.
+    
+    Args:
+        root: Dataset root folder
+        basename: File name without extension (e.g. the PDF stem)
+        month: Payroll month as YYYY-MM
+        office: Office (branch) name
+    
+    Returns:
+        Path like <root>/month=2025-09/office=Tokyo/<basename>.parquet
+    
+    Raises:
+        ValueError: If month is not YYYY-MM
+    """
+    if not MONTH_PATTERN.match(str(month)):
+        raise ValueError(f"Month must be YYYY-MM, got: {month!r}")
+    return str(Path(root) / f'month={month}' / f'office={_partition_value(office)}' / f'{basename}.parquet')
+
+
+def dataset_path(parquet_options, pdf_path, basename):
+    """
+    Parquet path for one input PDF.
+    
+    Args:
+        parquet_options: Dictionary with 'root', 'month' and optional
+            'office' (default: the PDF's parent folder name, as batch
+            inputs are kept in one folder per office)
+        pdf_path: Input PDF path
+        basename: File name without extension
+    
+    Returns:
+        Path inside the partitioned dataset (see partition_path)
+    """
+    office = parquet_options.get('office') or Path(pdf_path).resolve().parent.name
+    return partition_path(parquet_options['root'], basename, parquet_options['month'], office)
+
+
+class ParquetWriter:
+    """
+    Stream records into a typed Parquet file, one row group per batch.
+    
+    Same interface as the writers in common.py (write/close/discard,
+    context manager, count), so it can be passed to write_records().
+    
+    Args:
+        filepath: Output .parquet path (parent folders are created)
+        parser_type: 'attendance' or 'allowance'
+        row_group_size: Rows buffered before a row group is written
+    
+    Raises:
+        ImportError: If pyarrow is not installed
+        ValueError: If the parser type is unknown
+    """
+    
+    def __init__(self, filepath, parser_type, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        if parser_type not in RECORD_LAYOUTS:
+            raise ValueError(f"Unknown parser type: {parser_type}")
+        pyarrow, parquet = _import_pyarrow()
+        
+        self.filepath = filepath
+        self.count = 0
+        self.row_group_size = row_group_size
+        self.schema = record_schema(parser_type)
+        self._pyarrow = pyarrow
+        self._flatten = RECORD_LAYOUTS[parser_type][1]
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+        
+        # Written to a temp file and moved into place by a clean close()
+        Path(filepath).parent.mkdir(parents=True, exist_ok=True)
+        self._temp_path = f'{filepath}.tmp'
+        self._writer = parquet.ParquetWriter(self._temp_path, self.schema, compression='zstd')
+    
+    def write(self, record):
+        """Write a single record (dictionary or slotted record)"""
+        row = self._flatten(record_to_dict(record))
+        for name, values in self._columns.items():
+            values.append(row.get(name))
+        self._buffered += 1
+        self.count += 1
+        if self._buffered >= self.row_group_size:
+            self._flush()
+    
+    def _flush(self):
+        if not self._buffered:
+            return
+        self._writer.write_table(self._pyarrow.table(self._columns, schema=self.schema))
+        self._columns = {name: [] for name in self.schema.names}
+        self._buffered = 0
+    
+    def close(self):
+        """Write the remaining rows and the file footer, and move the file into place"""
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+            os.replace(self._temp_path, self.filepath)
+    
+    def discard(self):
+        """Drop everything written; an existing file at filepath is kept"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            try:
+                os.remove(self._temp_path)
+            except FileNotFoundError:
+                pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
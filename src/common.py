@@ -1,7 +1,27 @@
 """Common output functions"""
 
+import contextlib
+import csv
 import json
-import pandas as pd
+import os
+import shutil
+import sys
+from pathlib import Path
+
+
+def is_missing(value):
+    """
+    Check for an absent cell value (None or NaN), like pd.isna on a scalar.
+    
+    Kept free of pandas so text helpers can be imported without it.
+    """
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def record_to_dict(record):
+    """Plain dictionary for a record (slotted records provide to_dict())"""
+    to_dict = getattr(record, 'to_dict', None)
+    return to_dict() if to_dict is not None else record
 
 
 def save_json(data, filepath):
@@ -12,6 +32,7 @@ def save_json(data, filepath):
 
 def save_csv(data, filepath):
     """Save to CSV"""
+    import pandas as pd
     pd.DataFrame(data).to_csv(filepath, index=False, encoding='utf-8-sig')
 
 
@@ -25,3 +46,205 @@ def save_markdown(data, filepath, title):
             f.write("|" + "|".join(["-"*(len(k)+2) for k in keys]) + "|\n")
             for item in data:
                 f.write("| " + " | ".join([str(item.get(k, '')) for k in keys]) + " |\n")
+
+
+class _RecordWriter:
+    """
+    Base class for incremental writers: one record in, one record out.
+    
+    Writers are context managers; records are flushed as they arrive so
+    memory stays constant regardless of batch size.
+    
+    Records go to <filepath>.tmp, which replaces filepath only when the
+    writer is closed cleanly. If the with-block raises, the temp file is
+    deleted and the previous output is left untouched.
+    """
+    
+    encoding = 'utf-8'
+    
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.count = 0
+        self._temp_path = f'{filepath}.tmp'
+        self._file = open(self._temp_path, 'w', encoding=self.encoding, newline='')
+    
+    def write(self, record):
+        """Write a single record (dictionary or slotted record)"""
+        self._write_record(record_to_dict(record))
+        self.count += 1
+    
+    def close(self):
+        """Finish the file and move it into place"""
+        if not self._file.closed:
+            self._finish()
+            self._file.close()
+            os.replace(self._temp_path, self.filepath)
+    
+    def discard(self):
+        """Drop everything written; an existing file at filepath is kept"""
+        if not self._file.closed:
+            self._file.close()
+            try:
+                os.remove(self._temp_path)
+            except FileNotFoundError:
+                pass
+    
+    def _write_record(self, record):
+        raise NotImplementedError
+    
+    def _finish(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+class JsonArrayWriter(_RecordWriter):
+    """Stream records into a JSON array, byte-identical to save_json"""
+    
+    def _write_record(self, record):
+        self._file.write('[\n' if self.count == 0 else ',\n')
+        record_json = json.dumps(record, ensure_ascii=False, indent=2)
+        self._file.write('\n'.join('  ' + line for line in record_json.split('\n')))
+    
+    def _finish(self):
+        self._file.write('\n]' if self.count else '[]')
+
+
+class JsonLinesWriter(_RecordWriter):
+    """Stream records as newline-delimited JSON (one record per line)"""
+    
+    def _write_record(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+
+def _format_cell(value):
+    """Format a value the way DataFrame.to_csv does for object columns"""
+    return '' if value is None else str(value)
+
+
+class CsvWriter(_RecordWriter):
+    """
+    Stream records to CSV without building a DataFrame.
+    
+    Columns come from fieldnames, or from the first record's keys. A record
+    with keys outside the columns raises ValueError instead of losing data.
+    """
+    
+    encoding = 'utf-8-sig'
+    
+    def __init__(self, filepath, fieldnames=None):
+        super().__init__(filepath)
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self._csv_writer = csv.writer(self._file, lineterminator='\n')
+    
+    def _write_record(self, record):
+        if self.fieldnames is None:
+            self.fieldnames = list(record.keys())
+        if self.count == 0:
+            self._csv_writer.writerow(self.fieldnames)
+        
+        unknown_keys = record.keys() - set(self.fieldnames)
+        if unknown_keys:
+            raise ValueError(f"Record has fields not in CSV columns: {sorted(unknown_keys)}")
+        
+        self._csv_writer.writerow([_format_cell(record.get(key)) for key in self.fieldnames])
+
+
+class MarkdownWriter(_RecordWriter):
+    """Stream records to a Markdown table; the total is written as a footer"""
+    
+    def __init__(self, filepath, title, fieldnames=None):
+        super().__init__(filepath)
+        self.fieldnames = list(fieldnames) if fieldnames else None
+        self._file.write(f"# {title}\n\n")
+    
+    def _write_record(self, record):
+        if self.count == 0:
+            if self.fieldnames is None:
+                self.fieldnames = list(record.keys())
+            self._file.write("| " + " | ".join(self.fieldnames) + " |\n")
+            self._file.write("|" + "|".join(["-"*(len(k)+2) for k in self.fieldnames]) + "|\n")
+        self._file.write("| " + " | ".join([str(record.get(k, '')) for k in self.fieldnames]) + " |\n")
+    
+    def _finish(self):
+        self._file.write(f"\nTotal: {self.count}\n")
+
+
+def write_records(records, writers):
+    """
+    Send each record to every writer in a single pass.
+    
+    Args:
+        records: Iterable of records (e.g. a parser's iter_records); slotted
+            records are converted with to_dict() once, not once per writer
+        writers: List of open writer objects
+    
+    Returns:
+        Number of records written
+    """
+    record_count = 0
+    for record in records:
+        record = record_to_dict(record)
+        for writer in writers:
+            writer.write(record)
+        record_count += 1
+    return record_count
+
+
+def stream_outputs(records, output_folder, basename, title, fieldnames=None, ndjson=False, extra_writers=(),
+                   skip_empty=False):
+    """
+    Write records to JSON (or NDJSON), CSV and Markdown in a single pass.
+    
+    Every file is written to a temp file and moved into place only after the
+    last record, so a parser error leaves the previous outputs untouched.
+    
+    Args:
+        records: Iterable of record dictionaries
+        output_folder: Folder receiving the files
+        basename: File name without extension (e.g. 'attendance_records')
+        title: Markdown title
+        fieldnames: Column order for CSV/Markdown (default: first record's keys)
+        ndjson: Write <basename>.jsonl instead of a <basename>.json array
+        extra_writers: Further open writers fed in the same pass (e.g. a
+            columnar.ParquetWriter); closed (or discarded) here when done
+        skip_empty: Keep existing outputs when there are no records, instead
+            of replacing them with empty files
+    
+    Returns:
+        Tuple of (record_count, json_path)
+    """
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+    json_path = f'{output_folder}/{basename}.jsonl' if ndjson else f'{output_folder}/{basename}.json'
+    json_writer_class = JsonLinesWriter if ndjson else JsonArrayWriter
+    
+    with contextlib.ExitStack() as stack:
+        # Extra writers are already open: register them first so they are
+        # closed or discarded even if creating the text writers fails
+        extra_writers = [stack.enter_context(writer) for writer in extra_writers]
+        writers = [
+            stack.enter_context(json_writer_class(json_path)),
+            stack.enter_context(CsvWriter(f'{output_folder}/{basename}.csv', fieldnames)),
+            stack.enter_context(MarkdownWriter(f'{output_folder}/{basename}.md', title, fieldnames)),
+            *extra_writers,
+        ]
+        record_count = write_records(records, writers)
+        if skip_empty and not record_count:
+            for writer in writers:
+                writer.discard()
+    
+    return record_count, json_path
+
+
+def print_file(filepath):
+    """Copy a written output file to stdout without re-serialising it"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        shutil.copyfileobj(f, sys.stdout)
+    print()
@@ -0,0 +1,448 @@
+"""
+Extraction daemon: warm parser workers behind a local HTTP job queue
+
+Scheduled runs of app.py pay for Python start-up and Camelot/OpenCV imports
+on every invocation. The daemon starts a process pool once, imports both
+parsers (and Camelot) in every worker, then accepts jobs over HTTP on
+localhost, so a job costs only its extraction time.
+
+The queue is bounded: when queue_size jobs are waiting or running, new
+submissions get HTTP 429 with Retry-After instead of piling up in memory.
+
+Start:
+    python -m src.daemon --workers 4 --port 8765
+
+Endpoints:
+    POST /jobs                  {"parser": "attendance", "pdf": "...", "pages": "1-4",
+                                 "employee": "160013", "output": "payroll/out.json",
+                                 "prefilter": true, "engine": "camelot", "ndjson": false}
+                                -> 202 with the job (add ?wait=SECONDS to block);
+                                Content-Type: application/json, and "output"
+                                is relative to the daemon's --output folder
+    GET  /jobs/<id>?wait=30     -> job status and summary (waits up to 30 s)
+    GET  /health                -> pool size, queue depth and counters
+"""
+
+import argparse
+import importlib
+import json
+import logging
+import os
+import signal
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from .batch import PARSER_MODULES, parser_options
+from .common import JsonArrayWriter, JsonLinesWriter, write_records
+from .log import LOG_LEVELS, LOGGER_NAME, configure_logging
+from .memory import limit_processes, set_memory_limit
+
+# Named explicitly: under `python -m src.daemon` __name__ is '__main__'
+logger = logging.getLogger(f'{LOGGER_NAME}.daemon')
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+# Jobs waiting or running before submissions are refused
+DEFAULT_QUEUE_SIZE = 64
+
+# Finished jobs kept for status lookups; older ones are forgotten
+MAX_FINISHED_JOBS = 1000
+
+# Upper bound for ?wait=, so a client cannot hold a server thread forever
+MAX_WAIT_SECONDS = 600
+
+# Set once per worker process by _warm_worker
+_worker_parsers = {}
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+def _warm_worker(log_level, memory_limit_mb=None):
+    """
+    Import both parsers and Camelot once per worker process.
+    
+    The parsers import Camelot lazily, so it is loaded here explicitly;
+    otherwise each worker's first job would still pay for it.
+    
+    Args:
+        log_level: Worker log level (per-record lines from many workers
+            only interleave, so the daemon passes 'warning' by default)
+        memory_limit_mb: This worker's share of the memory ceiling, or None
+    """
+    # Ctrl+C and service managers signal the whole process group; the
+    # daemon process decides when workers stop, after their running jobs
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    configure_logging(log_level)
+    set_memory_limit(memory_limit_mb)
+    for parser_type, module_name in PARSER_MODULES.items():
+        _worker_parsers[parser_type] = importlib.import_module(module_name).iter_records
+    import camelot  # noqa: F401
+    import pandas  # noqa: F401
+
+
+def _worker_ready():
+    """No-op task used to start and warm every worker before serving"""
+    return os.getpid()
+
+
+def _run_job(job_request):
+    """
+    Run one extraction job inside a worker, streaming records to JSON.
+    
+    Errors are captured in the returned summary, like batch files.
+    
+    Args:
+        job_request: Dictionary with parser, pdf, pages, employee, options
+            (iter_records() keyword arguments), ndjson and output
+    
+    Returns:
+        Summary dictionary for this job
+    """
+    started_at = time.perf_counter()
+    job_summary = {'worker_pid': os.getpid()}
+    
+    try:
+        iter_records = _worker_parsers[job_request['parser']]
+        records = iter_records(job_request['pdf'], pages=job_request['pages'], employee_id=job_request['employee'],
+                               **job_request['options'])
+        Path(job_request['output']).parent.mkdir(parents=True, exist_ok=True)
+        json_writer_class = JsonLinesWriter if job_request['ndjson'] else JsonArrayWriter
+        with json_writer_class(job_request['output']) as json_writer:
+            record_count = write_records(records, [json_writer])
+        job_summary.update({'status': 'done', 'records': record_count, 'output': job_request['output']})
+    except Exception as exception:
+        job_summary.update({'status': 'error', 'records': 0, 'error': f"{type(exception).__name__}: {exception}"})
+    
+    job_summary['seconds'] = round(time.perf_counter() - started_at, 3)
+    return job_summary
+
+
+class ExtractionService:
+    """
+    Bounded job queue in front of a pool of warm extraction workers.
+    
+    Args:
+        workers: Worker processes (default: all CPU cores)
+        queue_size: Maximum jobs waiting or running at once
+        output_folder: Folder receiving every job result; a job's own
+            'output' is a path inside it (default <parser>/<job id>.json)
+        worker_log_level: Log level inside worker processes
+    """
+    
+    def __init__(self, workers=None, queue_size=DEFAULT_QUEUE_SIZE, output_folder='output/jobs',
+                 worker_log_level='warning'):
+        self.workers, worker_limit_mb = limit_processes(workers or os.cpu_count() or 1)
+        self.queue_size = queue_size
+        self.output_folder = output_folder
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_warm_worker, initargs=(worker_log_level, worker_limit_mb)
+        )
+        self.jobs = OrderedDict()
+        self.futures = {}
+        self.finished_events = {}
+        self.lock = threading.Lock()
+        self.counters = {'submitted': 0, 'done': 0, 'error': 0, 'rejected': 0}
+    
+    def warm_up(self):
+        """Start every worker and wait until all have imported the parsers."""
+        warm_up_futures = [self.executor.submit(_worker_ready) for _ in range(self.workers)]
+        wait(warm_up_futures)
+        for future in warm_up_futures:
+            future.result()
+    
+    def _resolve_output_path(self, output_path):
+        """
+        Place a client-given result path inside output_folder.
+        
+        Args:
+            output_path: Path relative to output_folder, e.g. 'payroll/2025-09.json'
+        
+        Returns:
+            Path string under output_folder
+        
+        Raises:
+            ValueError: If the path is absolute, climbs out with '..', or is
+                not a .json/.jsonl file
+        """
+        relative_path = Path(output_path)
+        if relative_path.is_absolute() or '..' in relative_path.parts:
+            raise ValueError(f"Output must be a relative path inside the output folder: {output_path}")
+        if relative_path.suffix not in ('.json', '.jsonl'):
+            raise ValueError(f"Output must be a .json or .jsonl file: {output_path}")
+        
+        output_root = Path(self.output_folder).resolve()
+        resolved_path = (output_root / relative_path).resolve()
+        # A symlink inside the folder may still point elsewhere
+        if not resolved_path.is_relative_to(output_root):
+            raise ValueError(f"Output must be a relative path inside the output folder: {output_path}")
+        return str(Path(self.output_folder) / relative_path)
+    
+    def _pending_count(self):
+        return sum(1 for job in self.jobs.values() if job['status'] == 'queued')
+    
+    def submit(self, parser_type, pdf_path, pages='all', employee_id=None, output_path=None,
+               engine='camelot', prefilter=True, ndjson=False):
+        """
+        Queue an extraction job.
+        
+        Args:
+            parser_type: 'attendance' or 'allowance'
+            pdf_path: PDF to extract (path as seen by the daemon)
+            pages: Pages to extract, e.g. '1,4-6' (default: all)
+            employee_id: Optional 6-digit ID to extract one employee
+            output_path: Result path relative to output_folder
+                (default: <parser>/<job id>.json)
+            engine: Allowance table engine, 'camelot' or 'text'
+            prefilter: Attendance only: skip pages without an employee ID
+            ndjson: Write JSON lines instead of a JSON array
+        
+        Returns:
+            Job dictionary (id, status, request)
+        
+        Raises:
+            ValueError: If the parser type is unknown, the PDF does not exist
+                or the output path leaves output_folder
+            QueueFullError: If queue_size jobs are already waiting or running
+        """
+        if parser_type not in PARSER_MODULES:
+            raise ValueError(f"Unknown parser type: '{parser_type}' (expected one of {', '.join(PARSER_MODULES)})")
+        if not pdf_path or not Path(pdf_path).is_file():
+            raise ValueError(f"PDF not found: {pdf_path}")
+        if output_path:
+            output_path = self._resolve_output_path(output_path)
+        
+        job_id = uuid.uuid4().hex[:12]
+        job_request = {
+            'parser': parser_type,
+            'pdf': str(pdf_path),
+            'pages': pages or 'all',
+            'employee': str(employee_id) if employee_id else None,
+            'options': parser_options(parser_type, engine=engine, prefilter=bool(prefilter)),
+            'ndjson': bool(ndjson),
+            'output': output_path or str(Path(self.output_folder) / parser_type
+                                         / f"{job_id}{'.jsonl' if ndjson else '.json'}"),
+        }
+        
+        with self.lock:
+            if self._pending_count() >= self.queue_size:
+                self.counters['rejected'] += 1
+                raise QueueFullError(f"Job queue is full ({self.queue_size} jobs)")
+            job = {'id': job_id, 'status': 'queued', 'submitted': time.time(), 'request': job_request}
+            self.jobs[job_id] = job
+            self.counters['submitted'] += 1
+            self.finished_events[job_id] = threading.Event()
+            future = self.executor.submit(_run_job, job_request)
+            self.futures[job_id] = future
+        
+        future.add_done_callback(lambda finished_future: self._finish(job_id, finished_future))
+        logger.info(f"Job {job_id}: {parser_type} {pdf_path} (pages {job_request['pages']})")
+        return dict(job)
+    
+    def _finish(self, job_id, future):
+        """Record a finished job's summary and forget the oldest finished jobs"""
+        try:
+            job_summary = future.result()
+        except Exception as exception:
+            # e.g. BrokenProcessPool when a worker dies
+            job_summary = {'status': 'error', 'records': 0, 'error': f"{type(exception).__name__}: {exception}"}
+        
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(job_summary)
+            job['finished'] = time.time()
+            self.counters[job['status']] += 1
+            self.futures.pop(job_id, None)
+            self.finished_events.pop(job_id).set()
+            
+            finished_ids = [finished_id for finished_id, finished_job in self.jobs.items()
+                            if finished_job['status'] != 'queued']
+            for finished_id in finished_ids[:max(0, len(finished_ids) - MAX_FINISHED_JOBS)]:
+                del self.jobs[finished_id]
+        
+        if job_summary['status'] == 'done':
+            logger.info(f"  ✓ Job {job_id}: {job_summary['records']} records ({job_summary['seconds']}s)")
+        else:
+            logger.warning(f"  ✗ Job {job_id}: {job_summary['error']}")
+    
+    def get(self, job_id, wait_seconds=0):
+        """
+        Return a job's current state, optionally waiting for it to finish.
+        
+        Args:
+            job_id: ID returned by submit()
+            wait_seconds: Seconds to wait for a queued job (0: return at once)
+        
+        Returns:
+            Job dictionary, or None if the ID is unknown
+        """
+        with self.lock:
+            finished_event = self.finished_events.get(job_id)
+            future = self.futures.get(job_id)
+        if finished_event is not None and wait_seconds:
+            finished_event.wait(min(wait_seconds, MAX_WAIT_SECONDS))
+        
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+            if job['status'] == 'queued' and future is not None and future.running():
+                job['status'] = 'running'
+            return job
+    
+    def health(self):
+        """Return pool size, queue depth and job counters."""
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'pending': self._pending_count(),
+                **self.counters,
+            }
+    
+    def shutdown(self):
+        """Stop accepting work and wait for running jobs to finish."""
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _build_request_handler(service):
+    """Bind an HTTP request handler class to a service"""
+    
+    class ExtractionRequestHandler(BaseHTTPRequestHandler):
+        server_version = 'ExtractionDaemon/1'
+        
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+        
+        def _send_json(self, status_code, payload, headers=None):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status_code)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            for header_name, header_value in (headers or {}).items():
+                self.send_header(header_name, header_value)
+            self.end_headers()
+            self.wfile.write(body)
+        
+        def _wait_seconds(self, query):
+            try:
+                return float(query.get('wait', ['0'])[0])
+            except ValueError:
+                return 0
+        
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                self._send_json(200, service.health())
+            elif url.path.startswith('/jobs/'):
+                job = service.get(url.path[len('/jobs/'):], self._wait_seconds(parse_qs(url.query)))
+                if job is None:
+                    self._send_json(404, {'error': 'Unknown job'})
+                else:
+                    self._send_json(200, job)
+            else:
+                self._send_json(404, {'error': 'Not found'})
+        
+        def do_POST(self):
+            url = urlparse(self.path)
+            if url.path != '/jobs':
+                self._send_json(404, {'error': 'Not found'})
+                return
+            if self.headers.get_content_type() != 'application/json':
+                self._send_json(415, {'error': 'Content-Type must be application/json'})
+                return
+            
+            try:
+                body_length = int(self.headers.get('Content-Length', 0))
+                job_request = json.loads(self.rfile.read(body_length) or b'{}')
+                job = service.submit(
+                    job_request.get('parser'), job_request.get('pdf'), pages=job_request.get('pages', 'all'),
+                    employee_id=job_request.get('employee'), output_path=job_request.get('output'),
+                    engine=job_request.get('engine', 'camelot'), prefilter=job_request.get('prefilter', True),
+                    ndjson=job_request.get('ndjson', False),
+                )
+            except QueueFullError as exception:
+                self._send_json(429, {'error': str(exception)}, headers={'Retry-After': '5'})
+                return
+            except (ValueError, AttributeError) as exception:
+                self._send_json(400, {'error': str(exception)})
+                return
+            
+            wait_seconds = self._wait_seconds(parse_qs(url.query))
+            if wait_seconds:
+                self._send_json(200, service.get(job['id'], wait_seconds))
+            else:
+                self._send_json(202, job)
+    
+    return ExtractionRequestHandler
+
+
+def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, workers=None, queue_size=DEFAULT_QUEUE_SIZE,
+          output_folder='output/jobs', worker_log_level='warning'):
+    """
+    Run the daemon until interrupted.
+    
+    Args:
+        host: Interface to bind (default: localhost only)
+        port: TCP port
+        workers: Worker processes (default: all CPU cores)
+        queue_size: Maximum jobs waiting or running at once
+        output_folder: Default folder for job results
+        worker_log_level: Log level inside worker processes
+    """
+    service = ExtractionService(workers, queue_size, output_folder, worker_log_level)
+    logger.info(f"Starting {service.workers} worker(s)...")
+    service.warm_up()
+    
+    http_server = ThreadingHTTPServer((host, port), _build_request_handler(service))
+    logger.info(f"✓ Extraction daemon listening on http://{host}:{http_server.server_port} "
+                f"(queue size {queue_size})")
+    
+    # SIGTERM (e.g. from a service manager) stops like Ctrl+C: finish running
+    # jobs, then exit. shutdown() blocks, so it must not run in this thread.
+    signal.signal(signal.SIGTERM, lambda signal_number, frame: threading.Thread(target=http_server.shutdown).start())
+    try:
+        http_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http_server.server_close()
+        logger.info("Stopping: waiting for running jobs...")
+        service.shutdown()
+        logger.info("Extraction daemon stopped")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Serve extraction jobs from warm worker processes")
+    arg_parser.add_argument('--host', default=DEFAULT_HOST, help="interface to bind (default: 127.0.0.1)")
+    arg_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="TCP port")
+    arg_parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    arg_parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                            help="jobs waiting or running before submissions get HTTP 429")
+    arg_parser.add_argument('--output', default='output/jobs', help="folder for job results; job outputs are paths inside it")
+    arg_parser.add_argument('--log-level', choices=LOG_LEVELS, default='info', help="daemon log verbosity")
+    arg_parser.add_argument('--worker-log-level', choices=LOG_LEVELS, default='warning',
+                            help="log verbosity inside workers (info logs every record)")
+    arg_parser.add_argument('--max-memory', type=int, default=None, metavar='MB',
+                            help="memory ceiling for all workers together; caps workers and pages in flight")
+    args = arg_parser.parse_args()
+    
+    configure_logging(args.log_level)
+    set_memory_limit(args.max_memory)
+    serve(args.host, args.port, args.workers, args.queue_size, args.output, args.worker_log_level)
+
+
+if __name__ == '__main__':
+    main()
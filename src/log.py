@@ -0,0 +1,95 @@
+"""
+Logging setup shared by both parsers, the batch runner and app.py
+
+Modules log through logging.getLogger(__name__), all under the 'src'
+logger. Levels used:
+- DEBUG: per-table detail (shapes, header rows, employee row indices)
+- INFO: per-record lines and per-file progress (prefilter, templates)
+- WARNING: recoverable problems (a field that failed to parse)
+
+Nothing is printed until configure_logging() is called; app.py does so
+from --log-level/--quiet/--verbose. The level is stored in
+PDF_EXTRACT_LOG_LEVEL so worker processes configure themselves the same way.
+
+File summaries go to a separate 'src.summary' logger as one JSON object
+per line, and are printed at every level so quiet batch runs stay
+machine-readable.
+"""
+
+import json
+import logging
+import os
+import sys
+
+LOGGER_NAME = 'src'
+SUMMARY_LOGGER_NAME = f'{LOGGER_NAME}.summary'
+
+LOG_LEVELS = ('debug', 'info', 'warning', 'error')
+
+summary_logger = logging.getLogger(SUMMARY_LOGGER_NAME)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """Write to whatever sys.stdout is at emit time (so redirect_stdout works)"""
+    
+    @property
+    def stream(self):
+        return sys.stdout
+    
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+class _MessageFormatter(logging.Formatter):
+    """Plain messages, with the level name in front of warnings and errors"""
+    
+    def format(self, record):
+        message = super().format(record)
+        if record.levelno >= logging.WARNING:
+            return f"{record.levelname}: {message}"
+        return message
+
+
+def configure_logging(level=None):
+    """
+    Send 'src' log records to stdout at the given level.
+    
+    Safe to call repeatedly (e.g. once per worker task).
+    
+    Args:
+        level: One of LOG_LEVELS; default PDF_EXTRACT_LOG_LEVEL, and if that
+            is unset logging is left unconfigured
+    
+    Raises:
+        ValueError: If the level is unknown
+    """
+    level = level or os.environ.get('PDF_EXTRACT_LOG_LEVEL')
+    if not level:
+        return
+    level = level.lower()
+    if level not in LOG_LEVELS:
+        raise ValueError(f"Unknown log level: '{level}' (expected one of {', '.join(LOG_LEVELS)})")
+    os.environ['PDF_EXTRACT_LOG_LEVEL'] = level
+    
+    package_logger = logging.getLogger(LOGGER_NAME)
+    package_logger.setLevel(level.upper())
+    package_logger.propagate = False
+    if not any(isinstance(handler, _StdoutHandler) for handler in package_logger.handlers):
+        handler = _StdoutHandler()
+        handler.setFormatter(_MessageFormatter('%(message)s'))
+        package_logger.addHandler(handler)
+    
+    # Summaries are printed even in quiet mode
+    summary_logger.setLevel(logging.INFO)
+
+
+def log_file_summary(file_summary):
+    """
+    Emit one machine-readable summary line for a processed file.
+    
+    Args:
+        file_summary: JSON-serialisable dictionary (pdf, parser, status,
+            records, seconds, ...)
+    """
+    summary_logger.info(json.dumps({'event': 'file_summary', **file_summary}, ensure_ascii=False))
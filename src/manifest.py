@@ -0,0 +1,287 @@
+"""
+Incremental re-extraction: reuse the records of unchanged pages
+
+Payroll offices re-issue books with a few pages corrected. The extraction
+cache (src/cache.py) is keyed on the whole file's hash, so a re-issue
+misses on every page. Here each page is hashed on its own content stream,
+and a manifest per book (parser + book ID, by default the PDF's file
+stem) records, for every page number, the page's hash and the records
+it produced:
+
+1. Hash every page (pypdf, no rendering or table detection)
+2. Pages whose hash appears anywhere in the previous manifest reuse that
+   page's records (a page moved or repeated in the book still matches)
+3. Changed and new pages are extracted by the parser
+4. The new manifest replaces the old one, and the records are compared
+   by employee ID to report who was added, changed or removed
+
+The manifest is found by book ID, not by path, so a corrected book moved
+to another folder still reuses its pages; one saved under a new name
+needs the old ID (app.py --book). Which pages are reused is decided by
+page hashes alone.
+
+Manifests live in a DiskCache under .cache/manifests (PDF_EXTRACT_MANIFEST_DIR),
+next to the table cache, and are invalidated by a parser version bump or
+different extraction options.
+"""
+
+import hashlib
+import importlib
+import logging
+import os
+from pathlib import Path
+
+from .cache import DiskCache, make_cache_key
+from .pdf import mapped_pdf
+from .tables import camelot_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_DIR = os.environ.get('PDF_EXTRACT_MANIFEST_DIR', '.cache/manifests')
+
+# Manifests hold full records, so allow more room than a table grid needs
+DEFAULT_MANIFEST_MAX_BYTES = 256 * 1024 * 1024
+
+# Bump when the stored manifest layout changes
+MANIFEST_FORMAT_VERSION = 2
+
+# parser type -> (parser module, record class path, employee ID attribute)
+INCREMENTAL_PARSERS = {
+    'attendance': ('src.attendance.parser', 'src.attendance.records.AttendanceRecord', 'employee_id'),
+    'allowance': ('src.allowance.parser', 'src.allowance.records.AllowanceRecord', 'shain_id'),
+}
+
+
+def get_manifest_store():
+    """Return the manifest DiskCache"""
+    return DiskCache(DEFAULT_MANIFEST_DIR, DEFAULT_MANIFEST_MAX_BYTES)
+
+
+def _object_digest(pdf_object, digests, in_progress):
+    """
+    Digest a PDF object and everything it references.
+    
+    Dictionaries are hashed by sorted key, streams also by their data, and
+    indirect objects once per call (fonts and forms shared by every page).
+    /Parent links are skipped, so the walk never climbs into the page tree.
+    
+    Args:
+        pdf_object: pypdf object (direct or IndirectObject)
+        digests: Digest per (object number, generation), shared within one call
+        in_progress: References being hashed, to cut reference cycles
+    
+    Returns:
+        SHA-256 digest bytes
+    """
+    from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+    
+    if isinstance(pdf_object, IndirectObject):
+        reference = (pdf_object.idnum, pdf_object.generation)
+        if reference in digests:
+            return digests[reference]
+        if reference in in_progress:
+            return b'cycle'
+        in_progress.add(reference)
+        object_digest = _object_digest(pdf_object.get_object(), digests, in_progress)
+        in_progress.discard(reference)
+        digests[reference] = object_digest
+        return object_digest
+    
+    digest = hashlib.sha256()
+    if isinstance(pdf_object, DictionaryObject):
+        digest.update(b'<<')
+        for key in sorted(pdf_object):
+            if key != '/Parent':
+                digest.update(key.encode())
+                digest.update(_object_digest(pdf_object.raw_get(key), digests, in_progress))
+        if isinstance(pdf_object, StreamObject):
+            digest.update(pdf_object.get_data())
+    elif isinstance(pdf_object, ArrayObject):
+        digest.update(b'[')
+        for item in pdf_object:
+            digest.update(_object_digest(item, digests, in_progress))
+    else:
+        digest.update(repr(pdf_object).encode())
+    return digest.digest()
+
+
+def page_content_hashes(pdf_path, page_numbers=None):
+    """
+    Hash each page's content: its content streams, its media box and
+    rotation, and every resource the page uses (fonts, images, form
+    XObjects including the forms and fonts nested inside them).
+    
+    Args:
+        pdf_path: Path to the PDF file
+        page_numbers: 1-based page numbers to hash (default: all pages)
+    
+    Returns:
+        Dictionary of 1-based page number -> hex SHA-256 digest
+    """
+    from pypdf import PdfReader
+    
+    page_hashes = {}
+    # Shared resources (fonts, forms) are hashed once for all pages
+    digests = {}
+    with mapped_pdf(pdf_path) as pdf_source:
+        pages = PdfReader(pdf_source).pages
+        if page_numbers is None:
+            page_numbers = range(1, len(pages) + 1)
+        for page_number in page_numbers:
+            page = pages[page_number - 1]
+            digest = hashlib.sha256()
+            digest.update(repr((list(page.mediabox), page.rotation)).encode())
+            
+            contents = page.get_contents()
+            if contents is not None:
+                digest.update(contents.get_data())
+            
+            # pypdf copies resources inherited from the page tree onto each page
+            resources = page.get('/Resources')
+            if resources is not None:
+                digest.update(_object_digest(resources, digests, set()))
+            
+            page_hashes[page_number] = digest.hexdigest()
+    return page_hashes
+
+
+def _load_class(class_path):
+    """Import 'package.module.Class'"""
+    module_name, class_name = class_path.rsplit('.', 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def _manifest_key(parser_type, book_id):
+    """One manifest per parser and book"""
+    return make_cache_key('manifest', parser_type, book_id)
+
+
+def _manifest_settings(parser_module, extract_options):
+    """Everything besides page content that shapes a page's records"""
+    return {
+        'format_version': MANIFEST_FORMAT_VERSION,
+        'parser_version': parser_module.PARSER_VERSION,
+        'camelot_version': camelot_version(),
+        'options': extract_options,
+    }
+
+
+def diff_employees(previous_records, current_records, id_attribute):
+    """
+    Compare two books' records by employee ID.
+    
+    Args:
+        previous_records: Record dictionaries from the previous run
+        current_records: Record dictionaries from this run
+        id_attribute: Employee ID field ('employee_id' or 'shain_id')
+    
+    Returns:
+        Dictionary with sorted 'added', 'changed' and 'removed' ID lists and
+        the 'unchanged' count
+    """
+    def by_employee(records):
+        grouped = {}
+        for record in records:
+            grouped.setdefault(record.get(id_attribute), []).append(record)
+        return grouped
+    
+    previous_by_employee = by_employee(previous_records)
+    current_by_employee = by_employee(current_records)
+    common_ids = previous_by_employee.keys() & current_by_employee.keys()
+    changed_ids = sorted(
+        employee_id for employee_id in common_ids
+        if previous_by_employee[employee_id] != current_by_employee[employee_id]
+    )
+    return {
+        'added': sorted(current_by_employee.keys() - previous_by_employee.keys()),
+        'changed': changed_ids,
+        'removed': sorted(previous_by_employee.keys() - current_by_employee.keys()),
+        'unchanged': len(common_ids) - len(changed_ids),
+    }
+
+
+def extract_incremental(parser_type, pdf_path, store=None, book_id=None, **extract_options):
+    """
+    Extract a book, re-running the parser only on pages that changed.
+    
+    Args:
+        parser_type: 'attendance' or 'allowance'
+        pdf_path: Path to the PDF file
+        store: DiskCache holding manifests (default: get_manifest_store())
+        book_id: Book the manifest belongs to (default: the PDF's file
+            stem); reuse it for a re-issue saved under another name
+        **extract_options: Passed to the parser's extract_page_records()
+            (attendance: workers, prefilter; allowance: engine). Options
+            that change records are part of the manifest settings
+    
+    Returns:
+        Tuple of (records, changes): records in page order, and a changes
+        dictionary with page counts ('pages', 'reused_pages',
+        'extracted_pages') plus the diff_employees() result
+    
+    Raises:
+        ValueError: If the parser type is unknown
+    """
+    if parser_type not in INCREMENTAL_PARSERS:
+        raise ValueError(f"Unknown parser type: {parser_type}")
+    module_name, record_class_path, id_attribute = INCREMENTAL_PARSERS[parser_type]
+    parser_module = importlib.import_module(module_name)
+    record_class = _load_class(record_class_path)
+    store = store or get_manifest_store()
+    
+    # Worker count does not change records
+    settings = _manifest_settings(parser_module, {
+        name: value for name, value in sorted(extract_options.items()) if name != 'workers'
+    })
+    manifest_key = _manifest_key(parser_type, book_id or Path(pdf_path).stem)
+    previous_manifest = store.get(manifest_key)
+    if previous_manifest is not None and previous_manifest['settings'] != settings:
+        logger.info("Manifest was built with other settings; extracting every page")
+        previous_manifest = None
+    # JSON keys are strings: page number -> {'hash', 'records'}
+    previous_pages = {
+        int(page_number): page_entry for page_number, page_entry in previous_manifest['pages'].items()
+    } if previous_manifest else {}
+    records_by_hash = {page_entry['hash']: page_entry['records'] for page_entry in previous_pages.values()}
+    
+    page_hashes = page_content_hashes(pdf_path)
+    changed_page_numbers = [
+        page_number for page_number, page_hash in page_hashes.items() if page_hash not in records_by_hash
+    ]
+    logger.info(f"Manifest: {len(page_hashes) - len(changed_page_numbers)} of {len(page_hashes)} page(s) "
+                f"unchanged, extracting {len(changed_page_numbers)}")
+    
+    fresh_page_records = parser_module.extract_page_records(pdf_path, changed_page_numbers, **extract_options) \
+        if changed_page_numbers else {}
+    
+    records = []
+    current_pages = {}
+    for page_number, page_hash in page_hashes.items():
+        if page_number in fresh_page_records:
+            page_records = fresh_page_records[page_number]
+            page_dicts = [record.to_dict() for record in page_records]
+        else:
+            page_dicts = records_by_hash[page_hash]
+            page_records = [record_class.from_dict(page_dict) for page_dict in page_dicts]
+        records.extend(page_records)
+        current_pages[page_number] = {'hash': page_hash, 'records': page_dicts}
+    
+    previous_records = [
+        page_dict for page_number in sorted(previous_pages) for page_dict in previous_pages[page_number]['records']
+    ]
+    current_records = [page_dict for page_entry in current_pages.values() for page_dict in page_entry['records']]
+    
+    store.put(manifest_key, {
+        'pdf': str(pdf_path),
+        'settings': settings,
+        'pages': {str(page_number): page_entry for page_number, page_entry in current_pages.items()},
+    })
+    store.evict()
+    
+    changes = {
+        'pages': len(page_hashes),
+        'reused_pages': len(page_hashes) - len(changed_page_numbers),
+        'extracted_pages': len(changed_page_numbers),
+        **diff_employees(previous_records, current_records, id_attribute),
+    }
+    return records, changes
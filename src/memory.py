@@ -0,0 +1,148 @@
+"""
+Memory ceiling for extraction: how many pages may be in flight
+
+Camelot holds every page of a read_pdf() call (rendered page images,
+pdfminer layout objects, table DataFrames) until the call returns, so
+peak memory grows with the pages per call times the processes running
+them. With a ceiling set (PDF_EXTRACT_MEMORY_MB, app.py --max-memory),
+window sizes and worker counts are chosen so that
+
+    processes x (PROCESS_BASELINE_MB + pages per window x page cost)
+
+stays under it. Windows read in this process are sized again before each
+read from the measured RSS, so memory that was not given back shrinks the
+next window instead of pushing past the ceiling.
+
+Without a ceiling, the parsers keep their default window sizes.
+"""
+
+import gc
+import os
+
+# Peak RSS added per page read in one Camelot call; measured on the
+# attendance sample (lattice, 300 dpi page images) at about 30 MB.
+# Override with PDF_EXTRACT_PAGE_MEMORY_MB for larger or denser pages
+DEFAULT_PAGE_MEMORY_MB = 32
+
+# RSS of a process with Camelot, OpenCV and pdfium loaded, after its first page
+PROCESS_BASELINE_MB = 320
+
+
+def memory_limit_mb():
+    """Ceiling from PDF_EXTRACT_MEMORY_MB, or None when unset"""
+    value = os.environ.get('PDF_EXTRACT_MEMORY_MB')
+    return int(value) if value else None
+
+
+def set_memory_limit(limit_mb):
+    """
+    Set this process's ceiling (worker initializers pass their share).
+    
+    Args:
+        limit_mb: Ceiling in MB, or None to leave the environment as is
+    """
+    if limit_mb is not None:
+        os.environ['PDF_EXTRACT_MEMORY_MB'] = str(int(limit_mb))
+
+
+def page_memory_mb():
+    """Estimated peak memory per page in flight"""
+    return int(os.environ.get('PDF_EXTRACT_PAGE_MEMORY_MB', DEFAULT_PAGE_MEMORY_MB))
+
+
+def current_rss_mb():
+    """
+    Resident memory of this process.
+    
+    Returns:
+        RSS in MB, or None where /proc is unavailable
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+    except (OSError, ValueError, IndexError):
+        return None
+    return resident_pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+
+
+def pages_within(limit_mb, used_mb):
+    """Pages that fit in limit_mb on top of used_mb (at least 1, so work always progresses)"""
+    return max(1, int((limit_mb - used_mb) // page_memory_mb()))
+
+
+def limit_processes(processes):
+    """
+    Cap a worker count so every worker fits its share of the ceiling.
+    
+    Args:
+        processes: Requested worker processes
+    
+    Returns:
+        Tuple of (processes, per_process_limit_mb); the limit is None
+        when no ceiling is set
+    """
+    limit_mb = memory_limit_mb()
+    if limit_mb is None:
+        return processes, None
+    fitting_processes = max(1, int(limit_mb // (PROCESS_BASELINE_MB + page_memory_mb())))
+    processes = min(processes, fitting_processes)
+    return processes, limit_mb // processes
+
+
+def chunk_size_within(chunk_size, per_process_limit_mb):
+    """
+    Cap the pages per worker task to a worker's share of the ceiling.
+    
+    Args:
+        chunk_size: Pages per task without a ceiling
+        per_process_limit_mb: Share from limit_processes(), or None
+    
+    Returns:
+        Pages per task
+    """
+    if per_process_limit_mb is None:
+        return chunk_size
+    return min(chunk_size, pages_within(per_process_limit_mb, PROCESS_BASELINE_MB))
+
+
+def window_size(default_pages):
+    """
+    Pages for the next window read in this process.
+    
+    Args:
+        default_pages: Window size without a ceiling
+    
+    Returns:
+        default_pages, or fewer when the ceiling minus current RSS
+        leaves room for fewer pages
+    """
+    limit_mb = memory_limit_mb()
+    if limit_mb is None:
+        return default_pages
+    # Before Camelot's first page the process is still small; plan for its full size
+    used_mb = max(current_rss_mb() or 0, PROCESS_BASELINE_MB)
+    return min(default_pages, pages_within(limit_mb, used_mb))
+
+
+def iter_page_windows(page_numbers, default_pages):
+    """
+    Split pages into consecutive windows, sizing each one just before it is read.
+    
+    The caller must drop the previous window's tables before asking for the
+    next window; with a ceiling set, garbage is collected first so cyclic
+    layout objects are gone before RSS is measured.
+    
+    Args:
+        page_numbers: Ordered list of 1-based page numbers
+        default_pages: Window size without a ceiling
+    
+    Yields:
+        Lists of page numbers, in the original order
+    """
+    start = 0
+    while start < len(page_numbers):
+        if memory_limit_mb() is not None and start:
+            gc.collect()
+        size = window_size(default_pages)
+        yield page_numbers[start:start + size]
+        start += size
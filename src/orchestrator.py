@@ -0,0 +1,226 @@
+"""
+Asyncio batch orchestrator: overlap input reads, parsing and output writes
+
+run_batch() lets each worker parse and write one file at a time, so disk
+and CPU alternate. This orchestrator splits every file into three steps
+and pipelines them across files:
+
+1. Stage: optionally copy the PDF from a slow (e.g. network-mounted) share
+   to a local temp folder, in a thread
+2. Parse: parse_pdf in a worker process (loop.run_in_executor)
+3. Write: JSON, CSV and Markdown written concurrently, one thread each
+
+While one file is parsed, the next is being staged and the previous one
+written. A semaphore caps the files in flight, so staged inputs and parsed
+records never pile up in memory.
+"""
+
+import asyncio
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from . import batch
+from .batch import PARSER_MODULES, SUMMARY_FILENAME, collect_pdf_paths, _build_output_paths, _init_worker
+from .common import CsvWriter, JsonArrayWriter, JsonLinesWriter, MarkdownWriter, save_json, write_records
+from .log import log_file_summary
+from .memory import limit_processes
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_TITLES = {
+    'attendance': 'Attendance Records',
+    'allowance': 'Driver Allowance List',
+}
+
+
+def _parse_file(pdf_path):
+    """Parse one PDF inside a worker (parser loaded by batch._init_worker)"""
+    return list(batch._worker_iter_records(pdf_path))
+
+
+def _stage_input(pdf_path, staging_folder):
+    """Copy a PDF into the local staging folder and return the copy's path"""
+    staged_path = Path(tempfile.mkdtemp(dir=staging_folder)) / Path(pdf_path).name
+    shutil.copyfile(pdf_path, staged_path)
+    return str(staged_path)
+
+
+def _output_fieldnames(parser_type):
+    """Column order for CSV/Markdown (None: first record's keys)"""
+    if parser_type == 'allowance':
+        from .allowance.config import RECORD_FIELDS
+        return RECORD_FIELDS
+    return None
+
+
+def _write_output(writer_factory, records):
+    """Write all records with one writer (runs in a thread)"""
+    with writer_factory() as writer:
+        write_records(records, [writer])
+
+
+async def _write_outputs(records, output_base, title, fieldnames, parser_type, parquet_path=None, ndjson=False):
+    """
+    Write JSON, CSV and Markdown (and Parquet if asked) for one file concurrently.
+    
+    Args:
+        records: List of records
+        output_base: Output path without extension
+        title: Markdown title
+        fieldnames: Column order for CSV/Markdown
+        parser_type: 'attendance' or 'allowance' (Parquet schema)
+        parquet_path: Also write typed Parquet here (see columnar.py)
+        ndjson: Write <output_base>.jsonl instead of a .json array
+    
+    Returns:
+        List of written paths
+    """
+    json_path = f'{output_base}.jsonl' if ndjson else f'{output_base}.json'
+    json_writer_class = JsonLinesWriter if ndjson else JsonArrayWriter
+    writer_factories = {
+        json_path: lambda: json_writer_class(json_path),
+        f'{output_base}.csv': lambda: CsvWriter(f'{output_base}.csv', fieldnames),
+        f'{output_base}.md': lambda: MarkdownWriter(f'{output_base}.md', title, fieldnames),
+    }
+    if parquet_path:
+        from .columnar import ParquetWriter
+        writer_factories[parquet_path] = lambda: ParquetWriter(parquet_path, parser_type)
+    await asyncio.gather(*(
+        asyncio.to_thread(_write_output, writer_factory, records)
+        for writer_factory in writer_factories.values()
+    ))
+    return list(writer_factories)
+
+
+async def _process_file(pdf_path, output_path, context):
+    """
+    Stage, parse and write one PDF, holding an in-flight slot throughout.
+    
+    Errors are captured in the returned summary so one bad file does not
+    abort the batch.
+    
+    Returns:
+        Summary dictionary for this file
+    """
+    async with context['in_flight']:
+        started_at = time.perf_counter()
+        file_summary = {'pdf': pdf_path}
+        try:
+            parse_path = pdf_path
+            if context['staging_folder']:
+                parse_path = await asyncio.to_thread(_stage_input, pdf_path, context['staging_folder'])
+            
+            records = await asyncio.get_running_loop().run_in_executor(context['executor'], _parse_file, parse_path)
+            
+            output_base = str(Path(output_path).with_suffix(''))
+            parquet_path = None
+            if context['parquet']:
+                from .columnar import dataset_path
+                parquet_path = dataset_path(context['parquet'], pdf_path, Path(output_path).stem)
+            output_paths = await _write_outputs(records, output_base, context['title'], context['fieldnames'],
+                                                context['parser_type'], parquet_path, context['ndjson'])
+            file_summary.update({'status': 'ok', 'records': len(records), 'output': output_path,
+                                 'outputs': output_paths})
+        except Exception as exception:
+            file_summary.update({'status': 'error', 'records': 0, 'error': f"{type(exception).__name__}: {exception}"})
+        
+        if context['staging_folder'] and parse_path != pdf_path:
+            shutil.rmtree(Path(parse_path).parent, ignore_errors=True)
+        
+        file_summary['seconds'] = round(time.perf_counter() - started_at, 3)
+    
+    if file_summary['status'] == 'ok':
+        logger.info(f"  ✓ {pdf_path}: {file_summary['records']} records ({file_summary['seconds']}s)")
+    else:
+        logger.warning(f"  ✗ {pdf_path}: {file_summary['error']}")
+    log_file_summary({'parser': context['parser_type'], **file_summary})
+    return file_summary
+
+
+async def orchestrate_batch(parser_type, source, output_folder, workers=None, max_in_flight=None,
+                            stage_inputs=False, parquet=None, options=None, ndjson=False):
+    """
+    Parse every PDF matched by source, overlapping I/O with parsing.
+    
+    Writes <name>.json/.csv/.md per input PDF plus batch_summary.json, in
+    the same layout as run_batch().
+    
+    Args:
+        parser_type: 'attendance' or 'allowance'
+        source: Directory, glob pattern or single PDF path
+        output_folder: Folder receiving results and the summary
+        workers: Worker processes for parsing (default: all CPU cores)
+        max_in_flight: Files staged, parsing or writing at once
+            (default: twice the worker count)
+        stage_inputs: Copy each PDF to a local temp folder before parsing
+        parquet: Also write typed Parquet per file: dictionary with 'root',
+            'month' and optional 'office' (see columnar.dataset_path)
+        options: Keyword arguments for the parser's iter_records()
+            (see batch.parser_options)
+        ndjson: Write <name>.jsonl instead of a <name>.json array
+    
+    Returns:
+        Combined summary dictionary
+    
+    Raises:
+        ValueError: If the parser type is unknown or no PDFs match
+    """
+    if parser_type not in PARSER_MODULES:
+        raise ValueError(f"Unknown parser type: {parser_type}")
+    
+    pdf_paths = collect_pdf_paths(source)
+    if not pdf_paths:
+        raise ValueError(f"No PDF files found for: {source}")
+    
+    workers, worker_limit_mb = limit_processes(min(workers or os.cpu_count() or 1, len(pdf_paths)))
+    max_in_flight = max_in_flight or 2 * workers
+    output_paths = _build_output_paths(pdf_paths, output_folder, '.jsonl' if ndjson else '.json')
+    Path(output_folder).mkdir(parents=True, exist_ok=True)
+    
+    logger.info(f"Batch: {len(pdf_paths)} PDF(s), {workers} worker(s), up to {max_in_flight} in flight")
+    started_at = time.perf_counter()
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(parser_type, worker_limit_mb, options)) as executor, \
+            tempfile.TemporaryDirectory(prefix='pdf_extract_stage_') as staging_folder:
+        context = {
+            'parser_type': parser_type,
+            'executor': executor,
+            'in_flight': asyncio.Semaphore(max_in_flight),
+            'staging_folder': staging_folder if stage_inputs else None,
+            'title': OUTPUT_TITLES[parser_type],
+            'fieldnames': _output_fieldnames(parser_type),
+            'parquet': parquet,
+            'ndjson': ndjson,
+        }
+        file_summaries = await asyncio.gather(*(
+            _process_file(pdf_path, output_path, context)
+            for pdf_path, output_path in zip(pdf_paths, output_paths)
+        ))
+    
+    batch_summary = {
+        'parser': parser_type,
+        'source': source,
+        'workers': workers,
+        'max_in_flight': max_in_flight,
+        'files': len(file_summaries),
+        'succeeded': sum(1 for summary in file_summaries if summary['status'] == 'ok'),
+        'failed': sum(1 for summary in file_summaries if summary['status'] != 'ok'),
+        'records': sum(summary['records'] for summary in file_summaries),
+        'seconds': round(time.perf_counter() - started_at, 3),
+        'results': list(file_summaries),
+    }
+    save_json(batch_summary, str(Path(output_folder) / SUMMARY_FILENAME))
+    
+    return batch_summary
+
+
+def run_batch_async(parser_type, source, output_folder, workers=None, max_in_flight=None, stage_inputs=False,
+                    parquet=None, options=None, ndjson=False):
+    """Synchronous entry point for orchestrate_batch() (same arguments and result)"""
+    return asyncio.run(orchestrate_batch(parser_type, source, output_folder, workers, max_in_flight, stage_inputs,
+                                         parquet, options, ndjson))
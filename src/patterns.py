@@ -0,0 +1,103 @@
+"""
+Precompiled patterns and fast-path text helpers shared by both parsers
+
+The extractors run these on every cell of every page. re.search(str, ...)
+looks its pattern up in re's compile cache on each call; the patterns here
+are compiled once, and the helpers skip the regex entirely when a plain
+string check already decides the answer (too short for an ID, all digits).
+Semantics match the inline patterns they replace exactly.
+"""
+
+import re
+
+# --- Employee IDs ------------------------------------------------------------
+
+# 6-digit ID inside a table cell (attendance: first 3 columns)
+CELL_EMPLOYEE_ID = re.compile(r'\b(\d{6})\b')
+
+# A cell or word that is exactly a 6-digit ID (allowance)
+EXACT_EMPLOYEE_ID = re.compile(r'^\d{6}$')
+
+# A standalone 6-digit number in a page's text layer
+PAGE_EMPLOYEE_ID = re.compile(r'(?<!\d)\d{6}(?!\d)')
+
+# --- Names -------------------------------------------------------------------
+
+# Two or more kana/kanji (allowance name rows)
+JAPANESE_NAME = re.compile(r'[\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff]{2,}')
+
+# A single kana/kanji; names can be split into one-character words
+JAPANESE_CHARACTER = re.compile(r'[\u4e00-\u9fff\u3040-\u309f\u30a0-\u30ff]')
+
+# Family and given name separated by whitespace (attendance ID cell)
+SPACED_NAME = re.compile(r'([一-龯ぁ-んァ-ヶー]+\s+[一-龯ぁ-んァ-ヶー]+)')
+
+# Route and vehicle markers (佐A, IRGA, ...) that are never names
+MARKER_LINE = re.compile(r'^[A-Z0-9ｱ-ﾝァ-ヶー]+$')
+
+# --- Numbers and times ---------------------------------------------------------
+
+DIGITS = re.compile(r'\d+')
+DIGITS_ONLY = re.compile(r'^\d+$')
+DECIMAL_NUMBER = re.compile(r'([\d\.]+)')
+
+# Working hours (稼働時間) as H:MM, any number of hours
+WORKING_HOURS = re.compile(r'(\d+:\d+)')
+
+# Clock time HH:MM
+CLOCK_TIME = re.compile(r'(\d{1,2}):(\d{2})')
+
+# A cell ending in "0 0": an empty count/amount pair
+TRAILING_ZERO_PAIR = re.compile(r'\b0\s+0\s*$')
+
+
+def find_employee_id(text):
+    """
+    Find a 6-digit employee ID inside cell text.
+    
+    Args:
+        text: Cell content (converted with str())
+    
+    Returns:
+        The ID string, or None
+    """
+    text = str(text)
+    if len(text) < 6:
+        return None
+    match = CELL_EMPLOYEE_ID.search(text)
+    return match.group(1) if match else None
+
+
+def is_exact_employee_id(text):
+    """Check if text is exactly a 6-digit ID (like re.match(r'^\\d{6}$'))"""
+    return len(text) >= 6 and EXACT_EMPLOYEE_ID.match(text) is not None
+
+
+def is_digits(text):
+    """Check if text is one run of digits (like re.match(r'^\\d+$'))"""
+    if text.isdecimal():
+        return True
+    # '$' also matches before a trailing newline
+    return bool(text) and DIGITS_ONLY.match(text) is not None
+
+
+def find_integers(text):
+    """
+    All digit runs in text, as integers.
+    
+    Args:
+        text: Any value (converted with str())
+    
+    Returns:
+        List of int, in order of appearance
+    """
+    text = str(text)
+    if text.isdecimal():
+        return [int(text)]
+    return [int(digits) for digits in DIGITS.findall(text)]
+
+
+def find_working_hours(text):
+    """First H:MM working-hours value in text, or None"""
+    match = WORKING_HOURS.search(text)
+    return match.group(1) if match else None
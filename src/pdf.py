@@ -0,0 +1,295 @@
+"""PDF page helpers shared by both parsers"""
+
+import contextlib
+import mmap
+import re
+from typing import NamedTuple
+
+EMPLOYEE_ID_FORMAT = re.compile(r'\d{6}')
+
+# Characters further apart than this (in points) start a new word; real column
+# gaps also carry a space or line break in the text layer
+WORD_GAP_POINTS = 4.0
+
+
+class PageWord(NamedTuple):
+    """A run of adjacent characters from a page's text layer, boxed in PDF points (origin bottom-left)."""
+    text: str
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+
+
+def count_pages(pdf_path):
+    """
+    Count the pages in a PDF without running any table detection.
+    
+    Args:
+        pdf_path: Path to the PDF file
+    
+    Returns:
+        Number of pages in the document
+    """
+    import pypdfium2 as pdfium
+    
+    document = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(document)
+    finally:
+        document.close()
+
+
+@contextlib.contextmanager
+def mapped_pdf(pdf_path):
+    """
+    Memory-map a PDF for reading, as a file object Camelot and pypdf accept.
+    
+    Given a path, pypdf copies the whole file into memory each time it
+    opens it, and Camelot opens it once per page. Through the mapping,
+    pages are read from the OS page cache instead, shared by every page
+    and every process reading the same file.
+    
+    Args:
+        pdf_path: Path to the PDF file
+    
+    Yields:
+        Read-only mmap of the file (the path itself for an empty file,
+        which cannot be mapped)
+    """
+    with open(pdf_path, 'rb') as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            yield pdf_path
+            return
+        with mapped:
+            yield mapped
+
+
+def chunk_pages(page_numbers, chunk_size):
+    """
+    Split page numbers into consecutive chunks.
+    
+    Args:
+        page_numbers: Ordered list of 1-based page numbers
+        chunk_size: Maximum number of pages per chunk
+    
+    Returns:
+        List of page number lists, in the original order
+    """
+    chunk_size = max(1, chunk_size)
+    return [page_numbers[i:i + chunk_size] for i in range(0, len(page_numbers), chunk_size)]
+
+
+def format_pages(page_numbers):
+    """
+    Format page numbers as a Camelot pages string (e.g. '1,2,5').
+    
+    Args:
+        page_numbers: Iterable of 1-based page numbers
+    
+    Returns:
+        Comma-separated page string
+    """
+    return ','.join(str(page_number) for page_number in page_numbers)
+
+
+def parse_pages(pages, total_pages):
+    """
+    Expand a Camelot-style pages string into page numbers.
+    
+    Accepts 'all', single pages and ranges, e.g. '1,3-5,7-end'.
+    
+    Args:
+        pages: Pages string
+        total_pages: Number of pages in the document
+    
+    Returns:
+        Sorted list of unique 1-based page numbers
+    
+    Raises:
+        ValueError: If the string contains an invalid page or range, or
+            pages outside the document
+    """
+    if str(pages).strip().lower() == 'all':
+        return list(range(1, total_pages + 1))
+    
+    page_numbers = set()
+    for part in str(pages).split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        try:
+            if '-' in part:
+                first_page, last_page = part.split('-', 1)
+                last_page_number = total_pages if last_page == 'end' else int(last_page)
+                page_numbers.update(range(int(first_page), last_page_number + 1))
+            else:
+                page_numbers.add(int(part))
+        except ValueError:
+            raise ValueError(f"Invalid page selection: '{part}'")
+    
+    out_of_range_pages = sorted(page_number for page_number in page_numbers if not 1 <= page_number <= total_pages)
+    if out_of_range_pages:
+        raise ValueError(f"Page(s) {format_pages(out_of_range_pages)} outside the document "
+                         f"({total_pages} page(s))")
+    
+    return sorted(page_numbers)
+
+
+def iter_page_texts(pdf_path, page_numbers=None):
+    """
+    Read the text layer of each page, without any table detection.
+    
+    Much cheaper than a Camelot pass, so it is used to decide which pages
+    are worth extracting.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        page_numbers: 1-based page numbers to read (default: all pages)
+    
+    Yields:
+        Tuple of (page_number, page_text)
+    """
+    import pypdfium2 as pdfium
+    
+    document = pdfium.PdfDocument(pdf_path)
+    try:
+        if page_numbers is None:
+            page_numbers = range(1, len(document) + 1)
+        for page_number in page_numbers:
+            page = document[page_number - 1]
+            text_page = page.get_textpage()
+            try:
+                yield page_number, text_page.get_text_range()
+            finally:
+                text_page.close()
+                page.close()
+    finally:
+        document.close()
+
+
+def find_employee_pages(pdf_path, employee_id, page_numbers=None):
+    """
+    Find the pages whose text layer mentions a 6-digit employee ID.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        employee_id: 6-digit employee ID
+        page_numbers: 1-based page numbers to search (default: all pages)
+    
+    Returns:
+        Sorted list of page numbers containing the ID as a whole number
+    
+    Raises:
+        ValueError: If the ID is not 6 digits
+    """
+    employee_id = str(employee_id).strip()
+    if not EMPLOYEE_ID_FORMAT.fullmatch(employee_id):
+        raise ValueError(f"Invalid employee ID: '{employee_id}' (expected 6 digits)")
+    
+    # Digits on either side would make it part of a longer number (amounts, dates)
+    id_pattern = re.compile(rf'(?<!\d){employee_id}(?!\d)')
+    return [
+        page_number
+        for page_number, page_text in iter_page_texts(pdf_path, page_numbers)
+        if id_pattern.search(page_text)
+    ]
+
+
+def select_pages(pdf_path, pages='all', employee_id=None):
+    """
+    Resolve a page selection, optionally narrowed to pages mentioning an employee.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        pages: Camelot-style pages string ('all', '1,3-5,7-end')
+        employee_id: Optional 6-digit ID; keeps only pages whose text layer contains it
+    
+    Returns:
+        Sorted list of 1-based page numbers to extract
+    
+    Raises:
+        ValueError: If the selection is invalid, or the employee ID appears on none of the pages
+    """
+    page_numbers = parse_pages(pages, count_pages(pdf_path))
+    if employee_id is None:
+        return page_numbers
+    
+    employee_pages = find_employee_pages(pdf_path, employee_id, page_numbers)
+    if not employee_pages:
+        raise ValueError(f"Employee ID {employee_id} not found on pages: {pages}")
+    return employee_pages
+
+
+def _group_page_words(text_page):
+    """
+    Group a text page's characters into words.
+    
+    A word ends at whitespace or control characters, at a horizontal gap
+    wider than WORD_GAP_POINTS, or where the next character does not share
+    the word's line.
+    
+    Args:
+        text_page: pypdfium2 PdfTextPage
+    
+    Returns:
+        List of PageWord in content-stream order
+    """
+    words = []
+    word_chars = []
+    word_box = None
+    
+    for char_index in range(text_page.count_chars()):
+        char = text_page.get_text_range(char_index, 1)
+        if not char or char.isspace() or not char.isprintable():
+            if word_chars:
+                words.append(PageWord(''.join(word_chars), *word_box))
+            word_chars, word_box = [], None
+            continue
+        
+        x0, y0, x1, y1 = text_page.get_charbox(char_index)
+        if word_chars:
+            word_x0, word_y0, word_x1, word_y1 = word_box
+            same_line = y0 <= word_y1 and y1 >= word_y0
+            if same_line and word_x0 <= x0 <= word_x1 + WORD_GAP_POINTS:
+                word_chars.append(char)
+                word_box = (word_x0, min(word_y0, y0), max(word_x1, x1), max(word_y1, y1))
+                continue
+            words.append(PageWord(''.join(word_chars), *word_box))
+        
+        word_chars, word_box = [char], (x0, y0, x1, y1)
+    
+    if word_chars:
+        words.append(PageWord(''.join(word_chars), *word_box))
+    return words
+
+
+def iter_page_words(pdf_path, page_numbers=None):
+    """
+    Read each page's text layer as positioned words.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        page_numbers: 1-based page numbers to read (default: all pages)
+    
+    Yields:
+        Tuple of (page_number, list of PageWord)
+    """
+    import pypdfium2 as pdfium
+    
+    document = pdfium.PdfDocument(pdf_path)
+    try:
+        if page_numbers is None:
+            page_numbers = range(1, len(document) + 1)
+        for page_number in page_numbers:
+            page = document[page_number - 1]
+            text_page = page.get_textpage()
+            try:
+                yield page_number, _group_page_words(text_page)
+            finally:
+                text_page.close()
+                page.close()
+    finally:
+        document.close()
@@ -0,0 +1,237 @@
+"""
+Lightweight stage timing and opt-in profiling
+
+Stages are wrapped in span('name') blocks or @timed('name') decorators.
+While disabled (the default) a span is a shared no-op context manager and
+a timed function costs one flag check, so the per-employee hot path is
+unaffected. Enable with enable() or PDF_EXTRACT_PROFILE=1 (inherited by
+worker processes) to aggregate per stage: call count, total/max seconds
+and a latency histogram.
+
+Spans may nest; each one is timed on its own, so totals of nested stages
+are included in their parents' totals.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import time
+from bisect import bisect_right
+
+# Latency histogram bucket upper bounds, in seconds
+HISTOGRAM_BOUNDS = (0.001, 0.01, 0.1, 1.0, 10.0)
+HISTOGRAM_LABELS = ('<1ms', '<10ms', '<100ms', '<1s', '<10s', '>=10s')
+
+_enabled = os.environ.get('PDF_EXTRACT_PROFILE', '0') == '1'
+
+# name -> [calls, total_seconds, max_seconds, histogram counts]
+_stats = {}
+
+_NULL_SPAN = contextlib.nullcontext()
+
+
+def enable():
+    """Start aggregating spans in this process (and in workers started afterwards)."""
+    global _enabled
+    _enabled = True
+    os.environ['PDF_EXTRACT_PROFILE'] = '1'
+
+
+def disable():
+    """Stop aggregating spans."""
+    global _enabled
+    _enabled = False
+    os.environ['PDF_EXTRACT_PROFILE'] = '0'
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Drop everything recorded so far."""
+    _stats.clear()
+
+
+def record(name, seconds):
+    """
+    Add one timing to a stage.
+    
+    Args:
+        name: Stage name
+        seconds: Wall time of this call
+    """
+    stage_stats = _stats.get(name)
+    if stage_stats is None:
+        stage_stats = _stats[name] = [0, 0.0, 0.0, [0] * len(HISTOGRAM_LABELS)]
+    stage_stats[0] += 1
+    stage_stats[1] += seconds
+    if seconds > stage_stats[2]:
+        stage_stats[2] = seconds
+    stage_stats[3][bisect_right(HISTOGRAM_BOUNDS, seconds)] += 1
+
+
+@contextlib.contextmanager
+def _timed_span(name):
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started_at)
+
+
+def span(name):
+    """
+    Time a block as one call of a stage.
+    
+    Usage:
+        with span('camelot_read'):
+            tables = read_tables(...)
+    
+    Args:
+        name: Stage name
+    
+    Returns:
+        Context manager (a shared no-op one while disabled)
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _timed_span(name)
+
+
+def timed(name):
+    """
+    Decorator timing every call of a function as a stage.
+    
+    Args:
+        name: Stage name
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            started_at = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started_at)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    """
+    Copy the raw stage statistics, e.g. to send them from a worker process.
+    
+    Returns:
+        Dictionary of name -> [calls, total_seconds, max_seconds, histogram]
+    """
+    return {name: [calls, total, maximum, list(histogram)]
+            for name, (calls, total, maximum, histogram) in _stats.items()}
+
+
+def merge(stage_snapshot):
+    """
+    Add statistics from snapshot() (e.g. from a worker) into this process.
+    
+    Args:
+        stage_snapshot: Dictionary returned by snapshot()
+    """
+    for name, (calls, total, maximum, histogram) in stage_snapshot.items():
+        stage_stats = _stats.get(name)
+        if stage_stats is None:
+            _stats[name] = [calls, total, maximum, list(histogram)]
+            continue
+        stage_stats[0] += calls
+        stage_stats[1] += total
+        stage_stats[2] = max(stage_stats[2], maximum)
+        stage_stats[3] = [count + other for count, other in zip(stage_stats[3], histogram)]
+
+
+def report():
+    """
+    Summarise every stage, slowest total first.
+    
+    Returns:
+        List of dictionaries (stage, calls, total/mean/max seconds, histogram)
+    """
+    stage_reports = []
+    for name, (calls, total, maximum, histogram) in sorted(_stats.items(), key=lambda item: -item[1][1]):
+        stage_reports.append({
+            'stage': name,
+            'calls': calls,
+            'total_seconds': round(total, 6),
+            'mean_seconds': round(total / calls, 6) if calls else 0.0,
+            'max_seconds': round(maximum, 6),
+            'histogram': dict(zip(HISTOGRAM_LABELS, histogram)),
+        })
+    return stage_reports
+
+
+def print_report():
+    """Print the stage summary as a table."""
+    stage_reports = report()
+    if not stage_reports:
+        print("No timings recorded")
+        return
+    
+    print(f"{'stage':<28} {'calls':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9}  histogram")
+    for stage_report in stage_reports:
+        histogram_text = ' '.join(
+            f"{label}:{count}" for label, count in stage_report['histogram'].items() if count
+        )
+        print(f"{stage_report['stage']:<28} {stage_report['calls']:>7} {stage_report['total_seconds']:>9.3f} "
+              f"{stage_report['mean_seconds'] * 1000:>9.2f} {stage_report['max_seconds'] * 1000:>9.2f}  {histogram_text}")
+
+
+def export_json(filepath):
+    """
+    Write the stage summary to a JSON file.
+    
+    Args:
+        filepath: Output path
+    """
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump({'stages': report()}, f, ensure_ascii=False, indent=2)
+
+
+@contextlib.contextmanager
+def profile_to(filepath):
+    """
+    Profile a block with pyinstrument (.html output) or cProfile (anything else).
+    
+    cProfile output can be read with `python -m pstats <file>` or snakeviz.
+    Only the current process is profiled, not worker processes.
+    
+    Args:
+        filepath: Output path; a .html path selects pyinstrument
+    
+    Raises:
+        ImportError: If a .html path is given and pyinstrument is not installed
+    """
+    if str(filepath).endswith('.html'):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("pyinstrument is required for .html profiles: pip install pyinstrument")
+        
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(profiler.output_html())
+        return
+    
+    import cProfile
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(filepath)
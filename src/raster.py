@@ -0,0 +1,345 @@
+"""
+Rasterisation cache for lattice pages, rendered with pypdfium2
+
+Lattice line detection works on a page image. Camelot renders it again on
+every run, and PNG-encodes it only to read it straight back, so re-running
+a book with other line_scale, process_background or threshold settings
+pays the full rendering cost every time. Instead:
+
+1. prepare() renders the pages a lattice read is about to need, from the
+   original PDF with pypdfium2 (the renderer Camelot uses), spread over
+   worker processes; the pool is started once per process and reused by
+   every later window, instead of one pool per 4-page window
+2. Each image is stored grayscale as a compressed .npz in .cache/rasters,
+   keyed by the page's content hash (src.manifest.page_content_hashes),
+   the DPI and the pdfium version
+3. Camelot receives the images through its conversion-backend hook
+   (read_pdf(..., backend=RasterBackend)) and thresholds them as before
+
+Grayscale loses nothing: Camelot converts the page image to grayscale
+before thresholding, and keeps the colour image only for plotting.
+
+The DPI is the lattice 'resolution' setting (default 300). Camelot 1.0.9
+accepts that setting but always renders at 300 dpi.
+
+PDF_EXTRACT_RASTER_CACHE=0 (app.py --no-raster-cache) leaves rendering to
+Camelot; PDF_EXTRACT_RASTER_WORKERS caps the rendering processes.
+"""
+
+import functools
+import logging
+import os
+import re
+import tempfile
+
+from .cache import DiskCache, make_cache_key
+from .manifest import page_content_hashes
+from .memory import limit_processes, memory_limit_mb
+from .pdf import chunk_pages
+from .profiling import span
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RASTER_DIR = os.environ.get('PDF_EXTRACT_RASTER_DIR', '.cache/rasters')
+DEFAULT_RASTER_MAX_BYTES = int(os.environ.get('PDF_EXTRACT_RASTER_CACHE_MAX_MB', '1024')) * 1024 * 1024
+
+# Camelot's lattice default
+DEFAULT_DPI = 300
+
+# Rendering pool shared by every prepare() in this process (see _get_render_pool)
+_render_pool = None
+_render_pool_workers = 0
+
+# Camelot splits each page into <temp dir>/page-<n>.pdf before rendering it,
+# and keeps p-<n>_rotated.pdf next to it when it had to rotate the page
+_SPLIT_PAGE_NAME = re.compile(r'^page-(\d+)\.pdf$')
+
+
+def raster_cache_enabled():
+    """Return False when PDF_EXTRACT_RASTER_CACHE=0 (e.g. app.py --no-raster-cache)."""
+    return os.environ.get('PDF_EXTRACT_RASTER_CACHE', '1') != '0'
+
+
+@functools.lru_cache(maxsize=None)
+def pdfium_version():
+    """pypdfium2 and PDFium versions; a new renderer may draw pages differently"""
+    from pypdfium2.version import PDFIUM_INFO, PYPDFIUM_INFO
+    return f'{PYPDFIUM_INFO}/{PDFIUM_INFO}'
+
+
+class RasterCache(DiskCache):
+    """
+    Page images stored as compressed NumPy arrays, one .npz file per key.
+    
+    Same layout, atomic writes and LRU eviction as DiskCache.
+    """
+    
+    ENTRY_SUFFIX = '.npz'
+    
+    def __init__(self, cache_dir=DEFAULT_RASTER_DIR, max_bytes=DEFAULT_RASTER_MAX_BYTES):
+        super().__init__(cache_dir, max_bytes)
+    
+    def contains(self, key):
+        """Check for an entry without loading it"""
+        return self._entry_path(key).exists()
+    
+    def get(self, key):
+        """
+        Load an image and mark it as recently used.
+        
+        Args:
+            key: Key from raster_key()
+        
+        Returns:
+            2D uint8 grayscale array, or None on a miss
+        """
+        import numpy as np
+        
+        entry_path = self._entry_path(key)
+        try:
+            with np.load(entry_path) as entry:
+                image = entry['image']
+            os.utime(entry_path)
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            return None
+        return image
+    
+    def put(self, key, image):
+        """
+        Store an image atomically.
+        
+        Args:
+            key: Key from raster_key()
+            image: 2D uint8 grayscale array
+        """
+        import numpy as np
+        
+        entry_path = self._entry_path(key)
+        entry_path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=entry_path.parent, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'wb') as f:
+            np.savez_compressed(f, image=image)
+        os.replace(temp_path, entry_path)
+
+
+def raster_key(page_hash, dpi):
+    """Key one page image on content hash, DPI and renderer version"""
+    return make_cache_key('raster', page_hash, dpi, pdfium_version())
+
+
+def render_page(document, page_index, dpi):
+    """
+    Render one page as Camelot's pdfium backend does, in grayscale.
+    
+    Args:
+        document: pypdfium2 PdfDocument with forms initialised
+        page_index: 0-based page index
+        dpi: Rendering resolution
+    
+    Returns:
+        2D uint8 array, equal to the grayscale image Camelot thresholds
+    """
+    import cv2
+    
+    page = document[page_index]
+    try:
+        bitmap = page.render(scale=dpi / 72)
+        pixels = bitmap.to_numpy()
+        # pdfium renders BGR (BGRx/BGRA for pages with transparency)
+        conversion = cv2.COLOR_BGR2GRAY if pixels.shape[2] == 3 else cv2.COLOR_BGRA2GRAY
+        image = cv2.cvtColor(pixels, conversion)
+        bitmap.close()
+    finally:
+        page.close()
+    return image
+
+
+def _render_to_cache(pdf_path, page_keys, dpi, cache_dir, max_bytes):
+    """
+    Render pages of one PDF into the raster cache.
+    
+    Executed inside worker processes, so it must stay a module-level function.
+    Images go straight to disk instead of back through the pool.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        page_keys: List of (page_number, cache_key)
+        dpi: Rendering resolution
+        cache_dir: Raster cache folder
+        max_bytes: Raster cache size bound
+    
+    Returns:
+        Number of pages rendered
+    """
+    import pypdfium2 as pdfium
+    
+    cache = RasterCache(cache_dir, max_bytes)
+    document = pdfium.PdfDocument(pdf_path)
+    try:
+        document.init_forms()
+        for page_number, cache_key in page_keys:
+            cache.put(cache_key, render_page(document, page_number - 1, dpi))
+    finally:
+        document.close()
+    return len(page_keys)
+
+
+def render_workers(page_count):
+    """
+    Processes for rendering page_count pages.
+    
+    One inside worker processes (no nested pools), otherwise
+    PDF_EXTRACT_RASTER_WORKERS or every core, within the memory ceiling.
+    """
+    import multiprocessing
+    
+    if multiprocessing.parent_process() is not None:
+        return 1
+    workers = int(os.environ.get('PDF_EXTRACT_RASTER_WORKERS', '0')) or os.cpu_count() or 1
+    workers, _ = limit_processes(min(workers, page_count))
+    return max(1, workers)
+
+
+def _get_render_pool(workers):
+    """
+    Return the process pool for rendering, starting it on first use.
+    
+    Parsers read a book in small windows and each window calls prepare(),
+    so the pool outlives any one backend; it is only replaced to grow.
+    concurrent.futures shuts it down when the interpreter exits.
+    
+    Args:
+        workers: Processes the caller needs
+    
+    Returns:
+        ProcessPoolExecutor with at least that many workers
+    """
+    global _render_pool, _render_pool_workers
+    from concurrent.futures import ProcessPoolExecutor
+    
+    if _render_pool is None or _render_pool_workers < workers:
+        if _render_pool is not None:
+            _render_pool.shutdown()
+        _render_pool = ProcessPoolExecutor(max_workers=workers)
+        _render_pool_workers = workers
+    return _render_pool
+
+
+def shutdown_render_pool():
+    """Stop the rendering pool (it is started again when next needed)"""
+    global _render_pool, _render_pool_workers
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool, _render_pool_workers = None, 0
+
+
+class RasterBackend:
+    """
+    Camelot conversion backend serving page images from the raster cache.
+    
+    Pass as read_pdf(..., flavor='lattice', backend=...). Pages missing from
+    the cache (or rotated by Camelot) are rendered on the spot.
+    
+    Args:
+        pdf_path: Path to the PDF file being read
+        dpi: Rendering resolution
+        cache: RasterCache to use (default: RasterCache())
+    """
+    
+    def __init__(self, pdf_path, dpi=DEFAULT_DPI, cache=None):
+        self.pdf_path = pdf_path
+        self.dpi = dpi
+        self.cache = cache or RasterCache()
+        self.page_keys = {}
+    
+    def _keys_for(self, page_numbers):
+        """Cache keys of the given pages, hashing each page once"""
+        unhashed_page_numbers = [page_number for page_number in page_numbers if page_number not in self.page_keys]
+        if unhashed_page_numbers:
+            for page_number, page_hash in page_content_hashes(self.pdf_path, unhashed_page_numbers).items():
+                self.page_keys[page_number] = raster_key(page_hash, self.dpi)
+        return {page_number: self.page_keys[page_number] for page_number in page_numbers}
+    
+    def prepare(self, page_numbers):
+        """
+        Render the given pages that are not cached yet, in parallel.
+        
+        Args:
+            page_numbers: 1-based page numbers about to be read with lattice
+        """
+        missing_page_keys = [
+            (page_number, cache_key) for page_number, cache_key in self._keys_for(page_numbers).items()
+            if not self.cache.contains(cache_key)
+        ]
+        if not missing_page_keys:
+            return
+        
+        workers = render_workers(len(missing_page_keys))
+        logger.debug(f"Rendering {len(missing_page_keys)} page(s) at {self.dpi} dpi on {workers} process(es)")
+        with span('rasterize'):
+            if workers == 1:
+                _render_to_cache(self.pdf_path, missing_page_keys, self.dpi,
+                                 self.cache.cache_dir, self.cache.max_bytes)
+            else:
+                page_key_chunks = chunk_pages(missing_page_keys, -(-len(missing_page_keys) // workers))
+                list(_get_render_pool(workers).map(
+                    _render_to_cache, [self.pdf_path] * len(page_key_chunks), page_key_chunks,
+                    [self.dpi] * len(page_key_chunks), [self.cache.cache_dir] * len(page_key_chunks),
+                    [self.cache.max_bytes] * len(page_key_chunks),
+                ))
+                # Idle renderers would sit beside the lattice read the ceiling was sized for
+                if memory_limit_mb() is not None:
+                    shutdown_render_pool()
+        self.cache.evict()
+    
+    def convert(self, pdf_path, png_path):
+        """
+        Write the image of Camelot's split page pdf_path to png_path.
+        
+        Args:
+            pdf_path: Camelot's single-page PDF (<temp dir>/page-<n>.pdf)
+            png_path: Image path Camelot reads back with cv2.imread
+        """
+        import cv2
+        
+        image = None
+        cache_key = None
+        split_page_match = _SPLIT_PAGE_NAME.match(os.path.basename(pdf_path))
+        if split_page_match:
+            page_number = int(split_page_match.group(1))
+            rotated_path = os.path.join(os.path.dirname(pdf_path), f'p-{page_number}_rotated.pdf')
+            # A page Camelot rotated no longer looks like the original
+            if not os.path.exists(rotated_path):
+                cache_key = self._keys_for([page_number])[page_number]
+                image = self.cache.get(cache_key)
+        
+        if image is None:
+            import pypdfium2 as pdfium
+            
+            document = pdfium.PdfDocument(pdf_path)
+            try:
+                document.init_forms()
+                image = render_page(document, 0, self.dpi)
+            finally:
+                document.close()
+            if cache_key is not None:
+                self.cache.put(cache_key, image)
+        
+        # cv2.imread detects the format from the content, not the extension:
+        # an uncompressed BMP is far cheaper to write and read than a PNG
+        with open(png_path, 'wb') as f:
+            f.write(cv2.imencode('.bmp', image)[1].tobytes())
+
+
+def get_raster_backend(pdf_path, camelot_kwargs):
+    """
+    Return a RasterBackend for a lattice read, or None when disabled.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        camelot_kwargs: Lattice settings; 'resolution' sets the DPI, and an
+            explicit 'backend' is left to Camelot
+    """
+    if not raster_cache_enabled() or 'backend' in camelot_kwargs:
+        return None
+    return RasterBackend(pdf_path, camelot_kwargs.get('resolution', DEFAULT_DPI))
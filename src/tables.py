@@ -0,0 +1,173 @@
+"""
+Camelot table reading shared by both parsers, backed by the extraction cache
+
+Camelot and pandas are imported inside the functions that need them, so
+importing a parser (e.g. for --help, --test or the text engine) stays cheap.
+"""
+
+import functools
+import os
+
+from .cache import DiskCache, file_sha256, make_cache_key
+from .pdf import count_pages, parse_pages, format_pages, mapped_pdf
+from .profiling import span
+
+# Camelot's lattice flavor only reads text lines, so pdfminer's text-box
+# hierarchy (the bulk of layout analysis time) is skipped. Every lattice
+# read uses it, plain or through layout templates, so both produce the
+# same cells for the same cache key.
+LATTICE_LAYOUT_KWARGS = {'boxes_flow': None}
+
+
+class ExtractedTable:
+    """
+    Minimal stand-in for a Camelot table: the cell grid and its page.
+    
+    Parsers only use table.df and table.page, so cached grids and fresh
+    Camelot results are served through the same type.
+    """
+    
+    __slots__ = ('df', 'page')
+    
+    def __init__(self, df, page):
+        self.df = df
+        self.page = page
+
+
+def get_default_cache():
+    """
+    Return the shared table cache, or None when disabled.
+    
+    Set PDF_EXTRACT_CACHE=0 to turn caching off (e.g. app.py --no-cache).
+    """
+    if os.environ.get('PDF_EXTRACT_CACHE', '1') == '0':
+        return None
+    return DiskCache()
+
+
+@functools.lru_cache(maxsize=None)
+def camelot_version():
+    """
+    Return the installed Camelot version without importing Camelot.
+    
+    Package metadata is far cheaper to read than Camelot's import chain
+    (OpenCV, pdfminer, pandas), which a fully cached run never needs.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+    try:
+        return version('camelot-py')
+    except PackageNotFoundError:
+        import camelot
+        return camelot.__version__
+
+
+def _layout_kwargs(flavor, camelot_kwargs):
+    """pdfminer layout settings of a read: the caller's, or LATTICE_LAYOUT_KWARGS for lattice"""
+    if 'layout_kwargs' in camelot_kwargs:
+        return camelot_kwargs['layout_kwargs']
+    return LATTICE_LAYOUT_KWARGS if flavor == 'lattice' else {}
+
+
+def _page_cache_key(pdf_hash, page_number, flavor, parser_version, camelot_kwargs):
+    """Key one page's grids on content hash, page, flavor, settings and versions."""
+    return make_cache_key(
+        pdf_hash, page_number, flavor, camelot_kwargs, _layout_kwargs(flavor, camelot_kwargs),
+        parser_version, camelot_version()
+    )
+
+
+def _read_fresh_tables(pdf_path, pages, flavor, layout_templates, camelot_kwargs):
+    """
+    Run Camelot on pages, replaying a layout template first when one is given.
+    
+    Lattice page images come from the raster cache (src/raster.py) unless it is disabled.
+    """
+    raster_backend = None
+    if flavor == 'lattice':
+        from .raster import get_raster_backend
+        raster_backend = get_raster_backend(pdf_path, camelot_kwargs)
+    
+    if layout_templates is not None and flavor == 'lattice':
+        page_numbers = parse_pages(pages, count_pages(pdf_path))
+        with mapped_pdf(pdf_path) as pdf_source:
+            return layout_templates.read_tables(pdf_source, page_numbers, raster_backend=raster_backend,
+                                                **camelot_kwargs)
+    
+    backend_kwargs = {}
+    if raster_backend is not None:
+        raster_backend.prepare(parse_pages(pages, count_pages(pdf_path)))
+        backend_kwargs['backend'] = raster_backend
+    if flavor == 'lattice' and 'layout_kwargs' not in camelot_kwargs:
+        backend_kwargs['layout_kwargs'] = LATTICE_LAYOUT_KWARGS
+    
+    import camelot
+    with span(f'camelot_{flavor}'), mapped_pdf(pdf_path) as pdf_source:
+        return camelot.read_pdf(pdf_source, pages=pages, flavor=flavor, **backend_kwargs, **camelot_kwargs)
+
+
+def read_tables(pdf_path, pages='all', flavor='lattice', parser_version=None,
+                cache=None, pdf_hash=None, layout_templates=None, **camelot_kwargs):
+    """
+    Read tables like camelot.read_pdf, reusing cached cell grids per page.
+    
+    Only pages missing from the cache are sent to Camelot, in a single call.
+    The parser version is part of every key, so bumping it invalidates
+    everything a parser cached before.
+    
+    Args:
+        pdf_path: Path to the PDF file
+        pages: Camelot-style pages string ('all', '1,3-5', ...)
+        flavor: Camelot flavor ('lattice' or 'stream')
+        parser_version: Version string of the calling parser
+        cache: DiskCache to use (default: get_default_cache()); False disables
+        pdf_hash: Precomputed content hash, to avoid rehashing in workers
+        layout_templates: Optional LayoutTemplates replayed before lattice
+            detection (see src/templates.py)
+        **camelot_kwargs: Extra settings passed to camelot.read_pdf
+    
+    Returns:
+        List of ExtractedTable objects in page order
+    """
+    if cache is None:
+        cache = get_default_cache()
+    
+    if not cache:
+        return [
+            ExtractedTable(table.df, table.page)
+            for table in _read_fresh_tables(pdf_path, pages, flavor, layout_templates, camelot_kwargs)
+        ]
+    
+    pdf_hash = pdf_hash or file_sha256(pdf_path)
+    page_numbers = parse_pages(pages, count_pages(pdf_path))
+    
+    # Look up every requested page
+    page_grids = {}
+    page_keys = {}
+    with span('cache_lookup'):
+        for page_number in page_numbers:
+            page_keys[page_number] = _page_cache_key(pdf_hash, page_number, flavor, parser_version, camelot_kwargs)
+            cached_grids = cache.get(page_keys[page_number])
+            if cached_grids is not None:
+                page_grids[page_number] = cached_grids
+    
+    # Run Camelot once for all misses and store their grids (including empty pages)
+    missing_page_numbers = [page_number for page_number in page_numbers if page_number not in page_grids]
+    if missing_page_numbers:
+        fresh_grids = {page_number: [] for page_number in missing_page_numbers}
+        fresh_tables = _read_fresh_tables(
+            pdf_path, format_pages(missing_page_numbers), flavor, layout_templates, camelot_kwargs
+        )
+        for table in fresh_tables:
+            fresh_grids[int(table.page)].append(table.df.values.tolist())
+        
+        for page_number, grids in fresh_grids.items():
+            cache.put(page_keys[page_number], grids)
+        cache.evict()
+        page_grids.update(fresh_grids)
+    
+    import pandas as pd
+    return [
+        ExtractedTable(pd.DataFrame(grid), page_number)
+        for page_number in page_numbers
+        for grid in page_grids[page_number]
+    ]
@@ -0,0 +1,366 @@
+"""
+Layout templates: learn a lattice table grid once, replay it on later pages
+
+Monthly books from the same payroll system share one form. A template
+records what lattice line detection found on one good page (table bounding
+boxes, row/column anchors and ruling segments) plus a parser-supplied
+signature of where the content sits (e.g. employee rows and salary labels).
+
+Later pages are read by replaying that grid through Camelot's own cell
+assignment, skipping rasterisation and OpenCV line detection. A page whose
+replayed tables do not reproduce the signature falls back to full lattice.
+
+Each parser keeps several templates, one file per key under
+.cache/templates/<parser>/: the Camelot version plus a layout signature
+(page size and ruling line count), so a second form or a Camelot upgrade
+adds a template instead of overwriting the only one.
+
+Replay drives Camelot internals (Lattice._generate_table_bbox,
+PDFHandler._parse_page, Table._bbox/_segments) that are not public API.
+camelot-py is pinned in requirements.txt; should those internals be
+missing or change, templates are skipped and every page gets plain lattice.
+
+Camelot is imported on first replay or lattice run, not with this module.
+"""
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+
+from .pdf import format_pages
+from .profiling import span
+from .tables import LATTICE_LAYOUT_KWARGS, camelot_version
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_DIR = os.environ.get('PDF_EXTRACT_TEMPLATE_DIR', '.cache/templates')
+
+# Bump when the stored template format changes
+TEMPLATE_FORMAT_VERSION = 2
+
+# Templates kept per parser; the least recently replayed are removed first
+MAX_TEMPLATES = 8
+
+# Replayed tables may place slightly less text cleanly than the learning page
+ACCURACY_TOLERANCE = 2.0
+
+
+def templates_enabled():
+    """Return False when PDF_EXTRACT_TEMPLATES=0 (e.g. app.py --no-template)."""
+    return os.environ.get('PDF_EXTRACT_TEMPLATES', '1') != '0'
+
+
+@functools.lru_cache(maxsize=None)
+def replay_supported():
+    """Check the Camelot internals that template learning and replay rely on are present"""
+    from camelot.handlers import PDFHandler
+    from camelot.parsers import Lattice
+    
+    # Lattice must define the grid step itself for the template to replace it
+    supported = '_generate_table_bbox' in vars(Lattice) and callable(getattr(PDFHandler, '_parse_page', None))
+    if not supported:
+        logger.warning(f"Camelot {camelot_version()} lacks the internals layout templates use; "
+                       f"reading every page with plain lattice")
+    return supported
+
+
+@functools.lru_cache(maxsize=None)
+def get_template_lattice_class():
+    """Define TemplateLattice on first use, so importing this module does not load Camelot"""
+    from camelot.parsers import Lattice
+    
+    class TemplateLattice(Lattice):
+        """
+        Lattice parser that takes its grid from a template instead of the page image.
+        
+        Text is still read from each page and assigned to cells (including
+        spanning-cell shifts) by Camelot's lattice code, so replayed tables match
+        a full lattice run of the same form.
+        """
+        
+        def __init__(self, template, **camelot_kwargs):
+            super().__init__(**camelot_kwargs)
+            self.template = template
+        
+        def _generate_table_bbox(self):
+            self.pdf_image = None
+            self.table_bbox_parses = {}
+            self.vertical_segments, self.horizontal_segments = [], []
+            
+            # A different page size means a different form: find no tables
+            if [round(self.pdf_width), round(self.pdf_height)] != self.template['page_size']:
+                return
+            
+            self.vertical_segments = [tuple(segment) for segment in self.template['vertical_segments']]
+            self.horizontal_segments = [tuple(segment) for segment in self.template['horizontal_segments']]
+            for table_template in self.template['tables']:
+                self.table_bbox_parses[tuple(table_template['bbox'])] = {
+                    'col_anchors': table_template['col_anchors'],
+                    'row_anchors': table_template['row_anchors'],
+                }
+    
+    return TemplateLattice
+
+
+def learn_template(page_tables, describe_table, camelot_kwargs):
+    """
+    Build a template from one page's lattice tables.
+    
+    Args:
+        page_tables: Camelot tables from a single page, in table order
+        describe_table: Function mapping a table DataFrame to a JSON-serialisable
+            signature, or None if the table is not usable for learning
+        camelot_kwargs: Lattice settings the tables were read with
+    
+    Returns:
+        Template dictionary, or None if any table has no signature (or
+        Camelot no longer exposes a table's grid)
+    """
+    table_templates = []
+    for table in page_tables:
+        signature = describe_table(table.df)
+        if signature is None or getattr(table, '_bbox', None) is None:
+            return None
+        table_templates.append({
+            'bbox': [float(value) for value in table._bbox],
+            'col_anchors': [float(value) for value in table.parse['col_anchors']],
+            'row_anchors': [float(value) for value in table.parse['row_anchors']],
+            'accuracy': float(table.accuracy),
+            'signature': signature,
+        })
+    
+    if not table_templates:
+        return None
+    
+    segments = getattr(page_tables[0], '_segments', None)
+    if segments is None:
+        return None
+    vertical_segments, horizontal_segments = segments
+    return {
+        'format_version': TEMPLATE_FORMAT_VERSION,
+        'camelot_version': camelot_version(),
+        'camelot_kwargs': camelot_kwargs,
+        'learned_from_page': int(page_tables[0].page),
+        'page_size': [round(value) for value in page_tables[0].pdf_size],
+        'vertical_segments': [[float(value) for value in segment] for segment in vertical_segments],
+        'horizontal_segments': [[float(value) for value in segment] for segment in horizontal_segments],
+        'tables': table_templates,
+    }
+
+
+def _group_tables_by_page(tables):
+    """Map page number -> that page's tables in table order"""
+    tables_by_page = {}
+    for table in sorted(tables, key=lambda table: (int(table.page), table.order)):
+        tables_by_page.setdefault(int(table.page), []).append(table)
+    return tables_by_page
+
+
+def template_key(template):
+    """
+    File name for a template: Camelot version plus layout signature.
+    
+    Args:
+        template: Template dictionary from learn_template()
+    
+    Returns:
+        Key such as 'camelot-1.0.9_842x595_61-lines'
+    """
+    page_width, page_height = template['page_size']
+    line_count = len(template['vertical_segments']) + len(template['horizontal_segments'])
+    return f"camelot-{template['camelot_version']}_{page_width}x{page_height}_{line_count}-lines"
+
+
+class LayoutTemplates:
+    """
+    A parser's stored templates, applied to pages before falling back to lattice.
+    
+    Args:
+        name: Template set name, usually the parser type ('attendance')
+        describe_table: Function mapping a table DataFrame to its signature
+            (None when the table cannot be used to learn a template)
+        template_dir: Folder holding <name>/<template key>.json
+    """
+    
+    def __init__(self, name, describe_table, template_dir=DEFAULT_TEMPLATE_DIR):
+        self.name = name
+        self.describe_table = describe_table
+        self.template_folder = Path(template_dir) / name
+    
+    def _template_paths(self):
+        """Stored template files, most recently replayed or learned first"""
+        stamped_paths = []
+        for template_path in self.template_folder.glob('*.json'):
+            # Another worker may remove a template between listing and stat
+            with contextlib.suppress(FileNotFoundError):
+                stamped_paths.append((template_path.stat().st_mtime, template_path))
+        return [template_path for _, template_path in sorted(stamped_paths, reverse=True)]
+    
+    def load(self, camelot_kwargs):
+        """
+        Return the stored templates usable with this Camelot and these settings.
+        
+        Args:
+            camelot_kwargs: Lattice settings of the coming read
+        
+        Returns:
+            List of (template path, template), most recently replayed first
+        """
+        templates = []
+        for template_path in self._template_paths():
+            try:
+                with open(template_path, 'r', encoding='utf-8') as f:
+                    template = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+            if (template.get('format_version') == TEMPLATE_FORMAT_VERSION
+                    and template['camelot_version'] == camelot_version()
+                    and template['camelot_kwargs'] == camelot_kwargs):
+                templates.append((template_path, template))
+        return templates
+    
+    def save(self, template):
+        """
+        Store a template atomically (workers may learn at the same time).
+        
+        A template with the same key is replaced; beyond MAX_TEMPLATES, the
+        least recently replayed ones are removed.
+        
+        Returns:
+            Path of the stored template
+        """
+        self.template_folder.mkdir(parents=True, exist_ok=True)
+        template_path = self.template_folder / f"{template_key(template)}.json"
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.template_folder, suffix='.tmp')
+        with os.fdopen(file_descriptor, 'w', encoding='utf-8') as f:
+            json.dump(template, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, template_path)
+        
+        for stale_path in self._template_paths()[MAX_TEMPLATES:]:
+            stale_path.unlink(missing_ok=True)
+        return template_path
+    
+    def _page_matches(self, template, page_tables):
+        """Check replayed tables reproduce the template's signature and accuracy"""
+        if len(page_tables) != len(template['tables']):
+            return False
+        for table, table_template in zip(page_tables, template['tables']):
+            if table.accuracy < table_template['accuracy'] - ACCURACY_TOLERANCE:
+                return False
+            if self.describe_table(table.df) != table_template['signature']:
+                return False
+        return True
+    
+    def _replay(self, pdf_path, page_numbers, templates, layout_kwargs, camelot_kwargs):
+        """
+        Read pages with the template grids, trying each template in turn.
+        
+        Returns:
+            Tuple of (matched_tables, unmatched_page_numbers)
+        """
+        from camelot.handlers import PDFHandler
+        from camelot.utils import TemporaryDirectory
+        
+        # Drive Camelot's per-page pipeline directly so the template parser
+        # can be used (read_pdf only accepts its built-in flavors)
+        handler = PDFHandler(pdf_path, pages=format_pages(page_numbers))
+        template_parsers = [
+            [template_path, template, get_template_lattice_class()(template, **camelot_kwargs)]
+            for template_path, template in templates
+        ]
+        
+        matched_tables = []
+        unmatched_page_numbers = []
+        replayed_template_paths = set()
+        with TemporaryDirectory() as temp_dir:
+            for page_number in page_numbers:
+                for index, (template_path, template, parser) in enumerate(template_parsers):
+                    with span('template_replay_page'):
+                        page_tables = handler._parse_page(page_number, temp_dir, parser, False, layout_kwargs)
+                    if self._page_matches(template, page_tables):
+                        matched_tables.extend(page_tables)
+                        replayed_template_paths.add(template_path)
+                        # The next page most likely has the same form: try this template first
+                        template_parsers.insert(0, template_parsers.pop(index))
+                        break
+                else:
+                    unmatched_page_numbers.append(page_number)
+        
+        # Replayed templates count as recently used, so eviction keeps them
+        for template_path in replayed_template_paths:
+            with contextlib.suppress(FileNotFoundError):
+                os.utime(template_path)
+        return matched_tables, unmatched_page_numbers
+    
+    def read_tables(self, pdf_path, page_numbers, raster_backend=None, **camelot_kwargs):
+        """
+        Read lattice tables, replaying the stored templates where they fit.
+        
+        Pages no template fits go through full lattice detection. When no
+        template fits any page (a new form, a Camelot upgrade, or nothing
+        learned yet), the first lattice page whose tables all have a
+        signature becomes a new template. Without the Camelot internals
+        replay needs, every page is read with plain lattice.
+        
+        Args:
+            pdf_path: Path to the PDF file, or an open file such as src.pdf.mapped_pdf()
+            page_numbers: 1-based page numbers to read
+            raster_backend: Optional src.raster.RasterBackend supplying page
+                images to the pages that need full lattice
+            **camelot_kwargs: Lattice settings
+        
+        Returns:
+            List of Camelot tables in page order
+        """
+        # Same text layout as plain lattice reads (see tables.LATTICE_LAYOUT_KWARGS)
+        layout_kwargs = camelot_kwargs.pop('layout_kwargs', LATTICE_LAYOUT_KWARGS)
+        supported = replay_supported()
+        templates = self.load(camelot_kwargs) if supported else []
+        
+        tables = []
+        lattice_page_numbers = list(page_numbers)
+        if templates:
+            try:
+                tables, lattice_page_numbers = self._replay(pdf_path, page_numbers, templates, layout_kwargs,
+                                                            camelot_kwargs)
+            except (AttributeError, TypeError, KeyError) as exception:
+                # Camelot internals changed shape: fall back to plain lattice
+                logger.warning(f"Template '{self.name}' replay failed ({type(exception).__name__}: {exception}); "
+                               f"reading every page with plain lattice")
+                supported = False
+                tables, lattice_page_numbers = [], list(page_numbers)
+            else:
+                logger.info(f"Template '{self.name}': {len(page_numbers) - len(lattice_page_numbers)} of "
+                            f"{len(page_numbers)} page(s) replayed, {len(lattice_page_numbers)} need lattice")
+        
+        if lattice_page_numbers:
+            backend_kwargs = {}
+            if raster_backend is not None:
+                raster_backend.prepare(lattice_page_numbers)
+                backend_kwargs['backend'] = raster_backend
+            
+            import camelot
+            with span('camelot_lattice'):
+                lattice_tables = camelot.read_pdf(
+                    pdf_path, pages=format_pages(lattice_page_numbers), flavor='lattice',
+                    layout_kwargs=layout_kwargs, **backend_kwargs, **camelot_kwargs
+                )
+            tables.extend(lattice_tables)
+            
+            if supported and len(lattice_page_numbers) == len(page_numbers):
+                self._learn(lattice_tables, camelot_kwargs)
+        
+        return sorted(tables, key=lambda table: (int(table.page), table.order))
+    
+    def _learn(self, lattice_tables, camelot_kwargs):
+        """Save a template from the first lattice page that yields one"""
+        for page_number, page_tables in _group_tables_by_page(lattice_tables).items():
+            template = learn_template(page_tables, self.describe_table, camelot_kwargs)
+            if template is not None:
+                template_path = self.save(template)
+                logger.info(f"✓ Learned layout template '{self.name}' from page {page_number} → {template_path}")
+                return
@@ -0,0 +1,32 @@
+"""Batch output naming"""
+
+from pathlib import Path
+
+from src.batch import _build_output_paths
+
+
+def output_names(pdf_paths):
+    return [Path(output_path).name for output_path in _build_output_paths(pdf_paths, 'out')]
+
+
+def test_unique_stems_keep_their_name():
+    assert output_names(['inbox/tokyo/book.pdf', 'inbox/osaka/list.pdf']) == ['book.json', 'list.json']
+
+
+def test_same_stem_gets_parent_folder():
+    assert output_names(['inbox/tokyo/book.pdf', 'inbox/osaka/book.pdf']) == ['tokyo_book.json', 'osaka_book.json']
+
+
+def test_same_parent_folder_gets_longer_prefix():
+    assert output_names(['a/tokyo/book.pdf', 'b/tokyo/book.pdf', 'b/osaka/book.pdf']) == [
+        'a_tokyo_book.json', 'b_tokyo_book.json', 'osaka_book.json',
+    ]
+
+
+def test_remaining_collisions_get_numeric_suffix():
+    # 'tokyo_book.pdf' already takes the name the prefixed 'tokyo/book.pdf' would get
+    output_paths = _build_output_paths(['tokyo/book.pdf', 'book.pdf', 'tokyo_book.pdf'], 'out')
+    assert len(set(output_paths)) == 3
+    assert [Path(output_path).name for output_path in output_paths] == [
+        'tokyo_book.json', 'book.json', 'tokyo_book_2.json',
+    ]
@@ -0,0 +1,31 @@
+"""Parquet output: typed columns from allowance records"""
+
+import logging
+
+import pytest
+
+pyarrow = pytest.importorskip('pyarrow')
+import pyarrow.parquet  # noqa: E402
+
+from src.columnar import ParquetWriter  # noqa: E402
+
+
+def test_text_cell_becomes_null_and_is_logged(tmp_path, caplog):
+    parquet_path = tmp_path / 'allowance.parquet'
+    records = [
+        {'shain_id': '160013', 'shimei': '江頭 孝之', 'rinji_teate': '3000', 'gokei': '28'},
+        {'shain_id': '180201', 'shimei': '山田 太郎', 'rinji_teate': '有', 'gokei': '12.0'},
+    ]
+    
+    with caplog.at_level(logging.WARNING, logger='src.columnar'):
+        with ParquetWriter(str(parquet_path), 'allowance') as parquet_writer:
+            for record in records:
+                parquet_writer.write(record)
+    
+    table = pyarrow.parquet.read_table(parquet_path)
+    assert table.column('rinji_teate').to_pylist() == [3000, None]
+    assert table.column('gokei').to_pylist() == [28, 12]
+    assert table.column('shimei').to_pylist() == ['江頭 孝之', '山田 太郎']
+    assert "Employee 180201: allowance field 'rinji_teate'" in caplog.text
+    assert not (tmp_path / 'allowance.parquet.tmp').exists()
+
@@ -0,0 +1,121 @@
+"""Incremental re-extraction with per-page manifests"""
+
+import pytest
+
+from src.cache import DiskCache
+from src.manifest import extract_incremental, page_content_hashes
+
+ALLOWANCE_PDF = 'materials/運転手手当一覧表 - Untenshu teate ichiran hyō - Driver Allowance List.pdf'
+
+
+def write_book(pdf_path, source_indices):
+    """Write a book made of the sample's pages in the given order"""
+    from pypdf import PdfReader, PdfWriter
+    
+    source_pages = PdfReader(ALLOWANCE_PDF).pages
+    writer = PdfWriter()
+    for source_index in source_indices:
+        writer.add_page(source_pages[source_index])
+    with open(pdf_path, 'wb') as f:
+        writer.write(f)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskCache(str(tmp_path / 'manifests'))
+
+
+def test_repeated_page_is_reused(tmp_path, store):
+    pdf_path = str(tmp_path / 'book.pdf')
+    write_book(pdf_path, (0, 1, 0))
+    
+    first_records, first_changes = extract_incremental('allowance', pdf_path, store=store, engine='text')
+    assert first_changes['extracted_pages'] == 3
+    
+    second_records, second_changes = extract_incremental('allowance', pdf_path, store=store, engine='text')
+    assert [record.to_dict() for record in second_records] == [record.to_dict() for record in first_records]
+    assert second_changes['reused_pages'] == 3
+    assert second_changes['extracted_pages'] == 0
+    assert second_changes['added'] == second_changes['changed'] == second_changes['removed'] == []
+
+
+def test_replaced_repeat_changes_its_employees(tmp_path, store):
+    first_page_path = str(tmp_path / 'first_page.pdf')
+    write_book(first_page_path, (0,))
+    first_page_ids = {record.shain_id for record in extract_incremental(
+        'allowance', first_page_path, store=store, engine='text')[0]}
+    
+    # Page 1 repeated as page 3; the re-issue replaces that repeat with page 2
+    pdf_path = str(tmp_path / 'book.pdf')
+    write_book(pdf_path, (0, 1, 0))
+    extract_incremental('allowance', pdf_path, store=store, engine='text')
+    write_book(pdf_path, (0, 1, 1))
+    _, changes = extract_incremental('allowance', pdf_path, store=store, engine='text')
+    
+    assert changes['reused_pages'] == 3
+    assert changes['extracted_pages'] == 0
+    # Page 1's employees now appear once instead of twice
+    assert first_page_ids <= set(changes['changed'])
+
+
+def test_renamed_book_reuses_pages_by_book_id(tmp_path, store):
+    first_path = str(tmp_path / 'september.pdf')
+    write_book(first_path, (0, 1))
+    extract_incremental('allowance', first_path, store=store, engine='text')
+    
+    moved_path = tmp_path / 'reissued'
+    moved_path.mkdir()
+    write_book(str(moved_path / 'september.pdf'), (0, 1))
+    _, moved_changes = extract_incremental('allowance', str(moved_path / 'september.pdf'), store=store, engine='text')
+    assert moved_changes['reused_pages'] == 2
+    
+    renamed_path = str(tmp_path / 'september_v2.pdf')
+    write_book(renamed_path, (0, 1))
+    _, renamed_changes = extract_incremental('allowance', renamed_path, store=store, book_id='september',
+                                             engine='text')
+    assert renamed_changes['reused_pages'] == 2
+    assert renamed_changes['changed'] == []
+
+
+def write_nested_form_page(pdf_path, drawing):
+    """One page drawing a form XObject that draws another form with the given operators"""
+    from pypdf import PdfWriter
+    from pypdf.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject, NumberObject
+    
+    writer = PdfWriter()
+    page = writer.add_blank_page(100, 100)
+    
+    def form(data, resources=None):
+        stream = DecodedStreamObject()
+        stream.set_data(data)
+        stream.update({
+            NameObject('/Type'): NameObject('/XObject'),
+            NameObject('/Subtype'): NameObject('/Form'),
+            NameObject('/BBox'): ArrayObject([NumberObject(0), NumberObject(0), NumberObject(100), NumberObject(100)]),
+        })
+        if resources is not None:
+            stream[NameObject('/Resources')] = resources
+        return writer._add_object(stream)
+    
+    def xobjects(name, reference):
+        return DictionaryObject({NameObject('/XObject'): DictionaryObject({NameObject(name): reference})})
+    
+    inner_form = form(drawing)
+    outer_form = form(b'/Inner Do', xobjects('/Inner', inner_form))
+    contents = DecodedStreamObject()
+    contents.set_data(b'/Outer Do')
+    page[NameObject('/Contents')] = writer._add_object(contents)
+    page[NameObject('/Resources')] = xobjects('/Outer', outer_form)
+    with open(pdf_path, 'wb') as f:
+        writer.write(f)
+
+
+def test_change_inside_nested_form_changes_page_hash(tmp_path):
+    paths = [str(tmp_path / f'{name}.pdf') for name in ('original', 'same', 'corrected')]
+    write_nested_form_page(paths[0], b'0 0 10 10 re f')
+    write_nested_form_page(paths[1], b'0 0 10 10 re f')
+    write_nested_form_page(paths[2], b'0 0 20 10 re f')
+    
+    original_hash, same_hash, corrected_hash = (page_content_hashes(path)[1] for path in paths)
+    assert original_hash == same_hash
+    assert corrected_hash != original_hash